@@ -1,6 +1,11 @@
 import streamlit as st
 import os
 
+from utils.summary import load_summary
+from utils.tracing import span, start_exporter
+
+PAGE = "home"
+
 # -------------------------------------------------
 # Page Config
 # -------------------------------------------------
@@ -9,6 +14,7 @@ st.set_page_config(
     page_icon="🌊",
     layout="wide"
 )
+start_exporter()
 
 # -------------------------------------------------
 # Load CSS
@@ -23,6 +29,11 @@ def load_css():
 
 load_css()
 
+# Headline numbers come from the snapshot written at ingest, so the landing
+# page never loads the dataset itself.
+with span("data_load", PAGE):
+    summary = load_summary()
+
 # -------------------------------------------------
 # HEADER
 # -------------------------------------------------
@@ -35,12 +46,12 @@ st.markdown("""
 # -------------------------------------------------
 # OVERVIEW
 # -------------------------------------------------
-st.markdown("""
+st.markdown(f"""
 <div class="card">
     <h1>Dashboard Overview</h1>
     <p style="max-width:850px; margin:auto;">
         Historical rainfall and flood-related records in Malaysia from
-        <b>2000–2010</b>, enabling spatial and temporal exploration across
+        <b>{summary["year_min"]}–{summary["year_max"]}</b>, enabling spatial and temporal exploration across
         states and districts.
     </p>
 </div>
@@ -52,13 +63,13 @@ st.markdown("""
 m1, m2, m3, m4 = st.columns(4)
 
 with m1:
-    st.markdown("""<div class="metric-card"><small>Total Records</small><h2>825</h2></div>""", unsafe_allow_html=True)
+    st.markdown(f"""<div class="metric-card"><small>Total Records</small><h2>{summary["records"]:,}</h2></div>""", unsafe_allow_html=True)
 with m2:
-    st.markdown("""<div class="metric-card"><small>States Covered</small><h2>11</h2></div>""", unsafe_allow_html=True)
+    st.markdown(f"""<div class="metric-card"><small>States Covered</small><h2>{summary["states"]}</h2></div>""", unsafe_allow_html=True)
 with m3:
-    st.markdown("""<div class="metric-card"><small>Districts</small><h2>67</h2></div>""", unsafe_allow_html=True)
+    st.markdown(f"""<div class="metric-card"><small>Districts</small><h2>{summary["districts"]}</h2></div>""", unsafe_allow_html=True)
 with m4:
-    st.markdown("""<div class="metric-card"><small>Years of Data</small><h2>11</h2></div>""", unsafe_allow_html=True)
+    st.markdown(f"""<div class="metric-card"><small>Years of Data</small><h2>{summary["years"]}</h2></div>""", unsafe_allow_html=True)
 
 # -------------------------------------------------
 # FLOOD SUMMARY
@@ -66,19 +77,19 @@ with m4:
 f1, f2 = st.columns(2)
 
 with f1:
-    st.markdown("""
+    st.markdown(f"""
     <div class="flood-card">
         <small>Flood Cases</small>
-        <h2>347</h2>
-        <p>42.1% of records</p>
+        <h2>{summary["flood_cases"]:,}</h2>
+        <p>{summary["flood_rate"]:.1%} of records</p>
     </div>
     """, unsafe_allow_html=True)
 
 with f2:
-    st.markdown("""
+    st.markdown(f"""
     <div class="safe-card">
         <small>No Flood</small>
-        <h2>478</h2>
+        <h2>{summary["no_flood"]:,}</h2>
         <p>Normal conditions</p>
     </div>
     """, unsafe_allow_html=True)
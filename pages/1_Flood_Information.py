@@ -2,6 +2,11 @@
 import streamlit as st
 import os
 
+from utils.assets import best_variant
+from utils.tracing import span, start_exporter
+
+PAGE = "flood_information"
+
 # =================================================
 # PAGE CONFIG
 # =================================================
@@ -9,6 +14,7 @@ st.set_page_config(
     page_title="Flood Information | Malaysia",
     layout="wide"
 )
+start_exporter()
 
 # =================================================
 # LOAD CSS
@@ -133,25 +139,36 @@ Examples of flood situations experienced across different regions in Malaysia.
 </div>
 """, unsafe_allow_html=True)
 
+# Each image fills a third of the wide layout; serve the smallest resized
+# WebP variant that covers that width instead of the full-size original.
+GALLERY_COLUMN_PX = 480
+
+with span("data_load", PAGE):
+    gallery = [
+        best_variant("assets/images/flood_klang_valley_2021.jpeg", GALLERY_COLUMN_PX),
+        best_variant("assets/images/flood_kelantan_2014.jpg", GALLERY_COLUMN_PX),
+        best_variant("assets/images/flood_johor.jpg", GALLERY_COLUMN_PX),
+    ]
+
 col1, col2, col3 = st.columns(3)
 
 with col1:
     st.image(
-        "assets/images/flood_klang_valley_2021.jpeg",
+        gallery[0],
         caption="Urban Flooding – Klang Valley",
         use_container_width=True
     )
 
 with col2:
     st.image(
-        "assets/images/flood_kelantan_2014.jpg",
+        gallery[1],
         caption="Severe Flooding – Kelantan (2014)",
         use_container_width=True
     )
 
 with col3:
     st.image(
-        "assets/images/flood_johor.jpg",
+        gallery[2],
         caption="Residential Flood – Johor",
         use_container_width=True
     )
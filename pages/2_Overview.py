@@ -1,8 +1,20 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import os
 
+from utils import memory
+from utils.data import dataset_version
+from utils.export import render_export, state_year_aggregates
+from utils.flood_scores import scores_version, shared_flood_scores
+from utils.indexed import shared_index
+from utils.lazy import lazy_import
+from utils.summary import load_summary
+from utils.tracing import span, start_exporter
+
+# Imported on first use, so the page shell renders before plotly loads.
+px = lazy_import("plotly.express")
+
+PAGE = "overview"
+
 # =================================================
 # PAGE CONFIG
 # =================================================
@@ -10,6 +22,7 @@ st.set_page_config(
     page_title="Overview",
     layout="wide"
 )
+start_exporter()
 
 # =================================================
 # LOAD CSS
@@ -25,19 +38,37 @@ load_css()
 # =================================================
 # LOAD DATA
 # =================================================
-@st.cache_data
 def load_data():
-    df = pd.read_csv("data/your_flood_data.csv")
-    df.columns = df.columns.str.strip()
-    return df
+    # One sorted, indexed frame shared by every session (read-only).
+    return shared_index()
+
+with span("data_load", PAGE):
+    index = load_data()
+    df = index.frame
+
+def load_scores(version):
+    return shared_flood_scores(version)
+
+with span("data_load", PAGE):
+    scores = load_scores(dataset_version())
 
-df = load_data()
+# Figures depend only on the dataset (and the selected state), so they are
+# built once and shared through the budgeted figure cache.
+version = dataset_version()
+session = memory.current_session()
+
+def aggregate(key, build):
+    """Aggregated frame for ``key``, computed once per dataset version.
+
+    Kept in the dataset cache next to the figures built from it, so a rerun
+    with both cached does no groupby at all.
+    """
+    return memory.cached("dataset", (version, "overview") + key, build, session)
 
 monthly_cols = [
     "JAN","FEB","MAR","APR","MAY","JUN",
     "JUL","AUG","SEP","OCT","NOV","DEC"
 ]
-df["TOTAL_ANNUAL"] = df[monthly_cols].sum(axis=1)
 
 # =================================================
 # HEADER
@@ -48,12 +79,14 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+summary = load_summary(version)
+
+st.markdown(f"""
 <div class="card">
 <h2>Flood Events & Rainfall Analytics Overview</h2>
 <p>
 This dashboard presents nationwide and state-level insights into rainfall patterns
-and flood occurrences in Malaysia (2000–2010).
+and flood occurrences in Malaysia ({summary["year_min"]}–{summary["year_max"]}).
 </p>
 </div>
 """, unsafe_allow_html=True)
@@ -71,10 +104,11 @@ tab_overall, tab_state = st.tabs([
 # =================================================
 with tab_overall:
 
-    total_floods = int(df["FLOOD"].sum())
-    avg_rainfall = round(df["TOTAL_ANNUAL"].mean(), 1)
-    most_flood_state = df[df["FLOOD"] == 1]["STATE_NAME"].value_counts().idxmax()
-    wettest_district = df.groupby("DISTRICT_NAME")["TOTAL_ANNUAL"].mean().idxmax()
+    # KPIs from the ingest-time summary snapshot
+    total_floods = summary["flood_cases"]
+    avg_rainfall = round(summary["avg_annual_rainfall"], 1)
+    most_flood_state = summary["most_flood_state"]
+    wettest_district = summary["wettest_district"]
 
     # KPI Cards
     c1, c2, c3, c4 = st.columns(4)
@@ -86,30 +120,37 @@ with tab_overall:
     # =================================================
     # CHART 1: FLOOD EVENTS BY STATE
     # =================================================
-    flood_by_state = (
-        df[df["FLOOD"] == 1]
-        .groupby("STATE_NAME")
-        .size()
-        .reset_index(name="Flood Events")
-        .sort_values("Flood Events", ascending=False)
-    )
+    with span("aggregation", PAGE):
+        flood_by_state = aggregate(("flood_by_state",), lambda: (
+            df[df["FLOOD"] == 1]
+            .groupby("STATE_NAME")
+            .size()
+            .reset_index(name="Flood Events")
+            .sort_values("Flood Events", ascending=False)
+        ))
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig1 = px.bar(
-            flood_by_state,
-            x="STATE_NAME",
-            y="Flood Events",
-            color="STATE_NAME",
-            color_discrete_sequence=px.colors.qualitative.Bold
-        )
-        fig1.update_layout(
-            height=340,
-            showlegend=False,
-            margin=dict(l=80, r=40, t=50, b=90)
-        )
-        st.plotly_chart(fig1, use_container_width=True)
+        fig1_key = (version, "fig1")
+        fig1 = memory.get("figure", fig1_key, session)
+        if fig1 is None:
+            with span("figure_build", PAGE):
+                fig1 = px.bar(
+                    flood_by_state,
+                    x="STATE_NAME",
+                    y="Flood Events",
+                    color="STATE_NAME",
+                    color_discrete_sequence=px.colors.qualitative.Bold
+                )
+                fig1.update_layout(
+                    height=340,
+                    showlegend=False,
+                    margin=dict(l=80, r=40, t=50, b=90)
+                )
+            memory.put("figure", fig1_key, fig1, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig1, use_container_width=True)
 
         st.markdown("<div class='table-title'>Flood Events by State</div>", unsafe_allow_html=True)
         st.dataframe(flood_by_state, use_container_width=True, hide_index=True)
@@ -128,39 +169,46 @@ with tab_overall:
     # =================================================
     # CHART 2: YEARLY RAINFALL vs FLOOD EVENTS
     # =================================================
-    yearly = df.groupby("YEAR").agg(
-        Avg_Rainfall=("TOTAL_ANNUAL", "mean"),
-        Flood_Events=("FLOOD", "sum")
-    ).reset_index()
+    with span("aggregation", PAGE):
+        yearly = aggregate(("yearly",), lambda: df.groupby("YEAR").agg(
+            Avg_Rainfall=("TOTAL_ANNUAL", "mean"),
+            Flood_Events=("FLOOD", "sum")
+        ).reset_index())
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig2 = px.bar(
-            yearly,
-            x="YEAR",
-            y="Avg_Rainfall",
-            color="Avg_Rainfall",
-            color_continuous_scale="Blues"
-        )
-        fig2.add_scatter(
-            x=yearly["YEAR"],
-            y=yearly["Flood_Events"] * 100,
-            mode="lines+markers",
-            name="Flood Events (scaled)"
-        )
-        fig2.update_layout(
-            height=340,
-            margin=dict(l=80, r=40, t=50, b=80),
-            legend=dict(
-                orientation="h",
-                y=1.05,
-                x=0.5,
-                xanchor="center"
-            )
-        )
-        fig2.update_yaxes(tickformat=",")
-        st.plotly_chart(fig2, use_container_width=True)
+        fig2_key = (version, "fig2")
+        fig2 = memory.get("figure", fig2_key, session)
+        if fig2 is None:
+            with span("figure_build", PAGE):
+                fig2 = px.bar(
+                    yearly,
+                    x="YEAR",
+                    y="Avg_Rainfall",
+                    color="Avg_Rainfall",
+                    color_continuous_scale="Blues"
+                )
+                fig2.add_scatter(
+                    x=yearly["YEAR"],
+                    y=yearly["Flood_Events"] * 100,
+                    mode="lines+markers",
+                    name="Flood Events (scaled)"
+                )
+                fig2.update_layout(
+                    height=340,
+                    margin=dict(l=80, r=40, t=50, b=80),
+                    legend=dict(
+                        orientation="h",
+                        y=1.05,
+                        x=0.5,
+                        xanchor="center"
+                    )
+                )
+                fig2.update_yaxes(tickformat=",")
+            memory.put("figure", fig2_key, fig2, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig2, use_container_width=True)
 
         st.markdown("<div class='table-title'>Yearly Rainfall & Flood Events</div>", unsafe_allow_html=True)
         st.dataframe(yearly, use_container_width=True, hide_index=True)
@@ -179,29 +227,38 @@ with tab_overall:
     # =================================================
     # CHART 3: MONTHLY RAINFALL DISTRIBUTION
     # =================================================
-    monthly_state = df.groupby("STATE_NAME")[monthly_cols].sum().reset_index()
-    monthly_long = monthly_state.melt(
-        id_vars="STATE_NAME",
-        var_name="Month",
-        value_name="Rainfall"
-    )
+    with span("aggregation", PAGE):
+        monthly_long = aggregate(("monthly_long",), lambda: (
+            df.groupby("STATE_NAME")[monthly_cols].sum().reset_index()
+            .melt(
+                id_vars="STATE_NAME",
+                var_name="Month",
+                value_name="Rainfall"
+            )
+        ))
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig3 = px.bar(
-            monthly_long,
-            x="STATE_NAME",
-            y="Rainfall",
-            color="Month",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig3.update_layout(
-            height=360,
-            margin=dict(l=80, r=40, t=50, b=120)
-        )
-        fig3.update_yaxes(tickformat=",")
-        st.plotly_chart(fig3, use_container_width=True)
+        fig3_key = (version, "fig3")
+        fig3 = memory.get("figure", fig3_key, session)
+        if fig3 is None:
+            with span("figure_build", PAGE):
+                fig3 = px.bar(
+                    monthly_long,
+                    x="STATE_NAME",
+                    y="Rainfall",
+                    color="Month",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig3.update_layout(
+                    height=360,
+                    margin=dict(l=80, r=40, t=50, b=120)
+                )
+                fig3.update_yaxes(tickformat=",")
+            memory.put("figure", fig3_key, fig3, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig3, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -214,6 +271,51 @@ with tab_overall:
         </div>
         """, unsafe_allow_html=True)
 
+    # =================================================
+    # CHART 4: MODEL FLOOD PROBABILITY BY STATE
+    # =================================================
+    with span("aggregation", PAGE):
+        state_prob = aggregate(("state_prob", scores_version()), lambda: (
+            scores.groupby("STATE_NAME", as_index=False)["FLOOD_PROB"]
+            .mean()
+            .sort_values("FLOOD_PROB", ascending=False)
+        ))
+
+    col_c, col_i = st.columns([3, 2])
+
+    with col_c:
+        fig7_key = (version, "fig7", scores_version())
+        fig7 = memory.get("figure", fig7_key, session)
+        if fig7 is None:
+            with span("figure_build", PAGE):
+                fig7 = px.bar(
+                    state_prob,
+                    x="STATE_NAME",
+                    y="FLOOD_PROB",
+                    color="FLOOD_PROB",
+                    color_continuous_scale="Reds"
+                )
+                fig7.update_layout(
+                    height=340,
+                    yaxis_title="Mean Flood Probability",
+                    margin=dict(l=80, r=40, t=50, b=90)
+                )
+                fig7.update_yaxes(tickformat=".0%")
+            memory.put("figure", fig7_key, fig7, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig7, use_container_width=True)
+
+    with col_i:
+        st.markdown("""
+        <div class="interpretation-card">
+        <h4>📘 Interpretation</h4>
+        <p>
+        Probabilities come from the trained flood classifier applied to every
+        district-year's monthly rainfall, complementing the recorded flood events.
+        </p>
+        </div>
+        """, unsafe_allow_html=True)
+
 # =================================================
 # BY STATE TAB
 # =================================================
@@ -230,47 +332,61 @@ with tab_state:
 
     selected_state = st.selectbox(
         "Select State",
-        sorted(df["STATE_NAME"].unique()),
+        index.states(),
         key="overview_state_select"
     )
 
-    df_state = df[df["STATE_NAME"] == selected_state]
+    state_summary = summary["per_state"][selected_state]
+    state_floods = state_summary["flood_cases"]
+    state_avg_rain = round(state_summary["avg_annual_rainfall"], 1)
+    worst_district = state_summary["worst_district"] or "–"
+
+    with span("aggregation", PAGE):
+        df_state = index.state(selected_state)
 
-    state_floods = int(df_state["FLOOD"].sum())
-    state_avg_rain = round(df_state["TOTAL_ANNUAL"].mean(), 1)
-    worst_district = df_state[df_state["FLOOD"] == 1]["DISTRICT_NAME"].value_counts().idxmax()
+        state_flood_prob = aggregate(("state_flood_prob", selected_state, scores_version()), lambda: float(
+            scores.loc[scores["STATE_NAME"] == selected_state, "FLOOD_PROB"].mean()
+        ))
 
-    c1, c2, c3 = st.columns(3)
+    c1, c2, c3, c4 = st.columns(4)
     c1.markdown(f"<div class='metric-card'><small>Total Flood Events</small><h2>{state_floods}</h2></div>", unsafe_allow_html=True)
     c2.markdown(f"<div class='metric-card'><small>Avg Annual Rainfall</small><h2>{state_avg_rain} mm</h2></div>", unsafe_allow_html=True)
     c3.markdown(f"<div class='metric-card'><small>Most Flood-Prone District</small><h2>{worst_district}</h2></div>", unsafe_allow_html=True)
+    c4.markdown(f"<div class='metric-card'><small>Model Flood Probability</small><h2>{state_flood_prob:.0%}</h2></div>", unsafe_allow_html=True)
 
     # =================================================
     # CHART 1: FLOOD EVENTS BY DISTRICT
     # =================================================
-    district_floods = (
-        df_state[df_state["FLOOD"] == 1]
-        .groupby("DISTRICT_NAME")
-        .size()
-        .reset_index(name="Flood Events")
-        .sort_values("Flood Events", ascending=False)
-    )
+    with span("aggregation", PAGE):
+        district_floods = aggregate(("district_floods", selected_state), lambda: (
+            df_state[df_state["FLOOD"] == 1]
+            .groupby("DISTRICT_NAME")
+            .size()
+            .reset_index(name="Flood Events")
+            .sort_values("Flood Events", ascending=False)
+        ))
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig4 = px.bar(
-            district_floods,
-            x="DISTRICT_NAME",
-            y="Flood Events",
-            color="Flood Events",
-            color_continuous_scale="Reds"
-        )
-        fig4.update_layout(
-            height=330,
-            margin=dict(l=80, r=40, t=50, b=120)
-        )
-        st.plotly_chart(fig4, use_container_width=True)
+        fig4_key = (version, "fig4", selected_state)
+        fig4 = memory.get("figure", fig4_key, session)
+        if fig4 is None:
+            with span("figure_build", PAGE):
+                fig4 = px.bar(
+                    district_floods,
+                    x="DISTRICT_NAME",
+                    y="Flood Events",
+                    color="Flood Events",
+                    color_continuous_scale="Reds"
+                )
+                fig4.update_layout(
+                    height=330,
+                    margin=dict(l=80, r=40, t=50, b=120)
+                )
+            memory.put("figure", fig4_key, fig4, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig4, use_container_width=True)
 
         st.markdown("<div class='table-title'>Flood Events by District</div>", unsafe_allow_html=True)
         st.dataframe(district_floods, use_container_width=True, hide_index=True)
@@ -289,37 +405,47 @@ with tab_state:
     # =================================================
     # CHART 2: MONTHLY RAINFALL CONTRIBUTION
     # =================================================
-    monthly_sum = df_state[monthly_cols].sum().reset_index()
-    monthly_sum.columns = ["Month", "Rainfall"]
+    with span("aggregation", PAGE):
+        monthly_sum = aggregate(("monthly_sum", selected_state), lambda: (
+            df_state[monthly_cols].sum()
+            .rename_axis("Month")
+            .reset_index(name="Rainfall")
+        ))
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig5 = px.bar(
-            monthly_sum,
-            x="Month",
-            y="Rainfall",
-            color="Month",
-            text_auto=".2s",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-
-        fig5.update_layout(
-            title="Monthly Rainfall Contribution",
-            height=360,
-            xaxis_title="Month",
-            yaxis_title="Total Rainfall (mm)",
-            legend_title="Month",
-            legend=dict(
-                orientation="v",
-                y=0.5,
-                x=1.02,
-                xanchor="left"
-            ),
-            margin=dict(l=80, r=140, t=60, b=80)
-        )
-
-        st.plotly_chart(fig5, use_container_width=True)
+        fig5_key = (version, "fig5", selected_state)
+        fig5 = memory.get("figure", fig5_key, session)
+        if fig5 is None:
+            with span("figure_build", PAGE):
+                fig5 = px.bar(
+                    monthly_sum,
+                    x="Month",
+                    y="Rainfall",
+                    color="Month",
+                    text_auto=".2s",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+
+                fig5.update_layout(
+                    title="Monthly Rainfall Contribution",
+                    height=360,
+                    xaxis_title="Month",
+                    yaxis_title="Total Rainfall (mm)",
+                    legend_title="Month",
+                    legend=dict(
+                        orientation="v",
+                        y=0.5,
+                        x=1.02,
+                        xanchor="left"
+                    ),
+                    margin=dict(l=80, r=140, t=60, b=80)
+                )
+
+            memory.put("figure", fig5_key, fig5, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig5, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -336,23 +462,31 @@ with tab_state:
     # =================================================
     # CHART 3: FLOOD TREND BY YEAR
     # =================================================
-    flood_trend = df_state.groupby("YEAR")["FLOOD"].sum().reset_index()
+    with span("aggregation", PAGE):
+        flood_trend = aggregate(("flood_trend", selected_state),
+                                lambda: df_state.groupby("YEAR")["FLOOD"].sum().reset_index())
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig6 = px.bar(
-            flood_trend,
-            x="YEAR",
-            y="FLOOD",
-            color="FLOOD",
-            color_continuous_scale="Blues"
-        )
-        fig6.update_layout(
-            height=300,
-            margin=dict(l=80, r=40, t=50, b=80)
-        )
-        st.plotly_chart(fig6, use_container_width=True)
+        fig6_key = (version, "fig6", selected_state)
+        fig6 = memory.get("figure", fig6_key, session)
+        if fig6 is None:
+            with span("figure_build", PAGE):
+                fig6 = px.bar(
+                    flood_trend,
+                    x="YEAR",
+                    y="FLOOD",
+                    color="FLOOD",
+                    color_continuous_scale="Blues"
+                )
+                fig6.update_layout(
+                    height=300,
+                    margin=dict(l=80, r=40, t=50, b=80)
+                )
+            memory.put("figure", fig6_key, fig6, session)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig6, use_container_width=True)
 
         st.markdown("<div class='table-title'>Flood Trend by Year</div>", unsafe_allow_html=True)
         st.dataframe(flood_trend, use_container_width=True, hide_index=True)
@@ -368,6 +502,19 @@ with tab_state:
         </div>
         """, unsafe_allow_html=True)
 
+# =================================================
+# EXPORT
+# =================================================
+st.markdown("""
+<div class="card">
+<h3>📤 Export</h3>
+<p>Flood cases and rainfall per state and year, written state by state.</p>
+</div>
+""", unsafe_allow_html=True)
+
+render_export("state-year aggregates", "state_year_aggregates", (),
+              lambda: state_year_aggregates(index), "overview_export")
+
 # =================================================
 # FOOTER
 # =================================================
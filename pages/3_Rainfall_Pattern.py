@@ -1,10 +1,18 @@
 # pages/5_Rainfall_Pattern.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import os
 
+from utils.export import district_rainfall, render_export
+from utils.indexed import shared_index
+from utils.lazy import lazy_import
+from utils.tracing import span, start_exporter
+
+# Imported on first use, so the page shell renders before plotly loads.
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
+PAGE = "rainfall_pattern"
+
 # =================================================
 # PAGE CONFIG
 # =================================================
@@ -12,6 +20,7 @@ st.set_page_config(
     page_title="Rainfall Pattern Analysis",
     layout="wide"
 )
+start_exporter()
 
 # =================================================
 # LOAD CSS
@@ -27,22 +36,19 @@ load_css()
 # =================================================
 # LOAD DATA
 # =================================================
-@st.cache_data
 def load_data():
-    df = pd.read_csv("data/your_flood_data.csv")
-    df.columns = df.columns.str.strip()
-    return df
+    # One sorted, indexed frame shared by every session (read-only).
+    return shared_index()
 
-df = load_data()
+with span("data_load", PAGE):
+    index = load_data()
+    df = index.frame
 
 monthly_cols = [
     "JAN","FEB","MAR","APR","MAY","JUN",
     "JUL","AUG","SEP","OCT","NOV","DEC"
 ]
 
-df["TOTAL_ANNUAL"] = df[monthly_cols].sum(axis=1)
-df["YEAR"] = df["YEAR"].astype(int)
-
 # =================================================
 # HEADER (GLOBAL DASHBOARD HEADER KEKAL)
 # =================================================
@@ -84,7 +90,7 @@ with tab_overall:
     """, unsafe_allow_html=True)
 
     # -------- Year Range Slider (UNIQUE KEY) --------
-    year_min, year_max = df["YEAR"].min(), df["YEAR"].max()
+    year_min, year_max = index.year_min, index.year_max
     year_range = st.slider(
         "Select Year Range",
         int(year_min), int(year_max),
@@ -92,36 +98,37 @@ with tab_overall:
         key="overall_year_slider"
     )
 
-    df_sel = df[
-        (df["YEAR"] >= year_range[0]) &
-        (df["YEAR"] <= year_range[1])
-    ]
+    with span("aggregation", PAGE):
+        df_sel = index.year_range(year_range)
 
     # =================================================
     # CHART 1: ANNUAL RAINFALL TREND
     # =================================================
-    yearly = df_sel.groupby("YEAR")["TOTAL_ANNUAL"].sum().reset_index()
+    with span("aggregation", PAGE):
+        yearly = df_sel.groupby("YEAR")["TOTAL_ANNUAL"].sum().reset_index()
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig1 = px.line(
-            yearly,
-            x="YEAR",
-            y="TOTAL_ANNUAL",
-            markers=True
-        )
-        fig1.add_hline(
-            y=yearly["TOTAL_ANNUAL"].mean(),
-            line_dash="dot",
-            annotation_text="Long-Term Average"
-        )
-        fig1.update_layout(
-            height=320,
-            margin=dict(l=80, r=40, t=50, b=60)
-        )
-        fig1.update_yaxes(tickformat=",")
-        st.plotly_chart(fig1, use_container_width=True)
+        with span("figure_build", PAGE):
+            fig1 = px.line(
+                yearly,
+                x="YEAR",
+                y="TOTAL_ANNUAL",
+                markers=True
+            )
+            fig1.add_hline(
+                y=yearly["TOTAL_ANNUAL"].mean(),
+                line_dash="dot",
+                annotation_text="Long-Term Average"
+            )
+            fig1.update_layout(
+                height=320,
+                margin=dict(l=80, r=40, t=50, b=60)
+            )
+            fig1.update_yaxes(tickformat=",")
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig1, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -138,37 +145,40 @@ with tab_overall:
     # =================================================
     # CHART 2: 5-YEAR MOVING AVERAGE
     # =================================================
-    yearly["MA5"] = yearly["TOTAL_ANNUAL"].rolling(5, min_periods=1).mean()
+    with span("aggregation", PAGE):
+        yearly["MA5"] = yearly["TOTAL_ANNUAL"].rolling(5, min_periods=1).mean()
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig2 = go.Figure()
-        fig2.add_trace(go.Scatter(
-            x=yearly["YEAR"],
-            y=yearly["TOTAL_ANNUAL"],
-            mode="lines+markers",
-            name="Annual Rainfall"
-        ))
-        fig2.add_trace(go.Scatter(
-            x=yearly["YEAR"],
-            y=yearly["MA5"],
-            mode="lines",
-            name="5-Year Moving Average",
-            line=dict(color="red")
-        ))
-        fig2.update_layout(
-            height=320,
-            margin=dict(l=80, r=40, t=50, b=60),
-            legend=dict(
-                orientation="h",
-                y=1.05,
-                x=0.5,
-                xanchor="center"
+        with span("figure_build", PAGE):
+            fig2 = go.Figure()
+            fig2.add_trace(go.Scatter(
+                x=yearly["YEAR"],
+                y=yearly["TOTAL_ANNUAL"],
+                mode="lines+markers",
+                name="Annual Rainfall"
+            ))
+            fig2.add_trace(go.Scatter(
+                x=yearly["YEAR"],
+                y=yearly["MA5"],
+                mode="lines",
+                name="5-Year Moving Average",
+                line=dict(color="red")
+            ))
+            fig2.update_layout(
+                height=320,
+                margin=dict(l=80, r=40, t=50, b=60),
+                legend=dict(
+                    orientation="h",
+                    y=1.05,
+                    x=0.5,
+                    xanchor="center"
+                )
             )
-        )
-        fig2.update_yaxes(tickformat=",")
-        st.plotly_chart(fig2, use_container_width=True)
+            fig2.update_yaxes(tickformat=",")
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig2, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -185,25 +195,28 @@ with tab_overall:
     # =================================================
     # CHART 3: MONTHLY RAINFALL DISTRIBUTION
     # =================================================
-    monthly_total = df_sel[monthly_cols].sum().reset_index()
-    monthly_total.columns = ["Month", "Rainfall"]
+    with span("aggregation", PAGE):
+        monthly_total = df_sel[monthly_cols].sum().reset_index()
+        monthly_total.columns = ["Month", "Rainfall"]
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig3 = px.bar(
-            monthly_total,
-            x="Month",
-            y="Rainfall",
-            color="Month",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig3.update_layout(
-            height=320,
-            margin=dict(l=80, r=40, t=40, b=80)
-        )
-        fig3.update_yaxes(tickformat=",")
-        st.plotly_chart(fig3, use_container_width=True)
+        with span("figure_build", PAGE):
+            fig3 = px.bar(
+                monthly_total,
+                x="Month",
+                y="Rainfall",
+                color="Month",
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
+            fig3.update_layout(
+                height=320,
+                margin=dict(l=80, r=40, t=40, b=80)
+            )
+            fig3.update_yaxes(tickformat=",")
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig3, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -234,11 +247,12 @@ with tab_state:
 
     selected_state = st.selectbox(
         "Select State",
-        sorted(df["STATE_NAME"].unique()),
+        index.states(),
         key="state_select_rainfall"
     )
 
-    df_state = df[df["STATE_NAME"] == selected_state]
+    with span("aggregation", PAGE):
+        df_state = index.state(selected_state)
 
     year_min_s, year_max_s = df_state["YEAR"].min(), df_state["YEAR"].max()
     year_range_state = st.slider(
@@ -248,23 +262,24 @@ with tab_state:
         key="state_year_slider"
     )
 
-    df_state_sel = df_state[
-        (df_state["YEAR"] >= year_range_state[0]) &
-        (df_state["YEAR"] <= year_range_state[1])
-    ]
+    with span("aggregation", PAGE):
+        df_state_sel = index.year_range(year_range_state, selected_state)
 
     # =================================================
     # CHART 1: STATE YEARLY RAINFALL
     # =================================================
-    state_yearly = df_state_sel.groupby("YEAR")["TOTAL_ANNUAL"].sum().reset_index()
+    with span("aggregation", PAGE):
+        state_yearly = df_state_sel.groupby("YEAR")["TOTAL_ANNUAL"].sum().reset_index()
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig4 = px.line(state_yearly, x="YEAR", y="TOTAL_ANNUAL", markers=True)
-        fig4.update_layout(height=320)
-        fig4.update_yaxes(tickformat=",")
-        st.plotly_chart(fig4, use_container_width=True)
+        with span("figure_build", PAGE):
+            fig4 = px.line(state_yearly, x="YEAR", y="TOTAL_ANNUAL", markers=True)
+            fig4.update_layout(height=320)
+            fig4.update_yaxes(tickformat=",")
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig4, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -280,36 +295,39 @@ with tab_state:
     # =================================================
     # CHART 2: STATE 5-YEAR MOVING AVERAGE
     # =================================================
-    state_yearly["MA5"] = state_yearly["TOTAL_ANNUAL"].rolling(5, min_periods=1).mean()
+    with span("aggregation", PAGE):
+        state_yearly["MA5"] = state_yearly["TOTAL_ANNUAL"].rolling(5, min_periods=1).mean()
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig5 = go.Figure()
-        fig5.add_trace(go.Scatter(
-            x=state_yearly["YEAR"],
-            y=state_yearly["TOTAL_ANNUAL"],
-            mode="lines+markers",
-            name="Annual Rainfall"
-        ))
-        fig5.add_trace(go.Scatter(
-            x=state_yearly["YEAR"],
-            y=state_yearly["MA5"],
-            mode="lines",
-            name="5-Year Moving Average",
-            line=dict(color="red")
-        ))
-        fig5.update_layout(
-            height=320,
-            legend=dict(
-                orientation="h",
-                y=1.05,
-                x=0.5,
-                xanchor="center"
+        with span("figure_build", PAGE):
+            fig5 = go.Figure()
+            fig5.add_trace(go.Scatter(
+                x=state_yearly["YEAR"],
+                y=state_yearly["TOTAL_ANNUAL"],
+                mode="lines+markers",
+                name="Annual Rainfall"
+            ))
+            fig5.add_trace(go.Scatter(
+                x=state_yearly["YEAR"],
+                y=state_yearly["MA5"],
+                mode="lines",
+                name="5-Year Moving Average",
+                line=dict(color="red")
+            ))
+            fig5.update_layout(
+                height=320,
+                legend=dict(
+                    orientation="h",
+                    y=1.05,
+                    x=0.5,
+                    xanchor="center"
+                )
             )
-        )
-        fig5.update_yaxes(tickformat=",")
-        st.plotly_chart(fig5, use_container_width=True)
+            fig5.update_yaxes(tickformat=",")
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig5, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -325,32 +343,35 @@ with tab_state:
     # =================================================
     # CHART 3: STATE MONTHLY DISTRIBUTION
     # =================================================
-    state_monthly = df_state[monthly_cols].sum().reset_index()
-    state_monthly.columns = ["Month", "Rainfall"]
+    with span("aggregation", PAGE):
+        state_monthly = df_state[monthly_cols].sum().reset_index()
+        state_monthly.columns = ["Month", "Rainfall"]
 
     col_c, col_i = st.columns([3, 2])
 
     with col_c:
-        fig6 = px.bar(
-            state_monthly,
-            x="Month",
-            y="Rainfall",
-            color="Month",
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        fig6.update_layout(
-            height=340,
-            legend_title_text="Month",
-            legend=dict(
-                orientation="h",
-                y=-0.3,
-                x=0.5,
-                xanchor="center",
-            ),
-            margin=dict(b=140)
-        )
-        fig6.update_yaxes(tickformat=",")
-        st.plotly_chart(fig6, use_container_width=True)
+        with span("figure_build", PAGE):
+            fig6 = px.bar(
+                state_monthly,
+                x="Month",
+                y="Rainfall",
+                color="Month",
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            fig6.update_layout(
+                height=340,
+                legend_title_text="Month",
+                legend=dict(
+                    orientation="h",
+                    y=-0.3,
+                    x=0.5,
+                    xanchor="center",
+                ),
+                margin=dict(b=140)
+            )
+            fig6.update_yaxes(tickformat=",")
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig6, use_container_width=True)
 
     with col_i:
         st.markdown("""
@@ -363,6 +384,20 @@ with tab_state:
         </div>
         """, unsafe_allow_html=True)
 
+# =================================================
+# EXPORT
+# =================================================
+st.markdown(f"""
+<div class="card">
+<h3>📤 Export</h3>
+<p>Monthly rainfall for every district and year in {year_range[0]}–{year_range[1]}
+(the national year range above).</p>
+</div>
+""", unsafe_allow_html=True)
+
+render_export("district rainfall", "district_rainfall", (tuple(year_range),),
+              lambda: district_rainfall(index, year_range), "rainfall_export")
+
 # =================================================
 # FOOTER
 # =================================================
@@ -1,14 +1,37 @@
 import streamlit as st
-import pandas as pd
-import folium
-from streamlit_folium import st_folium
 import os
-import json
+
+from utils import jobs, memory, risk
+from utils.data import dataset_version
+from utils.flood_scores import scores_version, shared_flood_scores
+from utils.indexed import shared_index
+from utils.lazy import lazy_import
+from utils.maps import ALL_STATES, map_layers
+from utils.models import MIN_WINDOW
+from utils.outlook import DEFAULT_HORIZON, district_outlook, resolve_state, warm_outlooks
+from utils.page_profiler import profile_this_page
+from utils.spatial import shared_spatial_index
+from utils.tracing import span, start_exporter
+
+# Imported on first use: a cached map skips folium entirely, and a missing
+# GeoJSON stops the page before either library loads.
+folium = lazy_import("folium")
+np = lazy_import("numpy")
+streamlit_folium = lazy_import("streamlit_folium")
+
+PAGE = "interactive_map"
+
+# =================================================
+# PROFILING (admin only, ?profile=sample|cprofile)
+# =================================================
+if profile_this_page(__file__):
+    st.stop()
 
 # =================================================
 # PAGE CONFIG
 # =================================================
 st.set_page_config(page_title="Interactive Flood Map", layout="wide")
+start_exporter()
 
 # =================================================
 # LOAD CSS
@@ -55,13 +78,17 @@ state and year to identify flood-prone areas.
 # =================================================
 # LOAD DATA
 # =================================================
-@st.cache_data
 def load_data():
-    df = pd.read_csv("data/your_flood_data.csv")
-    df.columns = df.columns.str.strip()
-    return df
+    return shared_index()
+
+with span("data_load", PAGE):
+    index = load_data()
 
-df = load_data()
+def load_scores(version):
+    return shared_flood_scores(version)
+
+with span("data_load", PAGE):
+    scores = load_scores(dataset_version())
 
 # =================================================
 # GEOJSON
@@ -71,6 +98,16 @@ if not os.path.exists(geojson_path):
     st.error("GeoJSON file not found")
     st.stop()
 
+# =================================================
+# CLICK-TO-FORECAST (district lookup + warm forecasts)
+# =================================================
+PANEL_WINDOW = MIN_WINDOW
+PANEL_HORIZON = DEFAULT_HORIZON
+SESSION = memory.current_session()
+
+with span("data_load", PAGE):
+    spatial = shared_spatial_index(geojson_path)
+
 # =================================================
 # STATE CENTERS
 # =================================================
@@ -91,24 +128,6 @@ STATE_CENTERS = {
     "Wilayah Persekutuan": [3.15, 101.7],
 }
 
-# =================================================
-# FLOOD RISK LOGIC
-# =================================================
-def assign_flood_risk(rainfall):
-    if rainfall >= 3000:
-        return "High"
-    elif rainfall >= 2500:
-        return "Medium"
-    else:
-        return "Low"
-
-def popup_bg(risk):
-    return {
-        "High": "#f8d7da",
-        "Medium": "#fff3cd",
-        "Low": "#d4edda"
-    }.get(risk, "#ffffff")
-
 # =================================================
 # FILTER CONTROLS
 # =================================================
@@ -117,30 +136,30 @@ col1, col2 = st.columns(2)
 with col1:
     state_to_map = st.selectbox(
         "Select State",
-        ["All States"] + sorted(df["STATE_NAME"].unique())
+        [ALL_STATES] + index.states()
     )
 
 with col2:
     year_to_map = st.selectbox(
         "Select Year",
-        sorted(df["YEAR"].unique())
+        index.years()
+    )
+
+# Forecast every district in view in the background, so a click only
+# reads precomputed windows and forecasts.
+warm_states = index.states() if state_to_map == ALL_STATES else [state_to_map]
+warm_inputs = (dataset_version(), tuple(warm_states), PANEL_WINDOW, PANEL_HORIZON)
+warm_job = jobs.current(SESSION, "map_warm")
+if warm_job is None or warm_job.inputs != warm_inputs:
+    jobs.submit(
+        SESSION, "map_warm", warm_outlooks, index, warm_states, PANEL_WINDOW, PANEL_HORIZON,
+        inputs=warm_inputs, total=len(warm_states), label="Forecast warm-up"
     )
 
 # =================================================
-# FILTER & AGGREGATE DATA
+# MAP VIEW
 # =================================================
-map_df = df[df["YEAR"] == year_to_map].copy()
-
-map_df = (
-    map_df
-    .groupby(["STATE_NAME", "DISTRICT_NAME"], as_index=False)
-    .agg({"ANNUAL RAINFALL": "mean"})
-)
-
-map_df["flood_risk"] = map_df["ANNUAL RAINFALL"].apply(assign_flood_risk)
-
-if state_to_map != "All States":
-    map_df = map_df[map_df["STATE_NAME"] == state_to_map]
+if state_to_map != ALL_STATES:
     center = STATE_CENTERS.get(state_to_map, [4.2, 101.9])
     zoom = 7
 else:
@@ -148,97 +167,162 @@ else:
     zoom = 6
 
 # =================================================
-# LOAD & FILTER GEOJSON
+# MAP (built once per state/year, kept in the budgeted map cache)
 # =================================================
-with open(geojson_path, encoding="utf-8") as f:
-    geojson_data = json.load(f)
+session = memory.current_session()
+map_key = (dataset_version(), scores_version(), state_to_map, year_to_map)
+m = memory.get("map", map_key, session)
 
-valid_districts = set(map_df["DISTRICT_NAME"])
-geojson_data["features"] = [
-    f for f in geojson_data["features"]
-    if f["properties"]["NAME_2"] in valid_districts
-]
+if m is None:
+    # =================================================
+    # FILTER & AGGREGATE DATA (persisted across restarts)
+    # =================================================
+    with span("aggregation", PAGE):
+        map_df, geojson_data = map_layers(index, scores, state_to_map, year_to_map, geojson_path)
+        lookup = map_df.set_index("DISTRICT_NAME").to_dict("index")
 
-lookup = map_df.set_index("DISTRICT_NAME").to_dict("index")
+    # =================================================
+    # MAP
+    # =================================================
+    with span("map_build", PAGE):
+        m = folium.Map(location=center, zoom_start=zoom, tiles="CartoDB positron")
 
-# =================================================
-# MAP
-# =================================================
-m = folium.Map(location=center, zoom_start=zoom, tiles="CartoDB positron")
+        # ===== CHOROPLETH (Annual Rainfall + BLACK BORDER) =====
+        folium.Choropleth(
+            geo_data=geojson_data,
+            data=map_df,
+            columns=["DISTRICT_NAME", "ANNUAL RAINFALL"],
+            key_on="feature.properties.NAME_2",
+            fill_color="YlGnBu",
+            fill_opacity=0.85,
+            line_color="black",      
+            line_weight=0.5,         
+            line_opacity=1,
+            nan_fill_color="transparent",
+            legend_name="Annual Rainfall (mm)"
+        ).add_to(m)
 
-# ===== CHOROPLETH (Annual Rainfall + BLACK BORDER) =====
-folium.Choropleth(
-    geo_data=geojson_data,
-    data=map_df,
-    columns=["DISTRICT_NAME", "ANNUAL RAINFALL"],
-    key_on="feature.properties.NAME_2",
-    fill_color="YlGnBu",
-    fill_opacity=0.85,
-    line_color="black",      
-    line_weight=0.5,         
-    line_opacity=1,
-    nan_fill_color="transparent",
-    legend_name="Annual Rainfall (mm)"
-).add_to(m)
+        # ===== CUSTOM POPUP (COLORED BY FLOOD RISK) =====
+        for feature in geojson_data["features"]:
+            d = feature["properties"]["NAME_2"]
+            row = lookup[d]
+            bg = row["popup_bg"]
 
-# ===== CUSTOM POPUP (COLORED BY FLOOD RISK) =====
-for feature in geojson_data["features"]:
-    d = feature["properties"]["NAME_2"]
-    row = lookup[d]
-    bg = popup_bg(row["flood_risk"])
+            html = f"""
+            <div style="
+                background:{bg};
+                padding:10px;
+                border-radius:6px;
+                font-size:14px;
+                min-width:200px;">
+                <b>State:</b> {row["STATE_NAME"]}<br>
+                <b>District:</b> {d}<br>
+                <b>Annual Rainfall:</b> {round(row["ANNUAL RAINFALL"],2)} mm<br>
+                <b>Flood Risk:</b> {row["flood_risk"]}<br>
+                <b>Model Flood Probability:</b> {row["FLOOD_PROB"]:.0%}
+            </div>
+            """
 
-    html = f"""
-    <div style="
-        background:{bg};
-        padding:10px;
-        border-radius:6px;
+            folium.GeoJson(
+                feature,
+                style_function=lambda x: {
+                    "fillOpacity": 0,
+                    "weight": 0,
+                    "color": "transparent"
+                },
+                popup=folium.Popup(html, max_width=300)
+            ).add_to(m)
+
+        # =================================================
+        # FLOOD RISK LEGEND
+        # =================================================
+        legend_swatches = risk.colors([risk.HIGH, risk.MEDIUM, risk.LOW], "legend")
+        legend_rows = "<br>\n".join(
+            f'<span style="color:{color};">■</span> {name.replace("<", "&lt;")}'
+            for color, name in zip(legend_swatches, risk.legend_names("annual"))
+        )
+        legend_html = f"""
+        <div style="
+        position: fixed;
+        bottom: 40px;
+        left: 40px;
+        width: 260px;
+        background-color: white;
+        border: 2px solid grey;
+        z-index:9999;
         font-size:14px;
-        min-width:200px;">
-        <b>State:</b> {row["STATE_NAME"]}<br>
-        <b>District:</b> {d}<br>
-        <b>Annual Rainfall:</b> {round(row["ANNUAL RAINFALL"],2)} mm<br>
-        <b>Flood Risk:</b> {row["flood_risk"]}
+        padding: 10px;
+        border-radius: 6px;
+        ">
+        <b>Flood Risk Level</b><br>
+        {legend_rows}
+        </div>
+        """
+        m.get_root().html.add_child(folium.Element(legend_html))
+
+    memory.put("map", map_key, m, session)
+
+# =================================================
+# DISTRICT PANEL
+# =================================================
+def district_panel(click):
+    if not click:
+        st.info("👆 Click a district to see its latest rainfall and forecast.")
+        return
+
+    with span("click_lookup", PAGE):
+        hit = spatial.locate(click["lat"], click["lng"])
+    if hit is None:
+        st.info("No district at this point.")
+        return
+    state = resolve_state(index, hit["district"], hit["state"])
+    outlook = None
+    if state is not None:
+        with span("click_forecast", PAGE):
+            outlook = district_outlook(index, scores, state, hit["district"], PANEL_WINDOW, PANEL_HORIZON)
+    if outlook is None:
+        st.warning(f"No {PANEL_WINDOW}-month forecaster or too little history for {hit['district']}.")
+        return
+
+    st.markdown(f"""
+    <div class="card">
+    <h4>📍 {outlook["district"]}, {outlook["state"]}</h4>
     </div>
-    """
-
-    folium.GeoJson(
-        feature,
-        style_function=lambda x: {
-            "fillOpacity": 0,
-            "weight": 0,
-            "color": "transparent"
-        },
-        popup=folium.Popup(html, max_width=300)
-    ).add_to(m)
-
-# =================================================
-# FLOOD RISK LEGEND
-# =================================================
-legend_html = """
-<div style="
-position: fixed;
-bottom: 40px;
-left: 40px;
-width: 260px;
-background-color: white;
-border: 2px solid grey;
-z-index:9999;
-font-size:14px;
-padding: 10px;
-border-radius: 6px;
-">
-<b>Flood Risk Level</b><br>
-<span style="color:#dc3545;">■</span> High Risk (≥ 3000 mm)<br>
-<span style="color:#ffc107;">■</span> Medium Risk (2500–2999 mm)<br>
-<span style="color:#28a745;">■</span> Low Risk (&lt; 2500 mm)
-</div>
-"""
-m.get_root().html.add_child(folium.Element(legend_html))
+    """, unsafe_allow_html=True)
+    if outlook["flood_prob"] is not None:
+        st.metric(f"Model Flood Probability ({outlook['last_year']})", f"{outlook['flood_prob']:.0%}")
+
+    st.markdown(f"**Next {PANEL_HORIZON} Months ({PANEL_WINDOW}-month state model)**")
+    row_css = np.char.add(np.char.add("background-color:", risk.colors(outlook["risk_codes"])), "; color:white")
+    st.dataframe(
+        outlook["forecast"].style.apply(lambda _: row_css, subset=["Flood Risk"]),
+        hide_index=True, use_container_width=True
+    )
+
+    st.markdown(f"**Observed Rainfall ({outlook['last_year']})**")
+    st.dataframe(outlook["observed"], hide_index=True, use_container_width=True, height=250)
+
 
 # =================================================
 # DISPLAY
 # =================================================
-st_folium(m, height=650, width="100%")
+# A click reruns only this fragment: the cached map object is handed to
+# st_folium unchanged (so the browser keeps its Leaflet map) and only the
+# side panel is recomputed.
+@st.fragment
+def map_with_panel(m, map_key):
+    map_col, panel_col = st.columns([3, 1])
+    with map_col:
+        with span("map_render", PAGE):
+            clicked = streamlit_folium.st_folium(
+                m, height=650, width="100%",
+                returned_objects=["last_clicked"], key="map_" + "_".join(map(str, map_key))
+            )
+    with panel_col:
+        district_panel((clicked or {}).get("last_clicked"))
+
+
+map_with_panel(m, map_key)
 
 # =================================================
 # FOOTER
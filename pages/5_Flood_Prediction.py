@@ -1,14 +1,50 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 import os
-import joblib
-import plotly.graph_objects as go
+
+from utils import disk_cache, jobs, memory, nowcast, risk
+from utils.export import district_forecasts, render_export
+from utils.forecast import exceedance_probability, forecast_distribution, percentile_bands
+from utils.indexed import shared_index
+from utils.lazy import lazy_import
+from utils.lstm import (
+    FLOOD_LSTM_PATH,
+    FORECAST_LSTM_PATH,
+    LSTMFloodClassifier,
+    LSTMRainfallForecaster,
+    serving_problems,
+)
+from utils.models import (
+    MODEL_DIR,
+    STATE_SUMMARY_CSV,
+    load_model,
+    load_state_forecaster,
+    model_available,
+    model_version,
+    overall_model_path,
+    per_window_model_path,
+)
+from utils.page_profiler import profile_this_page
+from utils.scenarios import latest_window, outlook_table, simulate, state_anomalies
+from utils.tracing import span, start_exporter
+
+# Imported on first use, so the page shell renders before these load.
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+go = lazy_import("plotly.graph_objects")
+
+PAGE = "flood_prediction"
+
+# =================================================
+# PROFILING (admin only, ?profile=sample|cprofile)
+# =================================================
+if profile_this_page(__file__):
+    st.stop()
 
 # =================================================
 # PAGE CONFIG
 # =================================================
 st.set_page_config(page_title="Flood Prediction", layout="wide")
+start_exporter()
 
 # =================================================
 # LOAD CSS
@@ -43,70 +79,45 @@ using Random Forest models trained on historical rainfall data.
 # =================================================
 # LOAD DATA
 # =================================================
-@st.cache_data
 def load_data():
-    df = pd.read_csv("data/your_flood_data.csv")
-    df.columns = df.columns.str.strip()
-    return df
+    # One sorted, indexed frame shared by every session (read-only).
+    return shared_index()
 
-df = load_data()
+with span("data_load", PAGE):
+    index = load_data()
+    df = index.frame
 
 monthly_cols = [
     "JAN","FEB","MAR","APR","MAY","JUN",
     "JUL","AUG","SEP","OCT","NOV","DEC"
 ]
 
-df["ANNUAL_RAINFALL"] = df[monthly_cols].sum(axis=1)
+model_dir = MODEL_DIR
+state_csv = STATE_SUMMARY_CSV
 
-model_dir = "rf_models"
-state_csv = os.path.join(model_dir, "state_model_summary.csv")
+@st.cache_resource
+def load_lstm_models():
+    if not (os.path.exists(FORECAST_LSTM_PATH) and os.path.exists(FLOOD_LSTM_PATH)):
+        return None, None
+    return LSTMRainfallForecaster(), LSTMFloodClassifier()
 
 # =================================================
 # FLOOD RISK RULES
 # =================================================
-def flood_risk_label(val):
-    if val >= 350:
-        return "High Risk"
-    elif val >= 250:
-        return "Medium Risk"
-    else:
-        return "Low Risk"
-
-def flood_risk_color(val):
-    if val >= 350:
-        return "#d62828"
-    elif val >= 250:
-        return "#f77f00"
-    else:
-        return "#2a9d8f"
-
-def monthly_risk_shapes():
-    return [
-        dict(type="rect", xref="paper", yref="y", x0=0, x1=1, y0=350, y1=800,
-             fillcolor="#d62828", opacity=0.25, layer="below", line_width=0),
-        dict(type="rect", xref="paper", yref="y", x0=0, x1=1, y0=250, y1=350,
-             fillcolor="#f77f00", opacity=0.25, layer="below", line_width=0),
-        dict(type="rect", xref="paper", yref="y", x0=0, x1=1, y0=0, y1=250,
-             fillcolor="#2a9d8f", opacity=0.25, layer="below", line_width=0),
-    ]
-
-def annual_risk_shapes():
-    return [
-        dict(type="rect", xref="paper", yref="y",
-             x0=0, x1=1, y0=3000, y1=4000,
-             fillcolor="#d62828", opacity=0.22, layer="below", line_width=0),
-        dict(type="rect", xref="paper", yref="y",
-             x0=0, x1=1, y0=2500, y1=3000,
-             fillcolor="#f77f00", opacity=0.22, layer="below", line_width=0),
-        dict(type="rect", xref="paper", yref="y",
-             x0=0, x1=1, y0=0, y1=2500,
-             fillcolor="#2a9d8f", opacity=0.22, layer="below", line_width=0),
-    ]
+def risk_legend_traces(fig, scale, state=None):
+    codes = [risk.HIGH, risk.MEDIUM, risk.LOW]
+    for name, color in zip(risk.legend_names(scale, state), risk.colors(codes)):
+        fig.add_trace(go.Scatter(
+            x=[None], y=[None],
+            mode="markers",
+            marker=dict(size=12, color=color),
+            name=name
+        ))
 
 # =================================================
 # PREDICTION CHART
 # =================================================
-def prediction_chart(input_vals, preds, start_month, title):
+def prediction_chart(input_vals, preds, start_month, title, bands=None, state=None):
 
     fig = go.Figure()
 
@@ -118,8 +129,25 @@ def prediction_chart(input_vals, preds, start_month, title):
         line=dict(color="#6366f1", width=3)
     ))
 
+    pred_x = list(range(start_month, start_month+len(preds)))
+
+    # ---- Per-tree percentile bands (outer band first so the inner one sits on top) ----
+    if bands is not None:
+        for lo, hi, fill in [(10, 90, "rgba(17,24,39,0.12)"), (25, 75, "rgba(17,24,39,0.25)")]:
+            fig.add_trace(go.Scatter(
+                x=pred_x, y=bands[hi],
+                mode="lines", line=dict(width=0),
+                showlegend=False, hoverinfo="skip"
+            ))
+            fig.add_trace(go.Scatter(
+                x=pred_x, y=bands[lo],
+                mode="lines", line=dict(width=0),
+                fill="tonexty", fillcolor=fill,
+                name=f"P{lo}–P{hi} band"
+            ))
+
     fig.add_trace(go.Scatter(
-        x=list(range(start_month, start_month+len(preds))),
+        x=pred_x,
         y=preds,
         mode="lines+markers",
         name="Predicted Rainfall",
@@ -127,32 +155,13 @@ def prediction_chart(input_vals, preds, start_month, title):
     ))
 
     # ---- Flood Risk legend entries (IMPORTANT) ----
-    fig.add_trace(go.Scatter(
-        x=[None], y=[None],
-        mode="markers",
-        marker=dict(size=12, color="#d62828"),
-        name="High Risk (≥350 mm)"
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=[None], y=[None],
-        mode="markers",
-        marker=dict(size=12, color="#f77f00"),
-        name="Medium Risk (250–349 mm)"
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=[None], y=[None],
-        mode="markers",
-        marker=dict(size=12, color="#2a9d8f"),
-        name="Low Risk (<250 mm)"
-    ))
+    risk_legend_traces(fig, "monthly", state)
 
     fig.update_layout(
         title=title,
         xaxis_title="Month",
         yaxis_title="Rainfall (mm)",
-        shapes=monthly_risk_shapes(),
+        shapes=risk.risk_shapes("monthly", state, y_max=800),
         yaxis=dict(range=[0, 800]),
         height=420,
         legend=dict(
@@ -168,6 +177,131 @@ def prediction_chart(input_vals, preds, start_month, title):
     return fig
 
 
+# =================================================
+# PREDICTION JOBS (shared worker pool, polled by a fragment)
+# =================================================
+SESSION = memory.current_session()
+
+
+def traced_forecast(model, monthly_input, n_predict, cache_key, progress=None):
+    # Forecasts are deterministic for a model version and input, so they are
+    # kept on disk and a repeated request (even after a restart) is instant.
+    result = disk_cache.get("forecast", cache_key)
+    if result is None:
+        with span("predict", PAGE):
+            result = forecast_distribution(model, monthly_input, n_predict, progress=progress)
+        disk_cache.put("forecast", cache_key, result)
+    return result
+
+
+def submit_prediction(slot, model, model_path, monthly_input, n_predict, inputs, label):
+    cache_key = (os.path.basename(model_path), model_version(model_path), inputs)
+    jobs.submit(
+        SESSION, slot, traced_forecast, model, list(monthly_input), n_predict, cache_key,
+        inputs=inputs, total=n_predict, label=label
+    )
+
+
+@st.fragment(run_every=0.5)
+def prediction_progress(slot):
+    job = jobs.current(SESSION, slot)
+    if job is None or job.done():
+        st.rerun()
+    st.progress(job.fraction(), text=f"{job.label}: step {job.step}/{job.total} ({job.status})")
+    if st.button("✖ Cancel", key=f"{slot}_cancel"):
+        jobs.discard(SESSION, slot)
+        st.rerun()
+
+
+def show_job(slot, inputs, render):
+    """Render the slot's job: progress while it runs, ``render(result)`` once done.
+
+    A job whose inputs no longer match the widgets is superseded and cancelled.
+    """
+    job = jobs.current(SESSION, slot)
+    if job is None:
+        return
+    if job.inputs != inputs:
+        jobs.discard(SESSION, slot)
+        return
+    if not job.done():
+        prediction_progress(slot)
+        return
+    if job.status == "cancelled":
+        st.info("Prediction cancelled.")
+    elif job.status == "failed":
+        st.error(f"❌ Prediction failed: {job.future.exception()}")
+    else:
+        render(job.future.result())
+
+
+def show_prediction(slot, inputs, monthly_input, title, state=None):
+    show_job(slot, inputs, lambda result: render_forecast(monthly_input, result[0], title, result[1], state))
+
+
+def run_lstm(forecaster, flood_model, lstm_input, progress=None):
+    with span("predict", PAGE):
+        preds = forecaster.predict([lstm_input])[0]
+        if progress is not None:
+            progress(1, 2)
+        flood_prob = float(flood_model.predict_proba([lstm_input])[0])
+    return preds, flood_prob
+
+
+def run_scenarios(model, df_state, state, n_input, n_scenarios, progress=None):
+    window, first_month = latest_window(df_state, state, n_input)
+    with span("predict", PAGE):
+        paths = simulate(
+            model, window, state_anomalies(df_state, state),
+            horizon=12, n_scenarios=n_scenarios, first_month=first_month, progress=progress
+        )
+    return outlook_table(state, paths, first_month, threshold=risk.thresholds("monthly", state)[1])
+
+
+# =================================================
+# PREDICTION OUTPUT
+# =================================================
+def render_forecast(monthly_input, preds, title, trees=None, state=None):
+    start_month = len(monthly_input) + 1
+    with span("risk_classification", PAGE):
+        codes = risk.classify(preds, "monthly", state)
+    medium_mm, high_mm = risk.thresholds("monthly", state)
+
+    result_df = pd.DataFrame({
+        "Month": [f"Month {start_month+i}" for i in range(len(preds))],
+        "Predicted Rainfall (mm)": np.round(preds, 2),
+        "Flood Risk": risk.labels(codes, " Risk"),
+    })
+    if trees is not None:
+        result_df["P(≥ Medium)"] = np.round(exceedance_probability(trees, medium_mm), 2)
+        result_df["P(High)"] = np.round(exceedance_probability(trees, high_mm), 2)
+
+    row_css = np.char.add(np.char.add("background-color:", risk.colors(codes)), "; color:white")
+    cell_css = pd.DataFrame(
+        np.repeat(row_css[:, None], result_df.shape[1], axis=1),
+        index=result_df.index,
+        columns=result_df.columns
+    )
+    styled = result_df.style.apply(lambda _: cell_css, axis=None)
+
+    st.markdown("<div class='card'><h4>📊 Prediction Output</h4></div>", unsafe_allow_html=True)
+    st.dataframe(styled, use_container_width=True)
+    if trees is not None:
+        st.caption(
+            "P(≥ Medium) and P(High) are the share of the forest's trees forecasting "
+            f"at least {medium_mm:.0f} mm and {high_mm:.0f} mm for that month."
+        )
+
+    with span("figure_build", PAGE):
+        fig_pred = prediction_chart(
+            monthly_input, preds, start_month, title,
+            bands=percentile_bands(trees) if trees is not None else None,
+            state=state
+        )
+    with span("chart_render", PAGE):
+        st.plotly_chart(fig_pred, use_container_width=True)
+
+
 # =================================================
 # TABS
 # =================================================
@@ -191,54 +325,57 @@ with tab_overall:
     # ===== Annual Rainfall Trend =====
     with tab_overall:
 
-        yearly = df.groupby("YEAR")["ANNUAL_RAINFALL"].mean().reset_index()
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=yearly["YEAR"],
-            y=yearly["ANNUAL_RAINFALL"],
-            mode="lines+markers",
-            name="Avg Annual Rainfall",
-            line=dict(color="#2563eb", width=3)
-        ))
-
-        # Legend entries for risk
-        fig.add_trace(go.Scatter(x=[None], y=[None], mode="markers",
-            marker=dict(size=12, color="#d62828"), name="High Risk (≥3000 mm)"))
-        fig.add_trace(go.Scatter(x=[None], y=[None], mode="markers",
-            marker=dict(size=12, color="#f77f00"), name="Medium Risk (2500–2999 mm)"))
-        fig.add_trace(go.Scatter(x=[None], y=[None], mode="markers",
-            marker=dict(size=12, color="#2a9d8f"), name="Low Risk (<2500 mm)"))
-
-        fig.update_layout(
-            title="Average Annual Rainfall (Malaysia)",
-            xaxis_title="Year",
-            yaxis_title="Rainfall (mm)",
-            yaxis=dict(range=[0, 3500]),
-            shapes=annual_risk_shapes(),
-            height=420,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.15,
-                xanchor="center",
-                x=0.5
-            ),
-            margin=dict(t=120)
-        )
+        with span("aggregation", PAGE):
+            yearly = df.groupby("YEAR")["TOTAL_ANNUAL"].mean().reset_index()
+
+        with span("figure_build", PAGE):
+            fig = go.Figure()
+
+            fig.add_trace(go.Scatter(
+                x=yearly["YEAR"],
+                y=yearly["TOTAL_ANNUAL"],
+                mode="lines+markers",
+                name="Avg Annual Rainfall",
+                line=dict(color="#2563eb", width=3)
+            ))
+
+            # Legend entries for risk
+            risk_legend_traces(fig, "annual")
+
+            fig.update_layout(
+                title="Average Annual Rainfall (Malaysia)",
+                xaxis_title="Year",
+                yaxis_title="Rainfall (mm)",
+                yaxis=dict(range=[0, 3500]),
+                shapes=risk.risk_shapes("annual", y_max=4000, opacity=0.22),
+                height=420,
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.15,
+                    xanchor="center",
+                    x=0.5
+                ),
+                margin=dict(t=120)
+            )
 
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig, use_container_width=True)
 
     # ===== INPUT =====
         n_input = st.slider("Number of past months used as input", 6, 11, 6, key="overall_input")
 
-        model_file = os.path.join(model_dir, f"rf_overall_{n_input}m.sav")
+        model_file = overall_model_path(n_input)
 
-        if not os.path.exists(model_file):
-            st.warning("⚠️ Overall Random Forest model not found.")
+        if not model_available(model_file):
+            st.warning(
+                f"⚠️ Overall Random Forest model for {n_input} months not found. "
+                "Train it with `python -m scripts.train_global`, then rebuild the bundle "
+                "with `python -m scripts.build_bundle`."
+            )
         else:
-            model = joblib.load(model_file)
+            with span("model_load", PAGE):
+                model = load_model(model_file)
             st.success("✅ Overall RF model loaded")
 
             monthly_input = []
@@ -257,38 +394,60 @@ with tab_overall:
 
             n_predict = st.slider("Number of future months to predict", 1, 12, 6, key="overall_predict")
 
+            overall_inputs = (n_input, tuple(monthly_input), n_predict)
             if st.button("🔮 Predict Malaysia Rainfall"):
-                seq = monthly_input.copy()
-                preds = []
-
-                for _ in range(n_predict):
-                    p = model.predict([seq[-n_input:]])[0]
-                    preds.append(p)
-                    seq.append(p)
-
-                start_month = n_input + 1
-
-                result_df = pd.DataFrame({
-                    "Month": [f"Month {start_month+i}" for i in range(n_predict)],
-                    "Predicted Rainfall (mm)": np.round(preds, 2),
-                    "Flood Risk": [flood_risk_label(p) for p in preds]
-                })
-
-                styled = result_df.style.apply(
-                    lambda r: [
-                        f"background-color:{flood_risk_color(r['Predicted Rainfall (mm)'])}; color:white"
-                    ] * len(r),
-                    axis=1
-                )
+                submit_prediction("overall_predict", model, model_file, monthly_input, n_predict,
+                                  overall_inputs, "Malaysia forecast")
+            show_prediction(
+                "overall_predict", overall_inputs, monthly_input,
+                "Rainfall Prediction with Flood Risk Zones (Malaysia)"
+            )
 
-                st.markdown("<div class='card'><h4>📊 Prediction Output</h4></div>", unsafe_allow_html=True)
-                st.dataframe(styled, use_container_width=True)
+    # ===== LSTM FORECASTER =====
+        with st.expander("🧠 LSTM forecaster (12-month input, NumPy inference)"):
+            lstm_problems = serving_problems()
+            if lstm_problems:
+                st.info("The LSTM forecaster is disabled until its models are scaled and verified:\n\n"
+                        + "\n".join(f"- {p}" for p in lstm_problems))
+            else:
+                with span("model_load", PAGE):
+                    lstm_forecaster, lstm_flood = load_lstm_models()
+
+                latest_year = index.year(index.year_max)[monthly_cols].mean()
+                lstm_input = []
+                cols = st.columns(6)
+                for i, month in enumerate(monthly_cols):
+                    with cols[i % 6]:
+                        lstm_input.append(
+                            st.number_input(
+                                f"{month} (mm)",
+                                min_value=0.0,
+                                value=float(round(latest_year[month], 1)),
+                                step=1.0,
+                                key=f"lstm_val_{i}"
+                            )
+                        )
 
-                fig_pred = prediction_chart(
-                    monthly_input, preds, start_month,
-                    "Rainfall Prediction with Flood Risk Zones (Malaysia)"
-                )
-                st.plotly_chart(fig_pred, use_container_width=True)
+                lstm_inputs = tuple(lstm_input)
+                if st.button("🔮 Predict next 12 months (LSTM)"):
+                    jobs.submit(
+                        SESSION, "lstm_predict", run_lstm, lstm_forecaster, lstm_flood, lstm_input,
+                        inputs=lstm_inputs, total=2, label="LSTM forecast"
+                    )
+
+                def render_lstm(result):
+                    lstm_preds, flood_prob = result
+                    st.markdown(
+                        f"<div class='metric-card'><small>LSTM Flood Probability (input year)</small>"
+                        f"<h2>{flood_prob:.0%}</h2></div>",
+                        unsafe_allow_html=True
+                    )
+                    render_forecast(
+                        lstm_input, lstm_preds,
+                        "LSTM Rainfall Prediction with Flood Risk Zones (Malaysia)"
+                    )
+
+                show_job("lstm_predict", lstm_inputs, render_lstm)
 
 # =================================================
 # ================= BY STATE =================
@@ -303,132 +462,220 @@ with tab_state:
 
     if not os.path.exists(state_csv):
         st.warning("⚠️ State model summary not found.")
-        st.stop()
-
-    summary_df = pd.read_csv(state_csv)
-
-    selected_state = st.selectbox(
-        "Select State",
-        summary_df["State"].unique(),
-        key="state_select"
-    )
-
-    df_state = df[df["STATE_NAME"] == selected_state]
-    yearly_state = df_state.groupby("YEAR")["ANNUAL_RAINFALL"].mean().reset_index()
+    else:
+        summary_df = pd.read_csv(state_csv)
 
-    fig_state = go.Figure()
+        selected_state = st.selectbox(
+            "Select State",
+            summary_df["State"].unique(),
+            key="state_select"
+        )
 
-    fig_state.add_trace(go.Scatter(
-        x=yearly_state["YEAR"],
-        y=yearly_state["ANNUAL_RAINFALL"],
-        mode="lines+markers",
-        name="Avg Annual Rainfall",
-        line=dict(color="#2563eb", width=3)
-    ))
+        with span("aggregation", PAGE):
+            df_state = index.state(selected_state)
+            yearly_state = df_state.groupby("YEAR")["TOTAL_ANNUAL"].mean().reset_index()
+
+        with span("figure_build", PAGE):
+            fig_state = go.Figure()
+
+            fig_state.add_trace(go.Scatter(
+                x=yearly_state["YEAR"],
+                y=yearly_state["TOTAL_ANNUAL"],
+                mode="lines+markers",
+                name="Avg Annual Rainfall",
+                line=dict(color="#2563eb", width=3)
+            ))
+
+            risk_legend_traces(fig_state, "annual", selected_state)
+
+            fig_state.update_layout(
+                title=f"Annual Rainfall Trend – {selected_state}",
+                xaxis_title="Year",
+                yaxis_title="Rainfall (mm)",
+                yaxis=dict(range=[0, 3500]),
+                shapes=risk.risk_shapes("annual", selected_state, y_max=4000, opacity=0.22),
+                height=420,
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.15,
+                    xanchor="center",
+                    x=0.5
+                ),
+                margin=dict(t=120)
+            )
 
-    fig_state.add_trace(go.Scatter(x=[None], y=[None], mode="markers",
-        marker=dict(size=12, color="#d62828"), name="High Risk (≥3000 mm)"))
-    fig_state.add_trace(go.Scatter(x=[None], y=[None], mode="markers",
-        marker=dict(size=12, color="#f77f00"), name="Medium Risk (2500–2999 mm)"))
-    fig_state.add_trace(go.Scatter(x=[None], y=[None], mode="markers",
-        marker=dict(size=12, color="#2a9d8f"), name="Low Risk (<2500 mm)"))
+        with span("chart_render", PAGE):
+            st.plotly_chart(fig_state, use_container_width=True)
 
-    fig_state.update_layout(
-        title=f"Annual Rainfall Trend – {selected_state}",
-        xaxis_title="Year",
-        yaxis_title="Rainfall (mm)",
-        yaxis=dict(range=[0, 3500]),
-        shapes=annual_risk_shapes(),
-        height=420,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.15,
-            xanchor="center",
-            x=0.5
-        ),
-        margin=dict(t=120)
-    )
+        n_input = st.slider("Number of past months used as input", 6, 11, 6, key="state_input")
 
-    st.plotly_chart(fig_state, use_container_width=True)
+        model_variant = st.radio(
+            "Model variant",
+            ["Per-window model", "Variable-window model", "National model"],
+            horizontal=True,
+            key="state_model_variant",
+            help="The variable-window model serves every input length from one forest; "
+                 "the national model serves every state from one forest."
+        )
+        variant = {
+            "Variable-window model": "variable_window",
+            "National model": "global",
+        }.get(model_variant, "per_window")
+
+        with span("model_load", PAGE):
+            model, model_path = load_state_forecaster(summary_df, selected_state, n_input, variant)
+
+        if model_path is None:
+            st.warning("⚠️ Model not available.")
+        elif model is None:
+            st.error(f"❌ Model file not found: {os.path.basename(model_path)}")
+        else:
+            st.success(f"✅ Model loaded: {os.path.basename(model_path)}")
 
-    n_input = st.slider("Number of past months used as input", 6, 11, 6, key="state_input")
+            monthly_input = []
+            cols = st.columns(n_input)
+            for i in range(n_input):
+                with cols[i]:
+                    monthly_input.append(
+                        st.number_input(
+                            f"Month {i+1} (mm)",
+                            min_value=0.0,
+                            value=200.0,
+                            step=1.0,
+                            key=f"state_val_{i}"
+                        )
+                    )
 
-    row = summary_df[
-        (summary_df["State"] == selected_state) &
-        (summary_df["Input_Months"] == n_input)
-    ]
+            n_predict = st.slider("Number of future months to predict", 1, 12, 6, key="state_predict")
 
-    if row.empty:
-        st.warning("⚠️ Model not available.")
-        st.stop()
+            state_inputs = (selected_state, variant, n_input, tuple(monthly_input), n_predict)
+            if st.button(f"🔮 Predict for {selected_state}"):
+                submit_prediction("state_predict", model, model_path, monthly_input, n_predict,
+                                  state_inputs, f"{selected_state} forecast")
+            show_prediction(
+                "state_predict", state_inputs, monthly_input,
+                f"Rainfall Prediction with Flood Risk Zones ({selected_state})",
+                state=selected_state
+            )
 
-    import os
-    import joblib
-    
-    model_filename = row["Model_File"].values[0]
-    
-    model_path = os.path.join(
-        "rf_models",
-        model_filename
-    )
-    
-    if not os.path.exists(model_path):
-        st.error(f"❌ Model file not found: {model_filename}")
-        st.stop()
-
-model = joblib.load(model_path)
-st.success(f"✅ Model loaded: {model_filename}")
-
-
-    monthly_input = []
-    cols = st.columns(n_input)
-    for i in range(n_input):
-        with cols[i]:
-            monthly_input.append(
-                st.number_input(
-                    f"Month {i+1} (mm)",
-                    min_value=0.0,
-                    value=200.0,
-                    step=1.0,
-                    key=f"state_val_{i}"
+            # ===== PROBABILISTIC OUTLOOK =====
+            with st.expander("🎲 Probabilistic outlook from the latest observed months"):
+                n_scenarios = st.select_slider(
+                    "Number of rainfall scenarios",
+                    options=[500, 1000, 2000, 5000],
+                    value=2000,
+                    key="state_scenarios"
                 )
-            )
 
-    n_predict = st.slider("Number of future months to predict", 1, 12, 6, key="state_predict")
+                scenario_inputs = (selected_state, variant, n_input, n_scenarios)
+                if st.button("Run scenarios", key="state_run_scenarios"):
+                    jobs.submit(
+                        SESSION, "state_scenarios", run_scenarios, model, df_state, selected_state,
+                        n_input, n_scenarios, inputs=scenario_inputs, total=12,
+                        label=f"{selected_state} scenarios"
+                    )
 
-    if st.button(f"🔮 Predict for {selected_state}"):
-        seq = monthly_input.copy()
-        preds = []
+                def render_outlook(outlook):
+                    with span("figure_build", PAGE):
+                        fig_outlook = go.Figure(go.Bar(
+                            x=outlook["Month"],
+                            y=outlook["P_High"],
+                            marker_color=risk.colors(risk.HIGH),
+                            name="P(High Risk)"
+                        ))
+                        fig_outlook.update_layout(
+                            title=f"Chance of High Risk rainfall – {selected_state}",
+                            yaxis=dict(range=[0, 1], tickformat=".0%"),
+                            height=340
+                        )
+                    with span("chart_render", PAGE):
+                        st.plotly_chart(fig_outlook, use_container_width=True)
+                    st.dataframe(outlook.round(2), use_container_width=True, hide_index=True)
 
-        for _ in range(n_predict):
-            p = model.predict([seq[-n_input:]])[0]
-            preds.append(p)
-            seq.append(p)
+                show_job("state_scenarios", scenario_inputs, render_outlook)
 
-        start_month = n_input + 1
+# =================================================
+# LIVE NOWCAST (streaming observations, polled by a fragment)
+# =================================================
+live = nowcast.start(index)
+
+@st.fragment(run_every=2)
+def live_nowcast():
+    stats = live.stats()
+    cols = st.columns(4)
+    cols[0].metric("Observations applied", f"{stats['applied']:,}")
+    cols[1].metric("Throughput", f"{stats['rate_per_s']:,.1f} obs/s")
+    for col, p in zip(cols[2:], (50, 95)):
+        value = stats[f"latency_p{p}_ms"]
+        col.metric(f"Latency p{p}", "–" if value is None else f"{value:,.0f} ms")
+    skipped = {k: stats[k] for k in ("stale", "gaps", "unknown", "rejected", "errors") if stats[k]}
+    if skipped:
+        st.caption("Skipped: " + ", ".join(f"{n:,} {k}" for k, n in skipped.items()))
+
+    _, rows = live.updates()
+    if not rows:
+        st.info("Waiting for observations…")
+        return
+    updates = pd.DataFrame(rows[:100])
+    updates["Updated"] = pd.to_datetime(updates["Updated"], unit="s").dt.strftime("%H:%M:%S")
+    row_css = np.char.add(
+        np.char.add("background-color:", risk.colors(updates["Next_Risk"].map(risk.LEVELS.index))),
+        "; color:white"
+    )
+    st.dataframe(
+        updates.round({"Next_mm": 1, "Peak_mm": 1}).style.apply(lambda _: row_css, subset=["Next_Risk"]),
+        hide_index=True, use_container_width=True
+    )
 
-        result_df = pd.DataFrame({
-            "Month": [f"Month {start_month+i}" for i in range(n_predict)],
-            "Predicted Rainfall (mm)": np.round(preds, 2),
-            "Flood Risk": [flood_risk_label(p) for p in preds]
-        })
+if live is not None:
+    st.markdown(f"""
+    <div class="card">
+    <h3>📡 Live nowcast</h3>
+    <p>Monthly district observations are streamed in as they arrive; each affected district's
+    {live.n_input}-month window rolls forward and only its forecast is recomputed.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    live_nowcast()
 
-        styled = result_df.style.apply(
-            lambda r: [
-                f"background-color:{flood_risk_color(r['Predicted Rainfall (mm)'])}; color:white"
-            ] * len(r),
-            axis=1
-        )
+# =================================================
+# EXPORT (every state, every window)
+# =================================================
+st.markdown("""
+<div class="card">
+<h3>📤 Batch forecast export</h3>
+<p>Recursive forecasts for every district of every state with each per-window model,
+starting after the last observed year, with the risk level of each month.</p>
+</div>
+""", unsafe_allow_html=True)
 
-        st.markdown("<div class='card'><h4>📊 Prediction Output</h4></div>", unsafe_allow_html=True)
-        st.dataframe(styled, use_container_width=True)
+if not os.path.exists(state_csv):
+    st.warning("⚠️ State model summary not found.")
+else:
+    export_summary = pd.read_csv(state_csv)
+    export_horizon = st.select_slider(
+        "Forecast horizon (months)", options=[6, 12, 24, 36], value=12, key="export_horizon"
+    )
 
-        fig_pred = prediction_chart(
-            monthly_input, preds, start_month,
-            f"Rainfall Prediction with Flood Risk Zones ({selected_state})"
-        )
-        st.plotly_chart(fig_pred, use_container_width=True)
+    def export_models():
+        for row in export_summary.itertuples(index=False):
+            model, _ = load_state_forecaster(export_summary, row.State, int(row.Input_Months))
+            if model is not None:
+                yield row.State, int(row.Input_Months), model
+
+    def export_model_versions():
+        """``(file, version)`` of every model the export would use, so a retrained one gives a new file."""
+        versions = []
+        for row in export_summary.itertuples(index=False):
+            path = per_window_model_path(export_summary, row.State, int(row.Input_Months))
+            if path is not None and model_available(path):
+                versions.append((os.path.basename(path), model_version(path)))
+        return tuple(versions)
+
+    render_export(
+        "batch forecasts", "district_forecasts", (export_horizon, export_model_versions()),
+        lambda: district_forecasts(index, export_models(), export_horizon), "forecast_export"
+    )
 
 # =================================================
 # FOOTER
@@ -0,0 +1,230 @@
+import streamlit as st
+import streamlit.components.v1 as components
+import os
+import time
+
+from utils import disk_cache, memory
+from utils.auth import check_admin, is_admin
+from utils.data import DATA_PATH, dataset_version
+from utils.profile_reports import cached_report, current_status, is_running, request_report
+
+# =================================================
+# PAGE CONFIG
+# =================================================
+st.set_page_config(page_title="Admin Panel", layout="wide")
+
+# =================================================
+# LOAD CSS
+# =================================================
+def load_css():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    css_path = os.path.join(base_dir, "..", "assets", "style.css")
+    with open(css_path, encoding="utf-8") as f:
+        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+
+load_css()
+
+# =================================================
+# HEADER
+# =================================================
+st.markdown("""
+<div class="app-header">
+🌊 Malaysia Flood Prediction System's Dashboard
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("""
+<div class="card">
+<h2>🔐 Admin Panel</h2>
+<p>
+Dataset diagnostics and exploratory data analysis for administrators.
+</p>
+</div>
+""", unsafe_allow_html=True)
+
+# =================================================
+# LOGIN
+# =================================================
+if not is_admin(st.session_state):
+    with st.form("admin_login"):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        submitted = st.form_submit_button("Log in")
+
+    if submitted:
+        if check_admin(username, password):
+            st.session_state["is_admin"] = True
+            st.rerun()
+        else:
+            st.error("❌ Invalid username or password.")
+    st.stop()
+
+if st.sidebar.button("Log out"):
+    st.session_state["is_admin"] = False
+    st.rerun()
+
+# =================================================
+# DATASET DIAGNOSTICS
+# =================================================
+version = dataset_version()
+data_stat = os.stat(DATA_PATH)
+
+c1, c2, c3 = st.columns(3)
+c1.markdown(f"<div class='metric-card'><small>Dataset Version</small><h2>{version[:8]}</h2></div>", unsafe_allow_html=True)
+c2.markdown(f"<div class='metric-card'><small>File Size</small><h2>{data_stat.st_size / 1024:.0f} KB</h2></div>", unsafe_allow_html=True)
+c3.markdown(f"<div class='metric-card'><small>Last Modified</small><h2>{time.strftime('%Y-%m-%d', time.localtime(data_stat.st_mtime))}</h2></div>", unsafe_allow_html=True)
+
+# =================================================
+# MEMORY & CACHE BUDGET
+# =================================================
+st.markdown("""
+<div class="card">
+<h3>🧠 Memory & Cache Budget</h3>
+<p>
+Bytes held by the dataset, model, figure and map caches of this server process.
+When the total exceeds the budget, the least recently used entries are evicted
+across all caches.
+</p>
+</div>
+""", unsafe_allow_html=True)
+
+MB = 1024 * 1024
+usage = memory.stats()
+
+m1, m2, m3 = st.columns(3)
+m1.markdown(f"<div class='metric-card'><small>Process RSS</small><h2>{usage['rss_bytes'] / MB:.0f} MB</h2></div>", unsafe_allow_html=True)
+m2.markdown(f"<div class='metric-card'><small>Cached</small><h2>{usage['cached_bytes'] / MB:.1f} MB</h2></div>", unsafe_allow_html=True)
+m3.markdown(f"<div class='metric-card'><small>Budget</small><h2>{usage['budget_bytes'] / MB:.0f} MB</h2></div>", unsafe_allow_html=True)
+
+st.markdown("<div class='table-title'>Per Cache</div>", unsafe_allow_html=True)
+st.dataframe(
+    [{"Cache": name, "Entries": c["entries"], "Size (MB)": round(c["bytes"] / MB, 2), "Evictions": c["evictions"]}
+     for name, c in usage["caches"].items()],
+    use_container_width=True, hide_index=True
+)
+
+me = memory.current_session()
+st.markdown("<div class='table-title'>Per Session (owned = built by the session, used = read by it)</div>", unsafe_allow_html=True)
+st.dataframe(
+    [{"Session": f"{sid} (you)" if sid == me else sid,
+      "Owned Entries": s["owned_entries"], "Owned (MB)": round(s["owned_bytes"] / MB, 2),
+      "Used Entries": s["used_entries"], "Used (MB)": round(s["used_bytes"] / MB, 2)}
+     for sid, s in sorted(usage["sessions"].items(), key=lambda kv: -kv[1]["owned_bytes"])],
+    use_container_width=True, hide_index=True
+)
+
+with st.expander("Cache entries (most recently used first)"):
+    st.dataframe(
+        [{"Cache": e["cache"], "Key": e["key"], "Size (MB)": round(e["bytes"] / MB, 3),
+          "Owner": e["owner"], "Hits": e["hits"], "Idle (s)": round(e["idle_s"])}
+         for e in usage["entries"]],
+        use_container_width=True, hide_index=True
+    )
+
+b1, b2 = st.columns(2)
+with b1:
+    new_budget = st.number_input("Budget (MB)", min_value=16, value=int(usage["budget_bytes"] / MB), step=64)
+    if st.button("Apply budget"):
+        memory.set_budget(new_budget * MB)
+        st.rerun()
+with b2:
+    target = st.selectbox("Evict cache", ["all"] + list(memory.CACHES))
+    if st.button("Evict"):
+        memory.evict(None if target == "all" else target)
+        st.rerun()
+
+# =================================================
+# PERSISTENT DISK CACHE
+# =================================================
+st.markdown("""
+<div class="card">
+<h3>💾 Persistent Disk Cache</h3>
+<p>
+Datasets, figures, map layers and forecasts written to <code>cache/results</code> so a
+restarted server starts warm. Entries are keyed by dataset and code version; the least
+recently used files are deleted when the size limit is reached. Fill it at deploy time
+with <code>python -m scripts.warm_cache</code>.
+</p>
+</div>
+""", unsafe_allow_html=True)
+
+disk = disk_cache.stats()
+d1, d2, d3, d4 = st.columns(4)
+d1.markdown(f"<div class='metric-card'><small>On Disk</small><h2>{disk['bytes'] / MB:.1f} MB</h2></div>", unsafe_allow_html=True)
+d2.markdown(f"<div class='metric-card'><small>Limit</small><h2>{disk['budget_bytes'] / MB:.0f} MB</h2></div>", unsafe_allow_html=True)
+d3.markdown(f"<div class='metric-card'><small>Hits / Misses</small><h2>{disk['hits']} / {disk['misses']}</h2></div>", unsafe_allow_html=True)
+d4.markdown(f"<div class='metric-card'><small>Code Version</small><h2>{disk['code_version'][:8]}</h2></div>", unsafe_allow_html=True)
+
+st.dataframe(
+    [{"Namespace": name, "Entries": n["entries"], "Size (MB)": round(n["bytes"] / MB, 2)}
+     for name, n in sorted(disk["namespaces"].items())],
+    use_container_width=True, hide_index=True
+)
+if not disk["enabled"]:
+    st.caption("Disabled by MFPS_DISK_CACHE=0.")
+if st.button("Clear disk cache"):
+    disk_cache.clear()
+    st.rerun()
+
+@st.cache_data
+def read_report(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+# =================================================
+# PROFILE REPORT
+# =================================================
+st.markdown("""
+<div class="card">
+<h3>📋 Dataset Profile (ydata-profiling)</h3>
+<p>
+Reports are generated in a background worker and cached per dataset version,
+so opening this page never blocks other users.
+</p>
+</div>
+""", unsafe_allow_html=True)
+
+if st.button("🔄 Regenerate profile"):
+    request_report(version, force=True)
+
+if cached_report(version) is None:
+    request_report(version)
+
+def report_mtime():
+    report = cached_report(version)
+    return os.path.getmtime(report) if report is not None else None
+
+# The report this run renders; the poller reruns the page when a newer one lands.
+st.session_state["profile_shown"] = report_mtime()
+
+
+@st.fragment(run_every=2)
+def profile_status():
+    status = current_status(version) or {}
+    stage = status.get("stage", "queued")
+
+    if is_running(version) or stage not in ("done", "failed"):
+        st.progress(status.get("progress", 0.0), text=f"Generating profile: {stage}…")
+    elif stage == "failed":
+        st.error(f"❌ Profile generation failed: {status.get('error')}")
+    elif report_mtime() != st.session_state.get("profile_shown"):
+        st.rerun()
+    elif status.get("sampled"):
+        st.caption(f"Profile built on a {status.get('rows'):,}-row sample.")
+
+profile_status()
+
+report = cached_report(version)
+if report is not None:
+    html = read_report(report, os.path.getmtime(report))
+    st.download_button("⬇️ Download HTML report", html, file_name=os.path.basename(report), mime="text/html")
+    components.html(html, height=900, scrolling=True)
+
+# =================================================
+# FOOTER
+# =================================================
+st.markdown("""
+<div class="app-footer">
+© 2026 MFPS Dashboard | Shafikah Binti Asrul Nizam
+</div>
+""", unsafe_allow_html=True)
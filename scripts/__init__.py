@@ -0,0 +1 @@
+"""Offline maintenance scripts (run with ``python -m scripts.<name>``)."""
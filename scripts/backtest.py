@@ -0,0 +1,74 @@
+"""Walk-forward backtest of every per-state, per-window forecaster.
+
+Usage::
+
+    python -m scripts.backtest [--states Johor,Kedah] [--windows 6,7,8]
+                               [--horizon 12] [--workers 4]
+
+For each model listed in ``rf_models/state_model_summary.csv`` the state's
+monthly series is replayed from every origin: the model's recursive 1-12
+month forecast is compared with what was observed, and each month is scored
+as a point error and as a risk category under the configured thresholds.
+All origins of one model go through one batched ``predict`` per horizon
+step, and the models are spread across a process pool.
+
+The forests were fitted on this same history, so the numbers are
+in-sample for most origins. Use them to compare states and window lengths
+with each other, not as an estimate of out-of-sample skill.
+
+Writes ``reports/backtest_horizon.csv`` (MAE, RMSE and risk hit rates per
+state, window and horizon step) and ``reports/backtest_models.csv`` (one
+row per model).
+"""
+import argparse
+import os
+
+from utils.backtest import HORIZON, run_backtest
+from utils.data import BASE_DIR, load_dataset
+from utils.models import load_state_summary, resolve_model_path
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", type=lambda s: s.split(","), default=None)
+    parser.add_argument("--windows", type=lambda s: [int(w) for w in s.split(",")], default=None)
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    summary_df = load_state_summary()
+    specs = []
+    for row in summary_df.itertuples(index=False):
+        if args.states and row.State not in args.states:
+            continue
+        if args.windows and row.Input_Months not in args.windows:
+            continue
+        path = resolve_model_path(row.Model_File)
+        if os.path.exists(path):
+            specs.append((row.State, int(row.Input_Months), path))
+        else:
+            print(f"skipping {row.State} {row.Input_Months}m: {path} not found")
+    if not specs:
+        parser.error("no model files matched")
+
+    per_horizon, per_model, elapsed = run_backtest(
+        load_dataset(), specs, horizon=args.horizon, workers=args.workers
+    )
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    per_horizon.to_csv(os.path.join(REPORT_DIR, "backtest_horizon.csv"), index=False)
+    per_model.to_csv(os.path.join(REPORT_DIR, "backtest_models.csv"), index=False)
+
+    if per_model.empty:
+        print("no model had enough history for a backtest origin; reports are empty")
+        return
+    print(per_horizon.pivot_table(index="Horizon", values=["MAE", "RMSE", "Risk_Hit_Rate"]).round(2))
+    print(per_model.sort_values(["State", "Input_Months"]).round(3).to_string(index=False))
+    print(f"{len(per_model)} models, {int(per_model['Origins'].sum())} origins x {args.horizon} "
+          f"months in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
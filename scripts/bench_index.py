@@ -0,0 +1,149 @@
+"""Benchmark boolean-mask filters against the sorted dataset index.
+
+Usage::
+
+    python -m scripts.bench_index [--scale 1000] [--queries 50] [--seed 0]
+
+The dataset is tiled ``--scale`` times to make a synthetic table: every copy
+gets its own district names (``"<district> #k"``) and monthly rainfall
+jittered by up to +/-20%, so states grow ``--scale``-fold while the year span
+stays the same. Each filter the pages use is then timed both ways on the same
+random queries:
+
+- ``state``: one state's rows
+- ``district``: one district's rows
+- ``year``: every row of one year (the map)
+- ``year_range``: a five-year window (the Rainfall slider)
+- ``state_year_range``: a five-year window within one state
+
+The report goes to ``reports/index_benchmark.csv``.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data import BASE_DIR, MONTHLY_COLS, load_dataset
+from utils.indexed import IndexedDataset
+from utils.memory import sizeof
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+WINDOW_YEARS = 5
+
+
+def synthetic(df, scale, seed=0):
+    """``df`` tiled ``scale`` times with distinct districts and jittered rainfall."""
+    rng = np.random.default_rng(seed)
+    big = pd.concat([df] * scale, ignore_index=True)
+    copy_no = np.repeat(np.arange(scale), len(df))
+    big["DISTRICT_NAME"] = big["DISTRICT_NAME"] + " #" + copy_no.astype(str)
+    big[MONTHLY_COLS] = big[MONTHLY_COLS] * rng.uniform(0.8, 1.2, size=(len(big), len(MONTHLY_COLS)))
+    # Shuffle so the mask baseline is not helped by the tiled order.
+    return big.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1e3, len(result)
+
+
+def mask_filters(df):
+    return {
+        "state": lambda q: df[df["STATE_NAME"] == q["state"]],
+        "district": lambda q: df[(df["STATE_NAME"] == q["state"]) & (df["DISTRICT_NAME"] == q["district"])],
+        "year": lambda q: df[df["YEAR"] == q["year"]],
+        "year_range": lambda q: df[(df["YEAR"] >= q["years"][0]) & (df["YEAR"] <= q["years"][1])],
+        "state_year_range": lambda q: df[
+            (df["STATE_NAME"] == q["state"]) & (df["YEAR"] >= q["years"][0]) & (df["YEAR"] <= q["years"][1])
+        ],
+    }
+
+
+def index_filters(index):
+    return {
+        "state": lambda q: index.state(q["state"]),
+        "district": lambda q: index.district(q["state"], q["district"]),
+        "year": lambda q: index.year(q["year"]),
+        "year_range": lambda q: index.year_range(q["years"]),
+        "state_year_range": lambda q: index.year_range(q["years"], q["state"]),
+    }
+
+
+def random_queries(index, n, seed=0):
+    rng = np.random.default_rng(seed)
+    states = index.states()
+    years = index.years()
+    queries = []
+    for _ in range(n):
+        state = states[rng.integers(len(states))]
+        districts = index.districts(state)
+        lo = years[rng.integers(max(1, len(years) - WINDOW_YEARS + 1))]
+        queries.append({
+            "state": state,
+            "district": districts[rng.integers(len(districts))],
+            "year": years[rng.integers(len(years))],
+            "years": (lo, lo + WINDOW_YEARS - 1),
+        })
+    return queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    df = synthetic(load_dataset(), args.scale, args.seed)
+    df["YEAR"] = df["YEAR"].astype(int)
+    print(f"Synthetic table: {len(df):,} rows ({args.scale}x), "
+          f"{df['DISTRICT_NAME'].nunique():,} districts", flush=True)
+
+    start = time.perf_counter()
+    index = IndexedDataset(df)
+    build_ms = (time.perf_counter() - start) * 1e3
+    print(f"Index built in {build_ms:.0f} ms, {sizeof(index) / 2**20:.1f} MB "
+          f"(table {sizeof(df) / 2**20:.1f} MB)", flush=True)
+
+    queries = random_queries(index, args.queries, args.seed)
+    masks, lookups = mask_filters(df), index_filters(index)
+
+    rows = []
+    for name in masks:
+        mask_ms, index_ms = [], []
+        for q in queries:
+            m_ms, m_rows = timed(masks[name], q)
+            i_ms, i_rows = timed(lookups[name], q)
+            if m_rows != i_rows:
+                raise AssertionError(f"{name}: mask returned {m_rows} rows, index {i_rows} for {q}")
+            mask_ms.append(m_ms)
+            index_ms.append(i_ms)
+
+        mask_med, index_med = statistics.median(mask_ms), statistics.median(index_ms)
+        rows.append({
+            "Filter": name,
+            "Rows": len(df),
+            "Queries": len(queries),
+            "Mask_Median_ms": round(mask_med, 3),
+            "Mask_P95_ms": round(float(np.percentile(mask_ms, 95)), 3),
+            "Index_Median_ms": round(index_med, 3),
+            "Index_P95_ms": round(float(np.percentile(index_ms, 95)), 3),
+            "Speedup": round(mask_med / index_med, 1) if index_med else None,
+        })
+        print(f"{name:<18} mask {mask_med:9.3f} ms   index {index_med:9.3f} ms   "
+              f"x{rows[-1]['Speedup']}", flush=True)
+
+    report = pd.DataFrame(rows)
+    report["Index_Build_ms"] = round(build_ms, 1)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    out = os.path.join(REPORT_DIR, "index_benchmark.csv")
+    report.to_csv(out, index=False)
+    print(f"Report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
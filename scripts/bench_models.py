@@ -0,0 +1,231 @@
+"""Load time, memory, forest shape and predict latency for every model file.
+
+Usage::
+
+    python -m scripts.bench_models [--files johor_rf_6m.sav,final_flood_model.sav]
+                                   [--repeat 200] [--batch 1024] [--tolerance 0.25]
+                                   [--save-baseline]
+
+Covers every file referenced by ``rf_models/state_model_summary.csv``, the
+``rf_<State>_model.sav`` forests and ``final_flood_model.sav``. Each file is
+measured in a fresh interpreter, after scikit-learn and joblib have been
+imported, so that library import time is not counted:
+
+- ``Cold_Load_ms``: the first ``joblib.load`` in the process.
+- ``Warm_Load_ms``: the median of further loads, once the file is in the OS
+  page cache.
+- ``RSS_MB``: resident memory added by the cold load. ``Object_MB`` is the
+  in-process size estimate from ``utils.memory.sizeof``.
+- ``Trees``, ``Max_Depth``, ``Mean_Depth``, ``Nodes``: the forest's shape.
+- Predict latency percentiles (p50/p95/p99) for one row and for a
+  ``--batch``-row matrix.
+
+The report goes to ``reports/model_benchmark.csv``. It is compared with
+``config/model_benchmark_baseline.csv`` when that file exists. A file is
+flagged when a time or memory figure exceeds its baseline by more than
+``--tolerance``, and the process then exits with status 1.
+``--save-baseline`` stores this run as the new baseline.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import subprocess
+import sys
+
+from utils.data import BASE_DIR
+from utils.flood_scores import FLOOD_MODEL_PATH
+from utils.models import MODEL_DIR, load_state_summary, resolve_model_path
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+BASELINE_PATH = os.path.join(BASE_DIR, "config", "model_benchmark_baseline.csv")
+
+# Lower is better for all of these; they are the ones compared to the baseline.
+COMPARED = ("Cold_Load_ms", "Warm_Load_ms", "RSS_MB",
+            "Single_P50_ms", "Single_P95_ms", "Batch_P50_ms", "Batch_P95_ms")
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {base!r})
+import joblib, numpy as np, sklearn.ensemble
+from utils.memory import process_rss, sizeof
+
+def percentiles(samples):
+    return [float(v) for v in np.percentile(np.asarray(samples) * 1e3, (50, 95, 99))]
+
+rss0 = process_rss()
+t0 = time.perf_counter()
+model = joblib.load({path!r})
+cold = time.perf_counter() - t0
+rss = process_rss() - rss0
+
+warm = []
+for _ in range({warm_repeat}):
+    t0 = time.perf_counter()
+    joblib.load({path!r})
+    warm.append(time.perf_counter() - t0)
+
+forest = model if hasattr(model, "estimators_") else getattr(model, "estimator", model)
+trees = list(getattr(forest, "estimators_", []))
+depths = [t.get_depth() for t in trees]
+n_features = getattr(forest, "n_features_in_", None) or 12
+
+rng = np.random.default_rng(0)
+row = rng.uniform(0, 500, size=(1, n_features))
+batch = rng.uniform(0, 500, size=({batch}, n_features))
+predict = forest.predict
+predict(row)
+
+single = []
+for _ in range({repeat}):
+    t0 = time.perf_counter()
+    predict(row)
+    single.append(time.perf_counter() - t0)
+batched = []
+for _ in range(max(5, {repeat} // 20)):
+    t0 = time.perf_counter()
+    predict(batch)
+    batched.append(time.perf_counter() - t0)
+
+print(json.dumps({{
+    "type": type(model).__name__,
+    "cold_ms": cold * 1e3,
+    "warm_ms": float(np.median(warm)) * 1e3 if warm else None,
+    "rss_mb": rss / 2**20,
+    "object_mb": sizeof(model) / 2**20,
+    "trees": len(trees),
+    "max_depth": max(depths) if depths else None,
+    "mean_depth": float(np.mean(depths)) if depths else None,
+    "nodes": int(sum(t.tree_.node_count for t in trees)),
+    "n_features": int(n_features),
+    "single": percentiles(single),
+    "batch": percentiles(batched),
+}}))
+'''
+
+
+def model_files():
+    """Every model file the dashboard can load, as paths, without duplicates."""
+    paths = [resolve_model_path(f) for f in load_state_summary()["Model_File"]]
+    paths += sorted(glob.glob(os.path.join(MODEL_DIR, "rf_*_model.sav")))
+    paths.append(FLOOD_MODEL_PATH)
+    return list(dict.fromkeys(p for p in paths if os.path.exists(p)))
+
+
+def measure(path, repeat, batch, warm_repeat=5):
+    code = CHILD.format(base=BASE_DIR, path=path, repeat=repeat, batch=batch, warm_repeat=warm_repeat)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+    raise RuntimeError(f"{path}: measurement failed ({tail[0]})")
+
+
+def report_row(path, m, batch):
+    single, batched = m["single"], m["batch"]
+    return {
+        "File": os.path.relpath(path, BASE_DIR).replace(os.sep, "/"),
+        "Type": m["type"],
+        "File_MB": round(os.path.getsize(path) / 2**20, 2),
+        "Cold_Load_ms": round(m["cold_ms"], 1),
+        "Warm_Load_ms": None if m["warm_ms"] is None else round(m["warm_ms"], 1),
+        "RSS_MB": round(m["rss_mb"], 1),
+        "Object_MB": round(m["object_mb"], 1),
+        "Trees": m["trees"],
+        "Max_Depth": m["max_depth"],
+        "Mean_Depth": None if m["mean_depth"] is None else round(m["mean_depth"], 1),
+        "Nodes": m["nodes"],
+        "Features": m["n_features"],
+        "Single_P50_ms": round(single[0], 3),
+        "Single_P95_ms": round(single[1], 3),
+        "Single_P99_ms": round(single[2], 3),
+        "Batch_Rows": batch,
+        "Batch_P50_ms": round(batched[0], 2),
+        "Batch_P95_ms": round(batched[1], 2),
+        "Batch_P99_ms": round(batched[2], 2),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8", newline="") as f:
+        return {row["File"]: row for row in csv.DictReader(f)}
+
+
+def regressions(row, baseline, tolerance):
+    """``"metric +x%"`` for each compared figure that grew beyond ``tolerance``."""
+    found = []
+    for metric in COMPARED:
+        old, new = baseline.get(metric), row.get(metric)
+        if old in (None, "") or new is None:
+            continue
+        old = float(old)
+        if old > 0 and new > old * (1 + tolerance):
+            found.append(f"{metric} +{(new / old - 1) * 100:.0f}%")
+    return found
+
+
+def write_csv(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=lambda s: s.split(","), default=None,
+                        help="file names to measure (default: every model file)")
+    parser.add_argument("--repeat", type=int, default=200, help="single-row predict calls")
+    parser.add_argument("--batch", type=int, default=1024)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    paths = model_files()
+    if args.files:
+        paths = [p for p in paths if os.path.basename(p) in args.files]
+    if not paths:
+        parser.error("no model files matched")
+
+    baseline = load_baseline()
+    rows, failures = [], []
+    for path in paths:
+        row = report_row(path, measure(path, args.repeat, args.batch), args.batch)
+        base = baseline.get(row["File"])
+        problems = regressions(row, base, args.tolerance) if base else []
+        row["Baseline"] = "yes" if base else "none"
+        row["Regressions"] = "; ".join(problems)
+        if problems:
+            failures.append(f"{row['File']}: {row['Regressions']}")
+        rows.append(row)
+        print(f"{'FAIL' if problems else 'ok  '} {row['File']:<40} {row['File_MB']:7.1f} MB  "
+              f"load {row['Cold_Load_ms']:7.1f}/{row['Warm_Load_ms'] or 0:7.1f} ms  "
+              f"rss {row['RSS_MB']:6.1f} MB  {row['Trees']} trees d{row['Max_Depth']}  "
+              f"p50 {row['Single_P50_ms']:.2f} ms / batch {row['Batch_P50_ms']:.1f} ms", flush=True)
+
+    out = os.path.join(REPORT_DIR, "model_benchmark.csv")
+    write_csv(out, rows)
+    print(f"Report written to {out}")
+
+    if args.save_baseline:
+        # Files not measured in this run keep their previous baseline.
+        merged = dict(baseline)
+        for r in rows:
+            merged[r["File"]] = {k: v for k, v in r.items() if k not in ("Baseline", "Regressions")}
+        write_csv(BASELINE_PATH, list(merged.values()))
+        print(f"Baseline saved to {BASELINE_PATH}")
+    elif not baseline:
+        print(f"No baseline at {BASELINE_PATH}; run with --save-baseline to record one.")
+
+    if failures and not args.save_baseline:
+        print("\nRegressions against baseline:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Pre-generate resized WebP/JPEG/PNG variants for every dashboard image.
+
+Usage::
+
+    python -m scripts.build_assets [--widths 320,480,640,960,1280] [--no-prune]
+
+Scans ``assets/images`` and ``static/``, writes content-hashed variants and
+``manifest.json`` to ``cache/assets/`` and prints, per image, the original
+size next to the variant the gallery serves. Pages build missing variants on
+first use, so running this at deploy time only moves that cost off the
+first visitor.
+"""
+import argparse
+import os
+
+from utils.assets import ASSET_CACHE_DIR, WIDTHS, best_variant, build_all
+from utils.data import BASE_DIR
+
+GALLERY_COLUMN_PX = 480
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--widths", type=lambda s: tuple(int(w) for w in s.split(",")), default=WIDTHS)
+    parser.add_argument("--no-prune", action="store_true", help="keep variants of removed/changed images")
+    args = parser.parse_args(argv)
+
+    manifest = build_all(widths=args.widths, prune=not args.no_prune)
+
+    total_original = total_served = 0
+    for key, entry in sorted(manifest.items()):
+        served = best_variant(os.path.join(BASE_DIR, key), GALLERY_COLUMN_PX)
+        served_bytes = os.path.getsize(served)
+        total_original += entry["bytes"]
+        total_served += served_bytes
+        print(f"{key:<45} {entry['bytes'] / 1024:8.1f} KB -> {served_bytes / 1024:7.1f} KB "
+              f"({os.path.basename(served)}, {len(entry['variants'])} variants)")
+
+    if manifest:
+        print(f"{len(manifest)} images: {total_original / 1024:.0f} KB originals, "
+              f"{total_served / 1024:.0f} KB served at {GALLERY_COLUMN_PX}px columns "
+              f"({1 - total_served / total_original:.0%} smaller)")
+    print(f"Variants and manifest in {ASSET_CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Pack every forecaster into one memory-mappable model bundle.
+
+Usage::
+
+    python -m scripts.build_bundle [--out rf_models/models.bundle] [--verify-only]
+
+Packs these into ``rf_models/models.bundle``:
+
+- the per-window forests listed in ``state_model_summary.csv``, keyed as
+  ``(state, n_months)``
+- the ``<state>_rf_vw.sav`` variable-window forests, keyed as
+  ``(state, "vw")``
+- the national ``rf_global.sav`` (``("Malaysia", "global")``), together
+  with an ``rf_overall_{n}m.sav`` view for every window length
+- ``final_flood_model.sav`` (``("Malaysia", "classifier")``)
+
+Each manifest entry records the source file name, its training date (the
+file's modification time), its mtime and size, a sha256 of the payload, and
+the backtest metrics from ``reports/backtest_models.csv`` when that report
+exists. ``utils.models.load_model`` serves a packed file from the bundle
+unless the loose file has changed since (e.g. a retrained
+``rf_global.sav``); then it reads the loose file until the bundle is rebuilt.
+"""
+import argparse
+import datetime
+import os
+import time
+
+import joblib
+import pandas as pd
+
+from utils.bundle import BUNDLE_PATH, NATIONAL, ModelBundle, write_bundle
+from utils.data import BASE_DIR
+from utils.flood_scores import FLOOD_MODEL_PATH
+from utils.models import (
+    GLOBAL_MODEL_PATH,
+    MAX_WINDOW,
+    MIN_WINDOW,
+    ScopedForecaster,
+    load_state_summary,
+    overall_model_path,
+    resolve_model_path,
+    variable_window_path,
+)
+
+BACKTEST_REPORT = os.path.join(BASE_DIR, "reports", "backtest_models.csv")
+METRIC_COLS = ("Origins", "Mean_MAE", "Mean_RMSE", "Risk_Hit_Rate")
+
+
+def trained_on(path):
+    mtime = os.path.getmtime(path)
+    return datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).date().isoformat()
+
+
+def backtest_metrics(path=BACKTEST_REPORT):
+    """``{(state, n_months): {metric: value}}`` from the last backtest, if any."""
+    if not os.path.exists(path):
+        return {}
+    report = pd.read_csv(path)
+    return {
+        (row["State"], int(row["Input_Months"])): {c: float(row[c]) for c in METRIC_COLS if c in row}
+        for _, row in report.iterrows()
+    }
+
+
+def collect():
+    """``[(meta, source_path or None, model or None)]`` for everything to pack."""
+    items = []
+    summary_df = load_state_summary()
+    for row in summary_df.itertuples(index=False):
+        path = resolve_model_path(row.Model_File)
+        if os.path.exists(path):
+            items.append(({"scope": row.State, "window": int(row.Input_Months), "kind": "per_window"}, path, None))
+        else:
+            print(f"skipping {row.State} {row.Input_Months}m: {path} not found")
+
+    for state in sorted(summary_df["State"].unique()):
+        path = variable_window_path(state)
+        if os.path.exists(path):
+            items.append(({"scope": state, "window": "vw", "kind": "variable_window"}, path, None))
+
+    if os.path.exists(GLOBAL_MODEL_PATH):
+        items.append(({"scope": NATIONAL, "window": "global", "kind": "global"}, GLOBAL_MODEL_PATH, None))
+        for n in range(MIN_WINDOW, MAX_WINDOW + 1):
+            meta = {"scope": NATIONAL, "window": n, "kind": "overall",
+                    "source": os.path.basename(overall_model_path(n)),
+                    "trained": trained_on(GLOBAL_MODEL_PATH)}
+            items.append((meta, None, ScopedForecaster(None, n)))
+    else:
+        print(f"no {os.path.basename(GLOBAL_MODEL_PATH)}: the Overall tab stays unavailable "
+              f"until `python -m scripts.train_global` has run")
+
+    if os.path.exists(FLOOD_MODEL_PATH):
+        items.append(({"scope": NATIONAL, "window": "classifier", "kind": "classifier"}, FLOOD_MODEL_PATH, None))
+    return items
+
+
+def iter_models(items, metrics):
+    """Load one source at a time so only the model being packed is in memory."""
+    for meta, path, model in items:
+        if path is not None:
+            stat = os.stat(path)
+            meta = {**meta, "source": os.path.basename(path), "trained": trained_on(path),
+                    "source_mtime_ns": stat.st_mtime_ns, "source_size": stat.st_size}
+            model = joblib.load(path)
+        found = metrics.get((meta["scope"], meta["window"]))
+        if found:
+            meta["metrics"] = found
+        yield meta, model
+
+
+def verify(path):
+    bundle = ModelBundle(path)
+    start = time.perf_counter()
+    for entry in bundle.entries.values():
+        bundle.verify(entry)
+    print(f"{len(bundle.entries)} entries verified in {(time.perf_counter() - start) * 1e3:.0f} ms")
+    return bundle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=BUNDLE_PATH)
+    parser.add_argument("--verify-only", action="store_true", help="check an existing bundle's hashes")
+    args = parser.parse_args(argv)
+
+    if args.verify_only:
+        verify(args.out)
+        return
+
+    items = collect()
+    if not items:
+        parser.error("no model files found")
+    start = time.perf_counter()
+    manifest = write_bundle(iter_models(items, backtest_metrics()), args.out)
+    elapsed = time.perf_counter() - start
+
+    for key, entry in sorted(manifest["entries"].items()):
+        print(f"{key:<28} {entry['type']:<24} {entry['length'] / 2**20:7.2f} MB  "
+              f"{len(entry['buffers'])} buffers  {entry['sha256'][:12]}")
+    print(f"{len(manifest['entries'])} models, {os.path.getsize(args.out) / 2**20:.1f} MB "
+          f"written to {args.out} in {elapsed:.1f} s")
+    verify(args.out)
+
+
+if __name__ == "__main__":
+    main()
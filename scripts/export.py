@@ -0,0 +1,82 @@
+"""Stream dashboard aggregates or batch forecasts to CSV or Parquet.
+
+Usage::
+
+    python -m scripts.export aggregates [--format parquet] [--out state_year.parquet]
+    python -m scripts.export rainfall --years 2000-2010
+    python -m scripts.export forecasts --horizon 24 [--scale 1000]
+
+The export is written in chunks of at most ``utils.export.CHUNK_ROWS`` rows:
+one state at a time for aggregates and rainfall, and one batch of a state's
+districts per model for forecasts. Memory therefore stays bounded by the
+chunk size, not by the size of the output. ``--scale`` runs the export on the
+synthetic tiled table from ``scripts.bench_index``, to check that bound at
+1000x the data. The run prints the row count, file size and peak RSS.
+"""
+import argparse
+import os
+import resource
+import time
+
+from scripts.bench_index import synthetic
+from utils.data import load_dataset
+from utils.export import (
+    available_formats,
+    district_forecasts,
+    district_rainfall,
+    state_year_aggregates,
+    write_chunks,
+)
+from utils.indexed import IndexedDataset, shared_index
+from utils.models import load_state_forecaster, load_state_summary
+
+
+def forecast_models(summary_df):
+    for row in summary_df.itertuples(index=False):
+        model, path = load_state_forecaster(summary_df, row.State, int(row.Input_Months))
+        if model is None:
+            print(f"skipping {row.State} {row.Input_Months}m: {path} not found")
+            continue
+        yield row.State, int(row.Input_Months), model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=["aggregates", "rainfall", "forecasts"])
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default=None, help="output file (default: <kind>.<format>)")
+    parser.add_argument("--years", type=lambda s: tuple(int(y) for y in s.split("-")), default=None,
+                        help="year range for rainfall, e.g. 2000-2010")
+    parser.add_argument("--horizon", type=int, default=12)
+    parser.add_argument("--scale", type=int, default=1, help="tile the dataset this many times")
+    args = parser.parse_args(argv)
+
+    if args.format not in available_formats():
+        parser.error("parquet export needs pyarrow installed")
+
+    if args.scale > 1:
+        index = IndexedDataset(synthetic(load_dataset(), args.scale))
+    else:
+        index = shared_index()
+
+    if args.kind == "aggregates":
+        chunks = state_year_aggregates(index)
+    elif args.kind == "rainfall":
+        chunks = district_rainfall(index, args.years or (index.year_min, index.year_max))
+    else:
+        chunks = district_forecasts(index, forecast_models(load_state_summary()), args.horizon)
+
+    out = args.out or f"{args.kind}.{args.format}"
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    rows = write_chunks(chunks, out, args.format)
+    elapsed = time.perf_counter() - start
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"{rows:,} rows, {os.path.getsize(out) / 2**20:.1f} MB written to {out} in {elapsed:.1f} s "
+          f"(dataset {len(index):,} rows; peak RSS {rss_peak:.0f} MB, "
+          f"{rss_peak - rss_before:+.0f} MB while exporting)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Per-page import cost and cold-start budget check.
+
+Usage::
+
+    python -m scripts.import_budget [--pages Home.py,pages/4_Interactive_Map.py]
+                                    [--repeat 3] [--imports-only]
+
+Each page is measured in a fresh interpreter started with ``-X importtime``.
+``streamlit`` is imported first and is not counted, because every page pays
+for it. Two numbers are recorded:
+
+- ``import_ms``: the page's own top-level import statements.
+- ``cold_start_ms``: the imports plus one bare-mode run of the script,
+  which includes every lazily imported library the page actually touches.
+
+Budgets and per-page forbidden packages live in
+``config/import_budget.json``. The report goes to
+``reports/import_budget.csv``. The process exits with status 1 when a page
+is over budget or loads a forbidden package, so the check can gate a
+benchmark run.
+"""
+import argparse
+import ast
+import csv
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from utils.data import BASE_DIR
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+BUDGET_CONFIG = os.path.join(BASE_DIR, "config", "import_budget.json")
+
+MARKER = "--- mfps page imports ---"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+CHILD = r'''
+import json, os, runpy, sys, time
+sys.path.insert(0, {base!r})
+os.chdir({base!r})
+import streamlit
+sys.stderr.write({marker!r} + "\n")
+sys.stderr.flush()
+before = set(sys.modules)
+t0 = time.perf_counter()
+exec(compile({imports!r}, {page!r}, "exec"), {{"__name__": "__page_imports__"}})
+t1 = time.perf_counter()
+imported = sorted(set(sys.modules) - before)
+status = "ok"
+if {run!r}:
+    try:
+        runpy.run_path({page!r}, run_name="__main__")
+    except BaseException as exc:
+        status = type(exc).__name__
+t2 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1e3,
+    "cold_start_ms": (t2 - t0) * 1e3,
+    "status": status,
+    "imported": imported,
+    "loaded": sorted(set(sys.modules) - before),
+}}))
+'''
+
+
+def page_imports(path):
+    """Source of the module-level ``import``/``from`` statements of a page."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def parse_importtime(stderr):
+    """Cumulative microseconds per top-level package imported after the marker."""
+    roots = {}
+    for line in stderr.split(MARKER, 1)[-1].splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m and len(m.group(3)) == 1:           # depth 0 in the import tree
+            package = m.group(4).split(".")[0]
+            roots[package] = roots.get(package, 0) + int(m.group(2))
+    return roots
+
+
+def measure(page, run=True):
+    path = os.path.join(BASE_DIR, page)
+    code = CHILD.format(base=BASE_DIR, marker=MARKER, imports=page_imports(path), page=path, run=run)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    result = None
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            result = json.loads(line)
+            break
+    if result is None:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"{page}: measurement failed ({tail[0]})")
+    result["packages_us"] = parse_importtime(proc.stderr)
+    return result
+
+
+def load_budgets(path=BUDGET_CONFIG):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    config = load_budgets()
+    defaults = config.get("defaults", {})
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=lambda s: s.split(","), default=list(config["pages"]))
+    parser.add_argument("--repeat", type=int, default=config.get("repeat", 3))
+    parser.add_argument("--imports-only", action="store_true",
+                        help="skip the bare-mode run (no cold-start number or budget)")
+    args = parser.parse_args(argv)
+
+    rows, failures = [], []
+    for page in args.pages:
+        budget = {**defaults, **config["pages"].get(page, {})}
+        runs = [measure(page, run=not args.imports_only) for _ in range(args.repeat)]
+        first = runs[0]
+
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        cold_ms = None if args.imports_only else statistics.median(r["cold_start_ms"] for r in runs)
+        loaded = {m.split(".")[0] for m in first["imported" if args.imports_only else "loaded"]}
+        forbidden = sorted(loaded & set(budget.get("forbid", [])))
+        top = sorted(first["packages_us"].items(), key=lambda kv: -kv[1])[:8]
+
+        problems = []
+        if import_ms > budget["import_ms"]:
+            problems.append(f"imports {import_ms:.0f} ms > {budget['import_ms']} ms")
+        if cold_ms is not None and cold_ms > budget["cold_start_ms"]:
+            problems.append(f"cold start {cold_ms:.0f} ms > {budget['cold_start_ms']} ms")
+        if forbidden:
+            problems.append(f"loads {', '.join(forbidden)}")
+        if problems:
+            failures.append(f"{page}: " + "; ".join(problems))
+
+        rows.append({
+            "Page": page,
+            "Import_ms": round(import_ms, 1),
+            "Import_Budget_ms": budget["import_ms"],
+            "Cold_Start_ms": None if cold_ms is None else round(cold_ms, 1),
+            "Cold_Start_Budget_ms": None if args.imports_only else budget["cold_start_ms"],
+            "Run_Status": "skipped" if args.imports_only else first["status"],
+            "Forbidden_Loaded": " ".join(forbidden),
+            "Top_Packages": " ".join(f"{name}:{us / 1000:.0f}ms" for name, us in top),
+            "OK": not problems,
+        })
+        print(f"{'ok  ' if not problems else 'FAIL'} {page:<32} imports {import_ms:7.1f} ms"
+              + ("" if cold_ms is None else f"  cold start {cold_ms:8.1f} ms")
+              + (f"  [{'; '.join(problems)}]" if problems else ""), flush=True)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    out = os.path.join(REPORT_DIR, "import_budget.csv")
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Report written to {out}")
+
+    if failures:
+        print("\nImport budget exceeded:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Prepare every per-version artefact after the dataset changes.
+
+Usage::
+
+    python -m scripts.ingest [--skip-scores]
+
+Run after replacing ``data/your_flood_data.csv``. It writes the summary
+snapshot that Home and the Overview KPI cards render from
+(``cache/summary/summary_<version>.json``). It then refreshes the cached
+flood-model scores, unless ``--skip-scores`` is given.
+"""
+import argparse
+import time
+
+from utils.data import dataset_version
+from utils.summary import build_summary, summary_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skip-scores", action="store_true",
+                        help="only build the summary snapshot (no model, no pandas)")
+    args = parser.parse_args(argv)
+
+    version = dataset_version()
+    start = time.perf_counter()
+    summary = build_summary(version=version)
+    print(f"Dataset version {version}: {summary['records']} records, {summary['states']} states, "
+          f"{summary['districts']} districts, {summary['year_min']}–{summary['year_max']}, "
+          f"{summary['flood_rate']:.1%} flood rate ({time.perf_counter() - start:.2f}s)")
+    print(f"Summary written to {summary_path(version)}")
+
+    if not args.skip_scores:
+        from scripts import score_floods
+        score_floods.main([])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""Concurrent-user load test for the prediction and map pages.
+
+Usage::
+
+    python -m scripts.load_test [--users 1,2,4,8,16,32] [--duration 60] [--slo 2.0]
+                                [--scripts prediction,map] [--url ws://127.0.0.1:8599]
+
+Starts ``streamlit run Home.py`` headless on a free local port (unless
+``--url`` points at a running server), then opens N websocket sessions on
+``/_stcore/stream`` per level and replays interaction scripts: switching
+state, changing the year / input-window sliders and pressing Predict. Every
+step is one script rerun; its latency is the time from sending the
+``rerun_script`` BackMsg to receiving ``script_finished``.
+
+Writes to ``reports/``:
+
+- ``load_test_summary.csv``: per level, rerun latency p50/p90/p95/p99,
+  throughput, errors, mean/peak CPU and peak RSS.
+- ``load_test_latencies.csv``: every rerun.
+- ``load_test_resources.csv``: CPU and RSS of the server process tree over
+  time.
+
+The saturation point is the first level whose p95 exceeds ``--slo`` or
+whose throughput grows by less than 10% over the previous level.
+Everything runs offline on one Linux box. Widget states follow the
+Streamlit 1.3x/1.4x protocol: selectbox and radio send an option index,
+sliders a double array, buttons a trigger.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from utils.data import BASE_DIR
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+
+PLATEAU_GAIN = 1.10
+
+# Each step is (action, target, value). "open" switches page; "choose",
+# "slide" and "click" find a widget on the current page by label prefix.
+# A value of None picks a random option or slider position.
+SCRIPTS = {
+    "prediction": [
+        ("open", "flood_prediction", None),
+        ("choose", "Select State", None),
+        ("slide", "Number of past months used as input", None),
+        ("click", "🔮 Predict for", None),
+        ("choose", "Select State", None),
+        ("slide", "Number of future months to predict", None),
+        ("click", "🔮 Predict for", None),
+        ("click", "🔮 Predict Malaysia Rainfall", None),
+    ],
+    "map": [
+        ("open", "interactive_map", None),
+        ("choose", "Select Year", None),
+        ("choose", "Select State", None),
+        ("choose", "Select Year", None),
+        ("choose", "Select State", "All States"),
+    ],
+}
+
+
+# =================================================
+# SERVER
+# =================================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", os.path.join(BASE_DIR, "Home.py"),
+        "--server.headless", "true",
+        "--server.port", str(port),
+        "--server.address", "127.0.0.1",
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+    ]
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.read().strip() == b"ok":
+                    return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("streamlit did not become healthy within 60s")
+
+
+# =================================================
+# RESOURCE SAMPLING (/proc)
+# =================================================
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _proc_tree(root):
+    """``root`` and all of its descendants (the scenario pool runs in children)."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        parents.setdefault(int(fields[1]), []).append(int(entry))
+    tree, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(parents.get(pid, []))
+    return tree
+
+
+def _cpu_ticks_and_rss(pids):
+    ticks = rss = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            ticks += int(fields[11]) + int(fields[12])   # utime + stime
+            rss += int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            continue
+    return ticks, rss
+
+
+async def sample_resources(pid, interval, samples, label):
+    """Append ``(t, users, cpu %, rss MB)`` rows until cancelled."""
+    last_ticks, _ = _cpu_ticks_and_rss(_proc_tree(pid))
+    last_t = time.perf_counter()
+    while True:
+        await asyncio.sleep(interval)
+        ticks, rss = _cpu_ticks_and_rss(_proc_tree(pid))
+        now = time.perf_counter()
+        cpu = (ticks - last_ticks) / CLK_TCK / (now - last_t) * 100
+        samples.append({"Time": time.time(), "Users": label["users"],
+                        "CPU_Percent": round(cpu, 1), "RSS_MB": round(rss / 2**20, 1)})
+        last_ticks, last_t = ticks, now
+
+
+# =================================================
+# WEBSOCKET SESSION
+# =================================================
+class Session:
+    """One simulated browser tab speaking the Streamlit BackMsg/ForwardMsg protocol."""
+
+    def __init__(self, url, rng):
+        self.url = url
+        self.rng = rng
+        self.pages = {}
+        self.page_hash = ""
+        self.widgets = {}      # label -> (kind, element proto)
+        self.values = {}       # widget id -> WidgetState
+        self.msg_cache = {}    # ForwardMsg hash -> ForwardMsg (for ref_hash replies)
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.conn = await websocket_connect(
+            self.url.rstrip("/") + "/_stcore/stream",
+            subprotocols=["streamlit"],
+            max_message_size=256 * 2**20,
+        )
+
+    def close(self):
+        self.conn.close()
+
+    async def rerun(self, trigger=None):
+        """Send one ``rerun_script`` and wait for it to finish; returns (seconds, error)."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        for state in self.values.values():
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(trigger)
+
+        widgets, error = {}, False
+        start = time.perf_counter()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            raw = await self.conn.read_message()
+            if raw is None:
+                raise ConnectionError("server closed the websocket")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "ref_hash":
+                fwd = self.msg_cache.get(fwd.ref_hash, fwd)
+                kind = fwd.WhichOneof("type")
+            elif fwd.metadata.cacheable:
+                self.msg_cache[fwd.hash] = fwd
+
+            if kind == "new_session":
+                self.pages = {
+                    p.page_name.lower().replace(" ", "_"): p.page_script_hash
+                    for p in fwd.new_session.app_pages
+                }
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    error = True
+                proto = getattr(element, etype, None)
+                label = getattr(proto, "label", None)
+                if label and hasattr(proto, "id"):
+                    widgets[label] = (etype, proto)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                break
+
+        self.widgets = widgets
+        return time.perf_counter() - start, error
+
+    def _find(self, prefix):
+        for label, (etype, proto) in self.widgets.items():
+            if label.startswith(prefix):
+                return etype, proto
+        return None, None
+
+    def step(self, action, target, value):
+        """Update widget state for one scripted action; returns a trigger state or None."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        if action == "open":
+            self.page_hash = next(
+                (h for name, h in self.pages.items() if target in name), self.page_hash
+            )
+            self.values = {}
+            return None
+
+        etype, proto = self._find(target)
+        if proto is None:
+            return None
+        state = WidgetState()
+        state.id = proto.id
+        if action == "click":
+            state.trigger_value = True
+            return state
+        if action == "choose":
+            options = list(proto.options)
+            index = options.index(value) if value in options else self.rng.randrange(len(options))
+            state.int_value = index
+        elif action == "slide":
+            if proto.options:       # select_slider: index into the options
+                state.double_array_value.data.append(self.rng.randrange(len(proto.options)))
+            else:
+                steps = int(round((proto.max - proto.min) / (proto.step or 1)))
+                state.double_array_value.data.append(proto.min + self.rng.randint(0, steps) * (proto.step or 1))
+        self.values[proto.id] = state
+        return None
+
+
+async def run_user(url, script_names, until, think, seed, records, users):
+    rng = random.Random(seed)
+    session = Session(url, rng)
+    await session.connect()
+    try:
+        await session.rerun()   # initial page load, as the browser does on connect
+        while time.perf_counter() < until:
+            name = rng.choice(script_names)
+            for action, target, value in SCRIPTS[name]:
+                if time.perf_counter() >= until:
+                    break
+                trigger = session.step(action, target, value)
+                seconds, error = await session.rerun(trigger)
+                records.append({"Users": users, "Script": name, "Action": f"{action}:{target}",
+                                "Latency_s": seconds, "Error": error, "Time": time.time()})
+                if think > 0:
+                    await asyncio.sleep(rng.expovariate(1 / think))
+    finally:
+        session.close()
+
+
+# =================================================
+# DRIVER
+# =================================================
+def summarize(users, records, samples, duration):
+    lat = np.array([r["Latency_s"] for r in records if r["Users"] == users])
+    res = [s for s in samples if s["Users"] == users]
+    if len(lat) == 0:
+        return {"Users": users, "Reruns": 0}
+    p50, p90, p95, p99 = np.percentile(lat, [50, 90, 95, 99])
+    return {
+        "Users": users,
+        "Reruns": len(lat),
+        "Errors": sum(r["Error"] for r in records if r["Users"] == users),
+        "Throughput_per_s": round(len(lat) / duration, 2),
+        "P50_s": round(p50, 3), "P90_s": round(p90, 3),
+        "P95_s": round(p95, 3), "P99_s": round(p99, 3),
+        "Max_s": round(lat.max(), 3),
+        "CPU_Mean_Percent": round(np.mean([s["CPU_Percent"] for s in res]), 1) if res else None,
+        "CPU_Peak_Percent": max((s["CPU_Percent"] for s in res), default=None),
+        "RSS_Peak_MB": max((s["RSS_MB"] for s in res), default=None),
+    }
+
+
+def saturation_point(summary, slo):
+    """``(users, reason)`` of the first saturated level, or ``(None, "")``."""
+    previous = None
+    for row in summary:
+        if row.get("Reruns", 0) == 0:
+            continue
+        if row["P95_s"] > slo:
+            return row["Users"], f"p95 {row['P95_s']:.2f}s above the {slo:.2f}s SLO"
+        if previous and row["Throughput_per_s"] < previous["Throughput_per_s"] * PLATEAU_GAIN:
+            return row["Users"], (f"throughput {row['Throughput_per_s']}/s vs "
+                                  f"{previous['Throughput_per_s']}/s at {previous['Users']} users")
+        previous = row
+    return None, ""
+
+
+async def drive(args, url, server_pid):
+    records, samples, summary = [], [], []
+    label = {"users": 0}
+    sampler = None
+    if server_pid is not None:
+        sampler = asyncio.ensure_future(sample_resources(server_pid, args.sample_interval, samples, label))
+
+    try:
+        if args.warmup:
+            # One pass of every script so model loads and cache fills are not measured.
+            await run_user(url, args.scripts, time.perf_counter() + args.warmup, 0, -1, [], 0)
+
+        for users in args.users:
+            label["users"] = users
+            until = time.perf_counter() + args.duration
+            await asyncio.gather(*(
+                run_user(url, args.scripts, until, args.think, args.seed * 1000 + i, records, users)
+                for i in range(users)
+            ))
+            row = summarize(users, records, samples, args.duration)
+            summary.append(row)
+            print(f"{users:>4} users: {row.get('Reruns', 0):>5} reruns, "
+                  f"p50 {row.get('P50_s', float('nan')):.2f}s  p95 {row.get('P95_s', float('nan')):.2f}s  "
+                  f"CPU {row.get('CPU_Mean_Percent')}%  RSS {row.get('RSS_Peak_MB')} MB", flush=True)
+            if args.stop_at_saturation and saturation_point(summary, args.slo)[0] is not None:
+                break
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+    return records, samples, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds per level")
+    parser.add_argument("--scripts", type=lambda s: s.split(","), default=list(SCRIPTS))
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between steps (s)")
+    parser.add_argument("--slo", type=float, default=2.0, help="p95 rerun latency budget (s)")
+    parser.add_argument("--warmup", type=float, default=30.0, help="seconds of single-user warm-up")
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--stop-at-saturation", action="store_true")
+    parser.add_argument("--url", help="websocket base URL of a running server (skips spawning one)")
+    parser.add_argument("--pid", type=int, help="server PID to sample when --url is given")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scripts) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"unknown scripts {sorted(unknown)}; choose from {sorted(SCRIPTS)}")
+
+    proc = None
+    if args.url:
+        url, server_pid = args.url, args.pid
+    else:
+        port = free_port()
+        proc = start_server(port)
+        url, server_pid = f"ws://127.0.0.1:{port}", proc.pid
+
+    try:
+        records, samples, summary = asyncio.run(drive(args, url, server_pid))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    pd.DataFrame(summary).to_csv(os.path.join(REPORT_DIR, "load_test_summary.csv"), index=False)
+    pd.DataFrame(records).to_csv(os.path.join(REPORT_DIR, "load_test_latencies.csv"), index=False)
+    pd.DataFrame(samples).to_csv(os.path.join(REPORT_DIR, "load_test_resources.csv"), index=False)
+
+    users, reason = saturation_point(summary, args.slo)
+    if users is None:
+        print(f"No saturation up to {args.users[-1]} users (p95 SLO {args.slo:.2f}s).")
+    else:
+        capacity = max((r["Users"] for r in summary if r["Users"] < users), default=0)
+        print(f"Saturation at {users} users ({reason}); last healthy level: {capacity} users.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Resolve coordinates to districts, with each district's forecast and risk.
+
+Usage::
+
+    python -m scripts.locate points.csv [--out located.csv] [--window 6] [--horizon 6]
+    python -m scripts.locate --bench 100000 [--seed 0]
+
+``points.csv`` needs ``lat`` and ``lon`` columns. Every row is matched
+against the district polygons of ``data/malaysia_districts.geojson`` (see
+``utils.spatial``), then joined to that district's state outlook: the
+next-month and peak forecast with their risk levels, and the model's flood
+probability for the latest year (see ``utils.outlook``).
+
+``--bench`` skips the outlook and times the lookup alone: the index build,
+one point at a time, and one bulk call over that many random points inside
+the polygons' bounding box.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.flood_scores import shared_flood_scores
+from utils.indexed import shared_index
+from utils.maps import GEOJSON_PATH
+from utils.outlook import DEFAULT_HORIZON, locate_outlook
+from utils.spatial import load_spatial_index, shared_spatial_index
+
+
+def bench(n, seed):
+    start = time.perf_counter()
+    spatial = load_spatial_index(GEOJSON_PATH)
+    print(f"build: {len(spatial)} districts in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    rng = np.random.default_rng(seed)
+    lon_min, lat_min, lon_max, lat_max = spatial.bounds
+    lat = rng.uniform(lat_min, lat_max, n)
+    lon = rng.uniform(lon_min, lon_max, n)
+
+    singles = min(n, 2000)
+    start = time.perf_counter()
+    for i in range(singles):
+        spatial.locate(lat[i], lon[i])
+    single_us = (time.perf_counter() - start) / singles * 1e6
+
+    start = time.perf_counter()
+    found = spatial.lookup(lat, lon)
+    bulk_s = time.perf_counter() - start
+
+    print(f"single: {single_us:.1f} us/point over {singles:,} points")
+    print(f"bulk:   {bulk_s * 1e6 / n:.2f} us/point, {n / bulk_s:,.0f} points/s over {n:,} points "
+          f"({(found >= 0).mean():.0%} inside a district)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("points", nargs="?", help="CSV with lat and lon columns")
+    parser.add_argument("--out", default="located.csv")
+    parser.add_argument("--window", type=int, default=6, help="input months of the state forecasters")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON)
+    parser.add_argument("--bench", type=int, default=0, metavar="N", help="time N random lookups instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.bench, args.seed)
+        return
+    if not args.points:
+        parser.error("give a points CSV or --bench N")
+
+    points = pd.read_csv(args.points)
+    start = time.perf_counter()
+    located = locate_outlook(shared_spatial_index(), shared_index(), shared_flood_scores(),
+                             points["lat"].to_numpy(), points["lon"].to_numpy(),
+                             args.window, args.horizon)
+    located.to_csv(args.out, index=False)
+    print(f"{located['DISTRICT_NAME'].notna().sum():,} of {len(located):,} points located "
+          f"in {time.perf_counter() - start:.2f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
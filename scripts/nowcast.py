@@ -0,0 +1,192 @@
+"""Replay a monthly observation feed through the nowcaster, or send one to a dashboard.
+
+Usage::
+
+    python -m scripts.nowcast replay [--via direct|socket|dir] [--months 12] [--rate 0]
+    python -m scripts.nowcast send observations.csv --port 8765
+
+``replay`` builds a :class:`utils.nowcast.Nowcaster` in this process and
+synthesizes ``--months`` months after each district's last observed year.
+Each value is the same calendar month of that year, jittered by up to
++/-20%. The feed goes in one month (every district) at a time:
+
+- ``direct``: straight into ``Nowcaster.apply``, so this measures the
+  window update and re-forecast alone
+- ``socket``: over TCP to the socket source
+- ``dir``: as one CSV per month into a drop directory
+
+``--rate`` caps the feed in observations/s; 0 sends as fast as possible.
+Latency runs from each observation's ``SENT_AT`` stamp (the file's mtime for
+``dir``) to its forecast being published. Throughput, latency percentiles and
+the counters are appended to ``reports/nowcast_benchmark.csv``.
+
+``send`` streams a CSV with STATE_NAME, DISTRICT_NAME, YEAR, MONTH and
+RAINFALL columns to a dashboard started with ``MFPS_NOWCAST_PORT``.
+"""
+import argparse
+import csv
+import json
+import os
+import socket
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data import BASE_DIR, MONTHLY_COLS
+from utils.indexed import shared_index
+from utils.models import MIN_WINDOW
+from utils.nowcast import Nowcaster, Observation
+from utils.outlook import DEFAULT_HORIZON
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+FIELDS = ["STATE_NAME", "DISTRICT_NAME", "YEAR", "MONTH", "RAINFALL"]
+
+
+def synthetic_feed(index, months, seed=0):
+    """One list of observation records per month, covering every district."""
+    rng = np.random.default_rng(seed)
+    latest = [(state, district, index.district(state, district).iloc[-1])
+              for state in index.states() for district in index.districts(state)]
+    feed = []
+    for k in range(months):
+        feed.append([
+            {"STATE_NAME": state, "DISTRICT_NAME": district,
+             "YEAR": int(row["YEAR"]) + 1 + k // 12, "MONTH": MONTHLY_COLS[k % 12],
+             "RAINFALL": round(float(row[MONTHLY_COLS[k % 12]]) * rng.uniform(0.8, 1.2), 1)}
+            for state, district, row in latest
+        ])
+    return feed
+
+
+def pace(sent, start, rate):
+    if rate:
+        delay = start + sent / rate - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def wait_drained(nowcaster, total, timeout=120):
+    """Block until every sent observation has been applied or skipped."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = nowcaster.stats()
+        if stats["received"] + stats["rejected"] >= total and stats["queued"] == 0:
+            return
+        time.sleep(0.01)
+
+
+def replay(args):
+    index = shared_index()
+    nowcaster = Nowcaster(index, args.window, args.horizon)
+    prime_start = time.perf_counter()
+    nowcaster.prime(index.states())
+    print(f"primed {len(index.states())} states in {time.perf_counter() - prime_start:.2f} s")
+
+    feed = synthetic_feed(index, args.months, args.seed)
+    total = sum(len(month) for month in feed)
+    start = time.time()
+    sent = 0
+
+    if args.via == "direct":
+        for month in feed:
+            pace(sent, start, args.rate)
+            now = time.time()
+            nowcaster.apply([Observation(r["STATE_NAME"], r["DISTRICT_NAME"], r["YEAR"],
+                                         MONTHLY_COLS.index(r["MONTH"]), r["RAINFALL"], now)
+                             for r in month])
+            sent += len(month)
+
+    elif args.via == "socket":
+        nowcaster.start()
+        server = nowcaster.serve_socket(0)
+        port = server.server_address[1]
+        with socket.create_connection(("127.0.0.1", port)) as conn:
+            for month in feed:
+                for r in month:
+                    pace(sent, start, args.rate)
+                    conn.sendall((json.dumps(dict(r, SENT_AT=time.time())) + "\n").encode())
+                    sent += 1
+        wait_drained(nowcaster, total)
+        server.shutdown()
+
+    else:
+        drop_dir = tempfile.mkdtemp(prefix="nowcast-")
+        nowcaster.start(drop_dir=drop_dir)
+        for k, month in enumerate(feed):
+            pace(sent, start, args.rate)
+            tmp = os.path.join(drop_dir, f".month-{k:04d}.csv")
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, FIELDS)
+                writer.writeheader()
+                writer.writerows(month)
+            os.replace(tmp, os.path.join(drop_dir, f"month-{k:04d}.csv"))
+            sent += len(month)
+        wait_drained(nowcaster, total)
+
+    elapsed = time.time() - start
+    nowcaster.stop()
+    stats = nowcaster.stats()
+
+    print(f"{stats['applied']:,} of {total:,} observations applied via {args.via} in {elapsed:.2f} s "
+          f"({stats['applied'] / elapsed:,.0f} obs/s, {stats['forecast_rows']:,} district forecasts "
+          f"in {stats['batches']:,} batches)")
+    print("latency ms: " + ", ".join(
+        f"{p} {stats[f'latency_{p}_ms']:.1f}" for p in ("p50", "p95", "p99", "max")
+        if stats[f"latency_{p}_ms"] is not None
+    ))
+    skipped = {k: stats[k] for k in ("stale", "gaps", "unknown", "rejected", "errors") if stats[k]}
+    if skipped:
+        print("skipped: " + ", ".join(f"{n:,} {k}" for k, n in skipped.items()))
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, "nowcast_benchmark.csv")
+    row = pd.DataFrame([{
+        "Timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "Via": args.via, "Months": args.months, "Rate_Cap": args.rate,
+        "Input_Months": args.window, "Horizon": args.horizon,
+        "Sent": total, "Applied": stats["applied"], "Elapsed_s": round(elapsed, 3),
+        "Throughput_per_s": round(stats["applied"] / elapsed, 1),
+        "Forecast_Rows": stats["forecast_rows"], "Batches": stats["batches"],
+        **{f"Latency_{p}_ms": stats[f"latency_{p}_ms"] for p in ("p50", "p95", "p99", "max")},
+    }])
+    row.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    print(f"report appended to {path}")
+
+
+def send(args):
+    sent = 0
+    with open(args.file, encoding="utf-8", newline="") as f, \
+            socket.create_connection(("127.0.0.1", args.port)) as conn:
+        for record in csv.DictReader(f):
+            conn.sendall((json.dumps(dict(record, SENT_AT=time.time())) + "\n").encode())
+            sent += 1
+    print(f"sent {sent:,} observations to 127.0.0.1:{args.port}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("replay", help="benchmark a synthetic feed in this process")
+    p.add_argument("--via", choices=["direct", "socket", "dir"], default="direct")
+    p.add_argument("--months", type=int, default=12)
+    p.add_argument("--rate", type=float, default=0, help="observations/s cap (0: unthrottled)")
+    p.add_argument("--window", type=int, default=MIN_WINDOW)
+    p.add_argument("--horizon", type=int, default=DEFAULT_HORIZON)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("send", help="stream a CSV of observations to a running dashboard")
+    p.add_argument("file")
+    p.add_argument("--port", type=int, required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "replay":
+        replay(args)
+    else:
+        send(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Monte Carlo flood-risk outlook for every state.
+
+Usage::
+
+    python -m scripts.run_scenarios [--n-input 6] [--horizon 12] [--scenarios 5000] [--workers 4]
+
+Writes ``reports/scenario_outlook.csv`` (per-state, per-month P(High Risk)
+and spread) and ``reports/scenario_exceedance.csv`` (exceedance curves).
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from utils.data import BASE_DIR, load_dataset
+from utils.models import load_state_summary, state_model_path
+from utils.scenarios import CURVE_THRESHOLDS, run_states
+
+REPORT_DIR = os.path.join(BASE_DIR, "reports")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-input", type=int, default=6)
+    parser.add_argument("--horizon", type=int, default=12)
+    parser.add_argument("--scenarios", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    summary_df = load_state_summary()
+    model_paths = {}
+    for state in summary_df["State"].unique():
+        path = state_model_path(summary_df, state, args.n_input)
+        if path is not None and os.path.exists(path):
+            model_paths[state] = path
+    if not model_paths:
+        parser.error(f"no state has a {args.n_input}-month model file")
+
+    outlook, curves, elapsed = run_states(
+        df, model_paths, args.n_input, args.horizon, args.scenarios,
+        workers=args.workers, seed=args.seed
+    )
+
+    curve_rows = []
+    for state, curve in curves.items():
+        for step, probs in enumerate(curve, start=1):
+            curve_rows.append(pd.DataFrame({
+                "State": state, "Step": step,
+                "Threshold_mm": CURVE_THRESHOLDS, "P_Exceed": probs,
+            }))
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    outlook.to_csv(os.path.join(REPORT_DIR, "scenario_outlook.csv"), index=False)
+    pd.concat(curve_rows, ignore_index=True).to_csv(
+        os.path.join(REPORT_DIR, "scenario_exceedance.csv"), index=False
+    )
+
+    total = args.scenarios * len(model_paths)
+    print(outlook.pivot(index="State", columns="Step", values="P_High").round(2))
+    print(f"{total} scenarios x {args.horizon} months across {len(model_paths)} states "
+          f"in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
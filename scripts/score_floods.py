@@ -0,0 +1,32 @@
+"""Score every district-year with ``final_flood_model.sav`` and cache the result.
+
+Usage::
+
+    python -m scripts.score_floods
+
+Run after replacing ``data/your_flood_data.csv``; only rows that are new or
+changed since the last scores file are sent through the classifier.
+"""
+import argparse
+import time
+
+from utils.data import dataset_version, load_dataset
+from utils.flood_scores import build_scores, scores_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args(argv)
+
+    version = dataset_version()
+    start = time.perf_counter()
+    scores, n_scored = build_scores(load_dataset(), version)
+    elapsed = time.perf_counter() - start
+
+    print(f"Dataset version {version}: {len(scores)} rows, {n_scored} scored by the model, "
+          f"{len(scores) - n_scored} reused ({elapsed:.2f}s)")
+    print(f"Scores written to {scores_path(version)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Train the national cross-state forecaster and compare it with the per-state files.
+
+Usage::
+
+    python -m scripts.train_global [--with-district] [--holdout-years 2]
+
+Writes ``rf_models/rf_global.sav``, the six ``rf_overall_{n}m.sav`` files the
+"Overall Malaysia" tab loads (thin views onto the global model), and
+``reports/global_model_report.csv`` with per-state holdout MAE/RMSE, total
+model bytes and warm single-row predict latency for both approaches.
+
+With ``--with-district`` each state's mean series is trained as well, under
+the model's "state-level" district code, which is what the state and overall
+tabs predict with.
+
+Caveat: the holdout is the last ``--holdout-years`` of every series. The
+global model never sees those years, but the per-state files were trained
+elsewhere and may have been fitted on them, so ``PerState_*`` errors can be
+optimistic. The report carries this as ``Holdout_Note``.
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from scripts.train_variable_window import build_sets, scores
+from utils.data import BASE_DIR, district_series, load_dataset, national_series, state_series
+from utils.models import (
+    GLOBAL_MODEL_PATH,
+    MAX_WINDOW,
+    MIN_WINDOW,
+    GlobalForecaster,
+    ScopedForecaster,
+    load_state_summary,
+    overall_model_path,
+    state_model_path,
+)
+
+REPORT_PATH = os.path.join(BASE_DIR, "reports", "global_model_report.csv")
+HOLDOUT_NOTE = "per-state models may have been trained on the holdout years"
+
+
+def warm_latency_ms(predict, X, repeats=50):
+    """Median single-row predict latency after one warm-up call."""
+    predict(X)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--with-district", action="store_true",
+                        help="also one-hot encode the district")
+    parser.add_argument("--holdout-years", type=int, default=2)
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--random-state", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    summary_df = load_state_summary()
+    series = district_series(df)
+    states = sorted(summary_df["State"].unique())
+    districts = sorted({d for (s, d) in series if s in states}) if args.with_district else None
+    holdout_months = args.holdout_years * 12
+
+    # ---- training matrix: every state's district windows + the national series ----
+    template = GlobalForecaster(None, states, districts)
+    feats, targets, tests = [], [], {}
+    scopes = [(s, d, series[(s, d)]) for (s, d) in series if s in states]
+    if args.with_district:
+        scopes += [(s, None, state_series(df, s)) for s in states]
+    scopes.append((None, None, national_series(df)))
+
+    for state, district, values in scopes:
+        train, test = build_sets([values], holdout_months)
+        for n in range(MIN_WINDOW, MAX_WINDOW + 1):
+            X, y = train[n]
+            feats.append(template.features(X, state, district))
+            targets.append(y)
+            if district is not None or state is None:     # state means only train the code
+                tests.setdefault(state, {}).setdefault(n, []).append((district, test[n]))
+
+    estimator = RandomForestRegressor(
+        n_estimators=args.n_estimators,
+        random_state=args.random_state,
+        n_jobs=-1,
+    )
+    estimator.fit(np.vstack(feats), np.concatenate(targets))
+    model = GlobalForecaster(estimator, states, districts)
+    joblib.dump(model, GLOBAL_MODEL_PATH, compress=3)
+
+    for n in range(MIN_WINDOW, MAX_WINDOW + 1):
+        joblib.dump(ScopedForecaster(None, n), overall_model_path(n))
+
+    # ---- comparison against the per-state, per-window files ----
+    rows = []
+    per_state_bytes = 0
+    for state in states:
+        for n in range(MIN_WINDOW, MAX_WINDOW + 1):
+            y_true, y_global, X_all = [], [], []
+            for district, (X_test, y_test) in tests[state][n]:
+                y_true.append(y_test)
+                y_global.append(model.predict(X_test, state=state, district=district))
+                X_all.append(X_test)
+            y_true = np.concatenate(y_true)
+            X_all = np.vstack(X_all)
+            g_mae, g_rmse = scores(y_true, np.concatenate(y_global))
+
+            ps_mae = ps_rmse = ps_latency = np.nan
+            path = state_model_path(summary_df, state, n)
+            if path is not None and os.path.exists(path):
+                per_state_bytes += os.path.getsize(path)
+                per_state = joblib.load(path)
+                ps_mae, ps_rmse = scores(y_true, per_state.predict(X_all))
+                ps_latency = warm_latency_ms(per_state.predict, X_all[:1])
+
+            rows.append({
+                "State": state,
+                "Input_Months": n,
+                "PerState_MAE": ps_mae,
+                "PerState_RMSE": ps_rmse,
+                "Global_MAE": g_mae,
+                "Global_RMSE": g_rmse,
+                "PerState_Predict_ms": ps_latency,
+                "Global_Predict_ms": warm_latency_ms(
+                    lambda X, s=state: model.predict(X, state=s), X_all[:1]
+                ),
+            })
+
+    report = pd.DataFrame(rows)
+    report["PerState_Total_Bytes"] = per_state_bytes
+    report["Global_Bytes"] = os.path.getsize(GLOBAL_MODEL_PATH)
+    report["Holdout_Note"] = HOLDOUT_NOTE
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    report.to_csv(REPORT_PATH, index=False)
+
+    print(report.groupby("State")[["PerState_MAE", "Global_MAE"]].mean().round(2))
+    print(f"Model bytes: per-state {per_state_bytes / 1e6:.1f} MB, "
+          f"global {os.path.getsize(GLOBAL_MODEL_PATH) / 1e6:.1f} MB")
+    print(f"Report written to {REPORT_PATH}")
+    print(f"Note: {HOLDOUT_NOTE}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Train one variable-window forest per state and compare it with the per-window files.
+
+Usage::
+
+    python -m scripts.train_variable_window [--states Johor Kedah] [--holdout-years 2]
+
+Writes ``rf_models/<state>_rf_vw.sav`` for every state in
+``state_model_summary.csv`` and ``reports/variable_window_report.csv`` with
+holdout MAE/RMSE of both model kinds for every window length, plus the bytes
+on disk (six per-window files vs one variable-window file).
+
+The serving footprint of each kind is measured too. A fresh interpreter
+moves the window slider across 6-11 months ``--sweeps`` times through
+``load_state_forecaster`` and predicts one window at each position. It
+records the resident memory those models added (``*_RSS_MB``), the number of
+loads from disk (``*_Loads``, from ``utils.models.load_counts``) and the
+number of models left resident.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from utils.data import BASE_DIR, district_series, load_dataset, sliding_windows
+from utils.models import (
+    MAX_WINDOW,
+    MIN_WINDOW,
+    VariableWindowForecaster,
+    load_state_summary,
+    state_model_path,
+    variable_window_features,
+    variable_window_path,
+)
+
+REPORT_PATH = os.path.join(BASE_DIR, "reports", "variable_window_report.csv")
+
+SERVE_CHILD = r'''
+import json, sys
+sys.path.insert(0, {base!r})
+import joblib, numpy as np, sklearn.ensemble
+from utils import models
+from utils.memory import process_rss
+
+summary_df = models.load_state_summary()
+rss0 = process_rss()
+for _ in range({sweeps}):
+    for n in range(models.MIN_WINDOW, models.MAX_WINDOW + 1):
+        model, _ = models.load_state_forecaster(summary_df, {state!r}, n, {variant!r})
+        if model is not None:
+            model.predict(np.full((1, n), 200.0))
+print(json.dumps({{
+    "rss_mb": (process_rss() - rss0) / 2**20,
+    "loads": sum(models.load_counts.values()),
+    "resident": len(models.resident_models()),
+}}))
+'''
+
+
+def split_windows(series, n_input, holdout_months):
+    """Windows whose target falls before / inside the last ``holdout_months``."""
+    X, y = sliding_windows(series, n_input)
+    cut = len(y) - holdout_months
+    return (X[:cut], y[:cut]), (X[cut:], y[cut:])
+
+
+def build_sets(series_list, holdout_months):
+    train, test = {}, {}
+    for n in range(MIN_WINDOW, MAX_WINDOW + 1):
+        tr_X, tr_y, te_X, te_y = [], [], [], []
+        for series in series_list:
+            (a, b), (c, d) = split_windows(series, n, holdout_months)
+            tr_X.append(a)
+            tr_y.append(b)
+            te_X.append(c)
+            te_y.append(d)
+        train[n] = (np.vstack(tr_X), np.concatenate(tr_y))
+        test[n] = (np.vstack(te_X), np.concatenate(te_y))
+    return train, test
+
+
+def fit_variable_window(train, n_estimators, random_state):
+    X = np.vstack([variable_window_features(train[n][0]) for n in train])
+    y = np.concatenate([train[n][1] for n in train])
+    estimator = RandomForestRegressor(
+        n_estimators=n_estimators,
+        random_state=random_state,
+        n_jobs=-1,
+    )
+    estimator.fit(X, y)
+    return VariableWindowForecaster(estimator)
+
+
+def scores(y_true, y_pred):
+    err = y_pred - y_true
+    return float(np.abs(err).mean()), float(np.sqrt((err ** 2).mean()))
+
+
+def serving_footprint(state, variant, sweeps):
+    """RSS added, loads from disk and resident models for ``sweeps`` slider sweeps in a fresh process."""
+    code = SERVE_CHILD.format(base=BASE_DIR, state=state, variant=variant, sweeps=sweeps)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+    raise RuntimeError(f"{state} {variant}: footprint measurement failed ({tail[0]})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", nargs="*", help="limit training to these states")
+    parser.add_argument("--holdout-years", type=int, default=2)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--sweeps", type=int, default=3, help="slider sweeps for the serving footprint")
+    args = parser.parse_args(argv)
+
+    df = load_dataset()
+    summary_df = load_state_summary()
+    series = district_series(df)
+    states = args.states or list(summary_df["State"].unique())
+    holdout_months = args.holdout_years * 12
+
+    rows = []
+    for state in states:
+        state_districts = [s for (st_name, _), s in series.items() if st_name == state]
+        if not state_districts:
+            print(f"skip {state}: no rows in dataset")
+            continue
+
+        train, test = build_sets(state_districts, holdout_months)
+        vw_model = fit_variable_window(train, args.n_estimators, args.random_state)
+        vw_path = variable_window_path(state)
+        joblib.dump(vw_model, vw_path, compress=3)
+        vw_bytes = os.path.getsize(vw_path)
+
+        per_window_bytes = 0
+        for n in range(MIN_WINDOW, MAX_WINDOW + 1):
+            X_test, y_test = test[n]
+            vw_mae, vw_rmse = scores(y_test, vw_model.predict(X_test))
+
+            pw_mae = pw_rmse = np.nan
+            path = state_model_path(summary_df, state, n)
+            if path is not None and os.path.exists(path):
+                per_window_bytes += os.path.getsize(path)
+                pw_mae, pw_rmse = scores(y_test, joblib.load(path).predict(X_test))
+
+            rows.append({
+                "State": state,
+                "Input_Months": n,
+                "Test_Windows": len(y_test),
+                "PerWindow_MAE": pw_mae,
+                "PerWindow_RMSE": pw_rmse,
+                "VariableWindow_MAE": vw_mae,
+                "VariableWindow_RMSE": vw_rmse,
+                "MAE_Delta": vw_mae - pw_mae,
+            })
+
+        pw_serve = serving_footprint(state, "per_window", args.sweeps)
+        vw_serve = serving_footprint(state, "variable_window", args.sweeps)
+        for row in rows:
+            if row["State"] == state:
+                row["PerWindow_Bytes"] = per_window_bytes
+                row["VariableWindow_Bytes"] = vw_bytes
+                row["PerWindow_RSS_MB"] = round(pw_serve["rss_mb"], 1)
+                row["VariableWindow_RSS_MB"] = round(vw_serve["rss_mb"], 1)
+                row["PerWindow_Loads"] = pw_serve["loads"]
+                row["VariableWindow_Loads"] = vw_serve["loads"]
+                row["PerWindow_Resident"] = pw_serve["resident"]
+                row["VariableWindow_Resident"] = vw_serve["resident"]
+        print(f"{state}: saved {os.path.basename(vw_path)} ({vw_bytes / 1e6:.1f} MB, "
+              f"per-window total {per_window_bytes / 1e6:.1f} MB); serving "
+              f"{vw_serve['rss_mb']:.0f} MB RSS / {vw_serve['loads']} loads vs "
+              f"{pw_serve['rss_mb']:.0f} MB / {pw_serve['loads']} per-window")
+
+    report = pd.DataFrame(rows)
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    report.to_csv(REPORT_PATH, index=False)
+    print(report.groupby("State")[["PerWindow_MAE", "VariableWindow_MAE", "MAE_Delta"]].mean().round(2))
+    print(report.groupby("State")[["PerWindow_RSS_MB", "VariableWindow_RSS_MB",
+                                   "PerWindow_Loads", "VariableWindow_Loads"]].first())
+    print(f"Report written to {REPORT_PATH}")
+    print("Note: per-window models may have seen the holdout years during their own training.")
+
+
+if __name__ == "__main__":
+    main()
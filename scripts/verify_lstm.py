@@ -0,0 +1,87 @@
+"""Check the NumPy LSTM forward pass against Keras and time both.
+
+Usage::
+
+    python -m scripts.verify_lstm [--batch 1024] [--atol 1e-4]
+
+Needs TensorFlow/Keras installed in the verification environment only; the
+dashboard itself never imports it.
+
+The result for each model (its sha256, the max error, pass/fail) is recorded in
+``reports/lstm_verification.json``. The Flood Prediction page serves the
+LSTM forecaster only while that record shows a pass for the model's current
+bytes and a scaler file sits next to it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from utils.lstm import (
+    FLOOD_LSTM_PATH,
+    FORECAST_LSTM_PATH,
+    VERIFICATION_PATH,
+    file_digest,
+    load_keras_h5,
+    load_verification,
+)
+
+
+def timed(fn, X, repeats=20):
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1024)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import keras
+
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    records = load_verification()
+    for path in (FORECAST_LSTM_PATH, FLOOD_LSTM_PATH):
+        ours = load_keras_h5(path)
+        reference = keras.models.load_model(path, compile=False)
+        X = rng.random((args.batch, *ours.input_shape), dtype=np.float32)
+
+        expected = reference.predict(X, verbose=0)
+        got = ours.predict(X)
+        max_err = float(np.abs(expected - got).max())
+        ok = np.allclose(expected, got, atol=args.atol)
+        failed |= not ok
+
+        records[os.path.basename(path)] = {
+            "sha256": file_digest(path),
+            "passed": bool(ok),
+            "max_abs_err": max_err,
+            "atol": args.atol,
+            "batch": args.batch,
+            "keras_version": getattr(keras, "__version__", None),
+            "verified_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+        print(f"{path}: max |keras - numpy| = {max_err:.2e} -> {'OK' if ok else 'MISMATCH'}")
+        print(f"  batch {args.batch}: keras {timed(lambda a: reference.predict(a, verbose=0), X):.2f} ms, "
+              f"numpy {timed(ours.predict, X):.2f} ms; single row numpy "
+              f"{timed(ours.predict, X[:1]):.3f} ms")
+
+    os.makedirs(os.path.dirname(VERIFICATION_PATH), exist_ok=True)
+    with open(VERIFICATION_PATH, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+    print(f"Recorded in {VERIFICATION_PATH}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
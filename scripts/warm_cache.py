@@ -0,0 +1,100 @@
+"""Fill the persistent disk cache at deploy time.
+
+Usage::
+
+    python -m scripts.warm_cache [--maps all|default|none] [--pages Home.py,pages/2_Overview.py]
+                                 [--skip-pages]
+
+In order, this:
+
+- builds the indexed dataset, the flood scores and the summary snapshot
+- builds the map layers for every state and year (``--maps all``), or only
+  the map's default view
+- forecasts every district's latest window with its state forecaster, so
+  the map's click-to-forecast panel starts warm
+- runs each dashboard page once in Streamlit's bare mode, so the figures
+  and results for default widget values are written through to
+  ``cache/results``
+
+Every entry is keyed by the dataset and code version, so run this after each
+deploy or ingest. Results from older versions are no longer read and age out
+under ``MFPS_DISK_CACHE_MB``.
+"""
+import argparse
+import os
+import runpy
+import time
+
+from utils import disk_cache
+from utils.data import BASE_DIR, dataset_version
+from utils.flood_scores import shared_flood_scores
+from utils.indexed import shared_index
+from utils.maps import ALL_STATES, map_layers
+from utils.outlook import warm_outlooks
+from utils.summary import load_summary
+
+PAGES = [
+    "Home.py",
+    "pages/2_Overview.py",
+    "pages/3_Rainfall_Pattern.py",
+    "pages/4_Interactive_Map.py",
+    "pages/5_Flood_Prediction.py",
+]
+
+
+def step(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:<48} {(time.perf_counter() - start) * 1e3:9.0f} ms", flush=True)
+    return result
+
+
+def run_page(page):
+    """Execute a page script once outside a Streamlit server (bare mode)."""
+    try:
+        runpy.run_path(os.path.join(BASE_DIR, page), run_name="__main__")
+        return "ok"
+    except BaseException as exc:          # st.stop() and friends end bare runs early
+        return type(exc).__name__
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--maps", choices=["all", "default", "none"], default="all")
+    parser.add_argument("--pages", type=lambda s: s.split(","), default=PAGES)
+    parser.add_argument("--skip-pages", action="store_true")
+    args = parser.parse_args(argv)
+
+    os.chdir(BASE_DIR)
+    version = dataset_version()
+    print(f"dataset {version}, code {disk_cache.code_version()}")
+
+    index = step("indexed dataset", shared_index)
+    scores = step("flood scores", shared_flood_scores, version)
+    step("summary snapshot", load_summary, version)
+
+    if args.maps != "none":
+        years = index.years()
+        views = [(ALL_STATES, years[0])]
+        if args.maps == "all":
+            views = [(state, year) for state in [ALL_STATES] + index.states() for year in years]
+        start = time.perf_counter()
+        for state, year in views:
+            map_layers(index, scores, state, year)
+        print(f"{f'map layers ({len(views)} views)':<48} {(time.perf_counter() - start) * 1e3:9.0f} ms")
+
+    step("district forecasts (map panel)", warm_outlooks, index, index.states())
+
+    if not args.skip_pages:
+        for page in args.pages:
+            start = time.perf_counter()
+            status = run_page(page)
+            print(f"{page:<48} {(time.perf_counter() - start) * 1e3:9.0f} ms  {status}", flush=True)
+
+    usage = disk_cache.stats()
+    print(f"disk cache: {usage['bytes'] / 2**20:.1f} MB of {usage['budget_bytes'] / 2**20:.0f} MB, "
+          + ", ".join(f"{ns} {n['entries']}" for ns, n in sorted(usage["namespaces"].items())))
+
+
+if __name__ == "__main__":
+    main()
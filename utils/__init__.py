@@ -0,0 +1 @@
+"""Shared helpers for the MFPS dashboard pages and offline scripts."""
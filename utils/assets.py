@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import threading
+
+from utils.data import BASE_DIR, CACHE_DIR
+
+SOURCE_DIRS = [os.path.join(BASE_DIR, "assets", "images"), os.path.join(BASE_DIR, "static")]
+ASSET_CACHE_DIR = os.path.join(CACHE_DIR, "assets")
+MANIFEST_PATH = os.path.join(ASSET_CACHE_DIR, "manifest.json")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+WIDTHS = (320, 480, 640, 960, 1280)
+
+# Photos get WebP plus a progressive JPEG fallback; charts (PNG) keep a PNG
+# fallback so flat colours and text stay crisp.
+ENCODERS = {
+    "webp": ("WEBP", {"quality": 75, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 78, "optimize": True, "progressive": True}),
+    "png": ("PNG", {"optimize": True}),
+}
+PHOTO_FORMATS = ("webp", "jpeg")
+CHART_FORMATS = ("webp", "png")
+
+# Streamlit can't see the browser's pixel ratio, so variants are chosen for
+# a 2x display at the layout's CSS width.
+DEVICE_PIXEL_RATIO = 2
+
+_lock = threading.Lock()
+_hash_memo = {}
+
+
+# =================================================
+# CONTENT HASH & MANIFEST
+# =================================================
+def content_hash(path):
+    """Short sha256 of the file, memoized on mtime and size like ``dataset_version``."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _hash_memo:
+        with open(path, "rb") as f:
+            _hash_memo[memo_key] = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _hash_memo[memo_key]
+
+
+def source_key(path):
+    return os.path.relpath(os.path.abspath(path), BASE_DIR).replace(os.sep, "/")
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(manifest):
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    tmp = f"{MANIFEST_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def iter_sources(dirs=SOURCE_DIRS):
+    for directory in dirs:
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+
+# =================================================
+# VARIANT GENERATION
+# =================================================
+def build_variants(path, widths=WIDTHS):
+    """Resize and recompress one image; returns its manifest entry.
+
+    Variants are named ``<stem>-<hash>-<width>.<ext>``, so an unchanged source
+    is never re-encoded and a changed one never serves stale bytes.
+    """
+    from PIL import Image, ImageOps
+
+    digest = content_hash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    is_chart = path.lower().endswith(".png")
+    formats = CHART_FORMATS if is_chart else PHOTO_FORMATS
+
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        width, height = img.size
+        targets = sorted({w for w in widths if w < width} | {width})
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+
+        variants = []
+        for w in targets:
+            h = max(1, round(height * w / width))
+            resized = img if w == width else img.resize((w, h), Image.LANCZOS)
+            for fmt in formats:
+                out = os.path.join(ASSET_CACHE_DIR, f"{stem}-{digest}-{w}.{fmt}")
+                if not os.path.exists(out):
+                    pil_format, options = ENCODERS[fmt]
+                    frame = resized
+                    if fmt == "jpeg" and frame.mode not in ("RGB", "L"):
+                        frame = frame.convert("RGB")
+                    # Unique per writer: sessions may build the same variant at once.
+                    tmp = f"{out}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    frame.save(tmp, pil_format, **options)
+                    os.replace(tmp, out)
+                variants.append({
+                    "width": w, "height": h, "format": fmt,
+                    "file": os.path.basename(out), "bytes": os.path.getsize(out),
+                })
+
+    return {
+        "hash": digest,
+        "width": width,
+        "height": height,
+        "bytes": os.path.getsize(path),
+        "variants": variants,
+    }
+
+
+def build_all(dirs=SOURCE_DIRS, widths=WIDTHS, prune=True):
+    """Build variants for every source image and rewrite the manifest."""
+    manifest = {}
+    for path in iter_sources(dirs):
+        manifest[source_key(path)] = build_variants(path, widths)
+
+    if prune and os.path.isdir(ASSET_CACHE_DIR):
+        keep = {v["file"] for entry in manifest.values() for v in entry["variants"]}
+        keep.add(os.path.basename(MANIFEST_PATH))
+        for name in os.listdir(ASSET_CACHE_DIR):
+            if name not in keep:
+                os.remove(os.path.join(ASSET_CACHE_DIR, name))
+
+    with _lock:
+        _save_manifest(manifest)
+    return manifest
+
+
+# =================================================
+# SERVING
+# =================================================
+def _entry(path):
+    """Manifest entry for ``path``, (re)building it when missing or stale."""
+    key = source_key(path)
+    manifest = load_manifest()
+    entry = manifest.get(key)
+    if entry is not None and entry["hash"] == content_hash(path) and all(
+        os.path.exists(os.path.join(ASSET_CACHE_DIR, v["file"])) for v in entry["variants"]
+    ):
+        return entry
+    try:
+        entry = build_variants(path)
+    except ImportError:      # Pillow missing: serve the original
+        return None
+    with _lock:
+        manifest = load_manifest()
+        manifest[key] = entry
+        _save_manifest(manifest)
+    return entry
+
+
+def best_variant(path, css_width, dpr=DEVICE_PIXEL_RATIO, formats=("webp", "jpeg", "png")):
+    """Smallest file that is at least ``css_width * dpr`` pixels wide.
+
+    ``path`` is a source image (absolute or relative to the repo root). For
+    each allowed format the narrowest variant covering the width is a
+    candidate; the lightest candidate wins, and the original is kept when
+    re-encoding did not make it smaller (or no variant can be produced).
+    """
+    path = path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+    entry = _entry(path)
+    if entry is None:
+        return path
+
+    needed = css_width * dpr
+    best_file, best_bytes = path, entry["bytes"]
+    for fmt in formats:
+        candidates = sorted(
+            (v for v in entry["variants"] if v["format"] == fmt), key=lambda v: v["width"]
+        )
+        if not candidates:
+            continue
+        fit = next((v for v in candidates if v["width"] >= needed), candidates[-1])
+        if fit["bytes"] < best_bytes:
+            best_file, best_bytes = os.path.join(ASSET_CACHE_DIR, fit["file"]), fit["bytes"]
+    return best_file
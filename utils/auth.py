@@ -0,0 +1,24 @@
+import csv
+import hmac
+import os
+
+from utils.data import DATA_DIR
+
+ADMIN_USERS_CSV = os.path.join(DATA_DIR, "admin_users.csv")
+
+
+def check_admin(username, password, path=ADMIN_USERS_CSV):
+    """True when ``username``/``password`` match a row of ``admin_users.csv``."""
+    if not os.path.exists(path):
+        return False
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # Bytes, not str: compare_digest only accepts ASCII strings.
+            if hmac.compare_digest(row["username"].strip().encode("utf-8"), username.strip().encode("utf-8")) and \
+                    hmac.compare_digest(row["password"].encode("utf-8"), password.encode("utf-8")):
+                return True
+    return False
+
+
+def is_admin(session_state):
+    return bool(session_state.get("is_admin", False))
@@ -0,0 +1,145 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import risk
+from utils.data import state_series
+from utils.forecast import recursive_forecast
+from utils.indexed import IndexedDataset
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+HORIZON = 12
+
+
+# =================================================
+# ORIGINS
+# =================================================
+def origin_windows(series, n_input, horizon=HORIZON):
+    """Every walk-forward origin of a monthly series.
+
+    Origin ``t`` uses months ``t - n_input .. t - 1`` as input and is scored
+    against months ``t .. t + horizon - 1``. Returns ``(X, Y)`` with ``X``
+    ``(n_origins, n_input)`` and ``Y`` ``(n_origins, horizon)``; targets past
+    the end of the series are NaN, so late origins only count for the
+    horizons they can be checked at.
+    """
+    series = np.asarray(series, dtype=float)
+    n_origins = len(series) - n_input
+    if n_origins <= 0:
+        return np.empty((0, n_input)), np.empty((0, horizon))
+    X = np.lib.stride_tricks.sliding_window_view(series[:-1], n_input)[:n_origins]
+    padded = np.concatenate([series, np.full(horizon, np.nan)])
+    Y = np.lib.stride_tricks.sliding_window_view(padded[n_input:], horizon)[:n_origins]
+    return X.copy(), Y.copy()
+
+
+# =================================================
+# SCORING
+# =================================================
+def score_forecasts(preds, actual, state=None):
+    """Per-horizon error sums and risk-category agreement.
+
+    Returns a dict of ``(horizon,)`` arrays: ``n``, ``abs_err``, ``sq_err``,
+    ``hits`` and, per risk level, ``actual_<level>`` / ``hits_<level>`` so
+    results from several runs can be summed before the rates are taken.
+    """
+    valid = ~np.isnan(actual)
+    err = np.where(valid, preds - np.nan_to_num(actual), 0.0)
+    pred_codes = risk.classify(preds, "monthly", state)
+    actual_codes = risk.classify(np.nan_to_num(actual), "monthly", state)
+    hit = valid & (pred_codes == actual_codes)
+
+    sums = {
+        "n": valid.sum(axis=0),
+        "abs_err": np.abs(err).sum(axis=0),
+        "sq_err": (err ** 2).sum(axis=0),
+        "hits": hit.sum(axis=0),
+    }
+    for code, level in enumerate(risk.LEVELS):
+        in_level = valid & (actual_codes == code)
+        sums[f"actual_{level}"] = in_level.sum(axis=0)
+        sums[f"hits_{level}"] = (hit & in_level).sum(axis=0)
+    return sums
+
+
+def backtest_model(model, series, n_input, horizon=HORIZON, state=None):
+    """Recursive forecasts from every origin in one batched pass, scored per horizon."""
+    X, Y = origin_windows(series, n_input, horizon)
+    if len(X) == 0:
+        return None
+    preds = recursive_forecast(model, X, horizon)
+    return score_forecasts(preds, Y, state)
+
+
+def horizon_table(state, n_input, sums):
+    """Rates per horizon step from :func:`score_forecasts` sums."""
+    n = np.maximum(sums["n"], 1)
+    table = pd.DataFrame({
+        "State": state,
+        "Input_Months": n_input,
+        "Horizon": np.arange(1, len(sums["n"]) + 1),
+        "Origins": sums["n"],
+        "MAE": sums["abs_err"] / n,
+        "RMSE": np.sqrt(sums["sq_err"] / n),
+        "Risk_Hit_Rate": sums["hits"] / n,
+    })
+    for level in risk.LEVELS:
+        actual = sums[f"actual_{level}"]
+        table[f"{level}_Hit_Rate"] = np.where(actual > 0, sums[f"hits_{level}"] / np.maximum(actual, 1), np.nan)
+    return table
+
+
+# =================================================
+# ALL MODELS
+# =================================================
+def _backtest_task(task):
+    from utils.models import load_model
+
+    state, n_input, model_path, series, horizon = task
+    start = time.perf_counter()
+    sums = backtest_model(load_model(model_path), series, n_input, horizon, state)
+    return state, n_input, model_path, sums, time.perf_counter() - start
+
+
+def run_backtest(df, model_specs, horizon=HORIZON, workers=None):
+    """Backtest ``model_specs`` (``[(state, n_input, path), ...]``) across a process pool.
+
+    Each task loads one forest and scores all of its origins with ``horizon``
+    batched ``predict`` calls. Returns ``(per_horizon, per_model, elapsed)``.
+    """
+    index = IndexedDataset(df)
+    series = {state: state_series(index.state(state), state) for state, _, _ in model_specs}
+    tasks = [(state, n_input, path, series[state], horizon) for state, n_input, path in model_specs]
+    if not tasks:
+        return pd.DataFrame(), pd.DataFrame(), 0.0
+
+    start = time.perf_counter()
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_backtest_task, tasks))
+    elapsed = time.perf_counter() - start
+
+    tables, models = [], []
+    for state, n_input, path, sums, seconds in results:
+        if sums is None:
+            continue
+        table = horizon_table(state, n_input, sums)
+        tables.append(table)
+        models.append({
+            "State": state,
+            "Input_Months": n_input,
+            "Model_File": os.path.basename(path),
+            "Origins": int(sums["n"][0]),
+            "MAE_1": table["MAE"].iloc[0],
+            f"MAE_{horizon}": table["MAE"].iloc[-1],
+            "Mean_MAE": table["MAE"].mean(),
+            "Mean_RMSE": table["RMSE"].mean(),
+            "Risk_Hit_Rate": sums["hits"].sum() / max(sums["n"].sum(), 1),
+            "Seconds": seconds,
+        })
+
+    per_horizon = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+    return per_horizon, pd.DataFrame(models), elapsed
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+
+from utils.data import BASE_DIR
+
+BUNDLE_PATH = os.environ.get(
+    "MFPS_MODEL_BUNDLE", os.path.join(BASE_DIR, "rf_models", "models.bundle")
+)
+
+# Layout: MAGIC, then the manifest's offset and length (two little-endian
+# uint64), then the payloads, then the JSON manifest. Each payload is a
+# protocol-5 pickle followed by its out-of-band buffers (the models' numpy
+# arrays). Every piece starts on an ALIGN boundary, so an array that is
+# unpickled as-is can be used straight from the memory map. That does not
+# hold for forests: sklearn's Tree.__setstate__ copies its node and value
+# arrays, so a loaded forest is ordinary heap memory like a joblib load.
+MAGIC = b"MFPSBND1"
+HEADER = struct.Struct("<8sQQ")
+ALIGN = 64
+
+NATIONAL = "Malaysia"
+
+
+class MissingModelError(LookupError):
+    """The bundle has no entry for the requested (scope, window)."""
+
+
+class BundleIntegrityError(ValueError):
+    """An entry's bytes do not match the sha256 recorded in the manifest."""
+
+
+def entry_key(scope, window):
+    return f"{scope}:{window}"
+
+
+# =================================================
+# WRITING
+# =================================================
+def _pad(f):
+    gap = -f.tell() % ALIGN
+    if gap:
+        f.write(b"\0" * gap)
+
+
+def write_bundle(items, path=BUNDLE_PATH):
+    """Pack ``items`` (``[(meta, model), ...]``) into one bundle file.
+
+    ``meta`` must carry ``scope`` and ``window`` and may add anything else
+    worth keeping in the manifest (``kind``, ``source``, ``trained``,
+    ``metrics``...). Returns the manifest.
+    """
+    entries = {}
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+        for meta, model in items:
+            buffers = []
+            data = pickle.dumps(model, protocol=5, buffer_callback=buffers.append)
+
+            _pad(f)
+            start = f.tell()
+            pieces = []
+            for i, chunk in enumerate([data] + [b.raw() for b in buffers]):
+                if i:
+                    _pad(f)
+                pieces.append([f.tell() - start, len(chunk)])
+                f.write(chunk)
+            end = f.tell()
+
+            key = entry_key(meta["scope"], meta["window"])
+            if key in entries:
+                raise ValueError(f"duplicate bundle entry {key}")
+            entries[key] = {
+                **meta,
+                "type": type(model).__name__,
+                "offset": start,
+                "length": end - start,
+                "pickle": pieces[0],
+                "buffers": pieces[1:],
+            }
+            f.flush()
+            entries[key]["sha256"] = _file_digest(tmp, start, end)
+
+        manifest = {"format": MAGIC.decode(), "entries": entries}
+        blob = json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+        _pad(f)
+        manifest_offset = f.tell()
+        f.write(blob)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, manifest_offset, len(blob)))
+    os.replace(tmp, path)
+    return manifest
+
+
+def _file_digest(path, start, end):
+    """sha256 of ``path[start:end]``, including the alignment padding."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+# =================================================
+# READING
+# =================================================
+class ModelBundle:
+    """A bundle opened once and memory-mapped for the life of the process.
+
+    Entries are looked up by ``(scope, window)``: a state name or
+    ``"Malaysia"``, and a window length in months or a tag such as ``"vw"``
+    (variable window), ``"global"`` or ``"classifier"``. Opening the bundle
+    reads only its manifest. The first load of an entry reads all of it to
+    check the sha256 (unless ``verify=False``), then unpickles it from the
+    map; arrays the model keeps as they are stay backed by the map, while
+    sklearn trees copy theirs during unpickling.
+    """
+
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, offset, length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise BundleIntegrityError(f"{path} is not a model bundle")
+        self.manifest = json.loads(self._map[offset:offset + length])
+        self.entries = self.manifest["entries"]
+        self._sources = {e["source"]: key for key, e in self.entries.items() if e.get("source")}
+        self._verified = set()
+        self._lock = threading.Lock()
+
+    def __contains__(self, scope_window):
+        return entry_key(*scope_window) in self.entries
+
+    def scopes(self):
+        return sorted({e["scope"] for e in self.entries.values()})
+
+    def windows(self, scope):
+        return [e["window"] for e in self.entries.values() if e["scope"] == scope]
+
+    def entry(self, scope, window):
+        key = entry_key(scope, window)
+        if key not in self.entries:
+            available = ", ".join(str(w) for w in self.windows(scope)) or "none"
+            raise MissingModelError(
+                f"no model for {scope!r} with window {window!r} in {os.path.basename(self.path)} "
+                f"(available for {scope!r}: {available}); rebuild it with "
+                f"`python -m scripts.build_bundle`"
+            )
+        return self.entries[key]
+
+    def entry_for_source(self, filename):
+        """Entry packed from the loose file ``filename`` (e.g. ``johor_rf_6m.sav``), or ``None``."""
+        key = self._sources.get(os.path.basename(filename))
+        return None if key is None else self.entries[key]
+
+    def current_entry(self, path):
+        """:meth:`entry_for_source`, or ``None`` if the loose file at ``path`` changed since packing.
+
+        Entries record their source's mtime and size; a retrained file that
+        has not been repacked yet is served from disk instead of the bundle.
+        Entries without a recorded stamp (or whose file is gone) count as current.
+        """
+        entry = self.entry_for_source(path)
+        if entry is None or "source_mtime_ns" not in entry:
+            return entry
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return entry
+        if (stat.st_mtime_ns, stat.st_size) != (entry["source_mtime_ns"], entry["source_size"]):
+            return None
+        return entry
+
+    def verify(self, entry):
+        view = memoryview(self._map)[entry["offset"]:entry["offset"] + entry["length"]]
+        try:
+            if hashlib.sha256(view).hexdigest() != entry["sha256"]:
+                raise BundleIntegrityError(
+                    f"{entry_key(entry['scope'], entry['window'])} in {self.path} is corrupt (sha256 mismatch)"
+                )
+        finally:
+            view.release()
+
+    def load_entry(self, entry, verify=True):
+        key = entry_key(entry["scope"], entry["window"])
+        if verify and key not in self._verified:
+            self.verify(entry)
+            with self._lock:
+                self._verified.add(key)
+        base = memoryview(self._map)[entry["offset"]:entry["offset"] + entry["length"]]
+        offset, length = entry["pickle"]
+        buffers = [pickle.PickleBuffer(base[o:o + n]) for o, n in entry["buffers"]]
+        return pickle.loads(base[offset:offset + length], buffers=buffers)
+
+    def load(self, scope, window, verify=True):
+        return self.load_entry(self.entry(scope, window), verify)
+
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+
+def open_bundle(path=BUNDLE_PATH):
+    """The process-wide :class:`ModelBundle` for ``path``, or ``None`` if there is none.
+
+    Reopened only when the file is rebuilt (new mtime or size).
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    bundle = _bundles.get(memo_key)
+    if bundle is None:
+        with _bundles_lock:
+            bundle = _bundles.get(memo_key)
+            if bundle is None:
+                bundle = _bundles[memo_key] = ModelBundle(path)
+    return bundle
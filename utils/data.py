@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+from utils import memory
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# =================================================
+# PATHS
+# =================================================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DATA_PATH = os.path.join(DATA_DIR, "your_flood_data.csv")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+
+MONTHLY_COLS = [
+    "JAN", "FEB", "MAR", "APR", "MAY", "JUN",
+    "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"
+]
+
+
+# =================================================
+# LOADING
+# =================================================
+def load_dataset(path=DATA_PATH):
+    """Read the flood dataset the same way every page does."""
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def shared_dataset(path=DATA_PATH):
+    """The dataset from the process-wide budgeted cache.
+
+    Every session gets the same frame, so copy it before adding columns.
+    """
+    key = (os.path.abspath(path), dataset_version(path))
+    return memory.cached("dataset", key, lambda: load_dataset(path), memory.current_session())
+
+
+_version_memo = {}
+
+
+def dataset_version(path=DATA_PATH):
+    """Short content hash of the dataset file; changes whenever the CSV does.
+
+    The hash is memoized on the file's mtime and size, so reruns only stat it.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key in _version_memo:
+        return _version_memo[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _version_memo[memo_key] = digest.hexdigest()[:16]
+    return _version_memo[memo_key]
+
+
+# =================================================
+# MONTHLY SERIES
+# =================================================
+def district_series(df):
+    """Return ``{(state, district): monthly rainfall array}`` in time order.
+
+    Each district-year row is unrolled into its twelve monthly values so the
+    series can be windowed exactly like the forecasters were trained.
+    """
+    series = {}
+    ordered = df.sort_values(["STATE_NAME", "DISTRICT_NAME", "YEAR"])
+    for (state, district), grp in ordered.groupby(["STATE_NAME", "DISTRICT_NAME"], sort=False):
+        series[(state, district)] = grp[MONTHLY_COLS].to_numpy(dtype=float).ravel()
+    return series
+
+
+def state_series(df, state):
+    """Monthly rainfall for a state, averaged over its districts."""
+    df_state = df[df["STATE_NAME"] == state]
+    yearly = df_state.groupby("YEAR")[MONTHLY_COLS].mean().sort_index()
+    return yearly.to_numpy(dtype=float).ravel()
+
+
+def sliding_windows(series, n_input):
+    """Split a 1-D series into ``(X, y)`` pairs of ``n_input`` months -> next month."""
+    series = np.asarray(series, dtype=float)
+    if len(series) <= n_input:
+        return np.empty((0, n_input)), np.empty(0)
+    X = np.lib.stride_tricks.sliding_window_view(series[:-1], n_input)
+    y = series[n_input:]
+    return X.copy(), y.copy()
+
+
+def national_series(df):
+    """Monthly rainfall for Malaysia, averaged over every district."""
+    yearly = df.groupby("YEAR")[MONTHLY_COLS].mean().sort_index()
+    return yearly.to_numpy(dtype=float).ravel()
@@ -0,0 +1,234 @@
+import glob
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from utils.data import BASE_DIR, CACHE_DIR, dataset_version
+from utils.lazy import lazy_import
+
+pio = lazy_import("plotly.io")
+
+# Results that survive a restart. Every entry is stored under a hash of
+# (namespace, dataset version, code version, key), so a new CSV or a deploy
+# with changed code never reads a stale result; the old files just stop
+# being used and age out under the size limit.
+DISK_CACHE_DIR = os.path.join(CACHE_DIR, "results")
+BUDGET_BYTES = int(float(os.environ.get("MFPS_DISK_CACHE_MB", "512")) * 1024 * 1024)
+ENABLED = os.environ.get("MFPS_DISK_CACHE", "1") != "0"
+# A write that takes the cache over budget evicts down to this share of it,
+# so the next few writes do not each rescan the tree.
+EVICT_TO = 0.9
+
+# Source files whose contents define the "code version". Their stamps are
+# rechecked at most every CODE_CHECK_S seconds, not on every get/put.
+CODE_GLOBS = ("Home.py", "pages/*.py", "utils/*.py", "config/*.json")
+CODE_CHECK_S = 10
+
+_lock = threading.Lock()
+_code_memo = {}
+_code_checked = (0.0, None)     # monotonic time of the last stamp check, its result
+_total_bytes = None             # running size of the cache; None until first scanned
+stats_counter = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+
+# =================================================
+# VERSIONS & PATHS
+# =================================================
+def code_version():
+    """Short hash of the dashboard's source and config, memoized on mtimes and sizes."""
+    global _code_checked
+    now = time.monotonic()
+    checked, version = _code_checked
+    if version is None or now - checked >= CODE_CHECK_S:
+        version = _code_version()
+        _code_checked = (now, version)
+    return version
+
+
+def _code_version():
+    files = sorted(p for pattern in CODE_GLOBS for p in glob.glob(os.path.join(BASE_DIR, pattern)))
+    stamp = tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in files)
+    if stamp not in _code_memo:
+        digest = hashlib.sha256()
+        for path in files:
+            digest.update(os.path.relpath(path, BASE_DIR).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _code_memo.clear()
+        _code_memo[stamp] = digest.hexdigest()[:16]
+    return _code_memo[stamp]
+
+
+def entry_path(namespace, key):
+    ident = repr((namespace, dataset_version(), code_version(), key)).encode()
+    digest = hashlib.sha256(ident).hexdigest()
+    return os.path.join(DISK_CACHE_DIR, namespace, digest[:2], digest + ".bin")
+
+
+# =================================================
+# SERIALISATION
+# =================================================
+# Plotly figures are kept as their JSON so they load without unpickling
+# plotly internals; everything else is a protocol-5 pickle.
+_FIGURE, _PICKLE = b"F", b"P"
+
+
+def _dumps(value):
+    if hasattr(value, "to_plotly_json") and hasattr(value, "to_json"):
+        return _FIGURE + value.to_json().encode("utf-8")
+    return _PICKLE + pickle.dumps(value, protocol=5)
+
+
+def _loads(blob):
+    kind, body = blob[:1], blob[1:]
+    if kind == _FIGURE:
+        return pio.from_json(body.decode("utf-8"))
+    return pickle.loads(body)
+
+
+# =================================================
+# GET / PUT
+# =================================================
+def get(namespace, key):
+    """The stored value, or ``None`` on a miss (or an unreadable entry)."""
+    if not ENABLED:
+        return None
+    path = entry_path(namespace, key)
+    try:
+        with open(path, "rb") as f:
+            value = _loads(f.read())
+    except FileNotFoundError:
+        stats_counter["misses"] += 1
+        return None
+    except Exception:
+        stats_counter["errors"] += 1
+        _remove(path)
+        return None
+    try:
+        os.utime(path)        # mtime doubles as "last used" for eviction
+    except OSError:           # evicted by another process since the read
+        pass
+    stats_counter["hits"] += 1
+    return value
+
+
+def put(namespace, key, value):
+    """Store ``value``; returns False when it cannot be serialised (e.g. closures)."""
+    if not ENABLED:
+        return False
+    try:
+        blob = _dumps(value)
+    except Exception:
+        stats_counter["errors"] += 1
+        return False
+    path = entry_path(namespace, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        replaced = os.path.getsize(path)
+    except OSError:
+        replaced = 0
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    stats_counter["writes"] += 1
+    _grow(len(blob) - replaced)
+    return True
+
+
+def _grow(nbytes):
+    """Track a write; rescan and evict only once the running total exceeds the budget."""
+    global _total_bytes
+    with _lock:
+        if _total_bytes is not None:
+            _total_bytes += nbytes
+            if _total_bytes <= BUDGET_BYTES:
+                return
+    enforce(int(BUDGET_BYTES * EVICT_TO))
+
+
+def cached(namespace, key, loader):
+    value = get(namespace, key)
+    if value is None:
+        value = loader()
+        put(namespace, key, value)
+    return value
+
+
+# =================================================
+# SIZE LIMIT
+# =================================================
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _files():
+    for root, _, names in os.walk(DISK_CACHE_DIR):
+        for name in names:
+            if name.endswith(".bin"):
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+
+def enforce(budget=None):
+    """Delete least recently used entries until the cache fits ``budget`` bytes.
+
+    Also resets the running total :func:`put` checks, so entries other
+    processes added or evicted are accounted for again.
+    """
+    global _total_bytes
+    budget = BUDGET_BYTES if budget is None else budget
+    with _lock:
+        files = sorted(_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= budget:
+                break
+            _remove(path)
+            total -= size
+            stats_counter["evictions"] += 1
+        _total_bytes = total
+    return total
+
+
+def clear(namespace=None):
+    """Remove every entry (or one namespace's); returns the count."""
+    global _total_bytes
+    root = DISK_CACHE_DIR if namespace is None else os.path.join(DISK_CACHE_DIR, namespace)
+    _total_bytes = None
+    removed = 0
+    for path, _, _ in list(_files()):
+        if path.startswith(root + os.sep):
+            _remove(path)
+            removed += 1
+    return removed
+
+
+def stats():
+    """Per-namespace entry counts and bytes, plus hit/miss counters for this process."""
+    namespaces = {}
+    oldest = time.time()
+    for path, size, mtime in _files():
+        ns = os.path.relpath(path, DISK_CACHE_DIR).split(os.sep)[0]
+        entry = namespaces.setdefault(ns, {"entries": 0, "bytes": 0})
+        entry["entries"] += 1
+        entry["bytes"] += size
+        oldest = min(oldest, mtime)
+    return {
+        "enabled": ENABLED,
+        "budget_bytes": BUDGET_BYTES,
+        "bytes": sum(n["bytes"] for n in namespaces.values()),
+        "namespaces": namespaces,
+        "oldest_idle_s": time.time() - oldest if namespaces else 0.0,
+        "code_version": code_version(),
+        **stats_counter,
+    }
@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import importlib.util
+import os
+import threading
+
+from utils.data import CACHE_DIR, MONTHLY_COLS, dataset_version
+from utils.disk_cache import code_version
+from utils.forecast import recursive_forecast
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+
+# Upper bound on rows held in memory at once while an export is written.
+CHUNK_ROWS = 50_000
+
+# Streamlit's download button holds the finished file in memory for the
+# session; anything larger is left on disk for the CLI (scripts/export.py).
+INLINE_LIMIT_BYTES = 200 * 1024 * 1024
+
+MIME = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def available_formats():
+    """``csv`` always; ``parquet`` when pyarrow is installed."""
+    return ["csv"] + (["parquet"] if importlib.util.find_spec("pyarrow") else [])
+
+
+# =================================================
+# CHUNK GENERATORS
+# =================================================
+def _split(frame, rows=CHUNK_ROWS):
+    for start in range(0, len(frame), rows):
+        yield frame.iloc[start:start + rows]
+
+
+def state_year_aggregates(index):
+    """Per state and year: records, districts, flood cases and rainfall, one state per chunk."""
+    for state in index.states():
+        df_state = index.state(state)
+        yield (
+            df_state.groupby("YEAR")
+            .agg(Records=("FLOOD", "size"),
+                 Districts=("DISTRICT_NAME", "nunique"),
+                 Flood_Cases=("FLOOD", "sum"),
+                 Avg_Annual_Rainfall=("TOTAL_ANNUAL", "mean"),
+                 Max_Annual_Rainfall=("TOTAL_ANNUAL", "max"))
+            .reset_index()
+            .assign(Flood_Rate=lambda t: t["Flood_Cases"] / t["Records"])
+            .rename(columns={"YEAR": "Year"})
+            .assign(State=state)
+            [["State", "Year", "Records", "Districts", "Flood_Cases", "Flood_Rate",
+              "Avg_Annual_Rainfall", "Max_Annual_Rainfall"]]
+        )
+
+
+def district_rainfall(index, years):
+    """District-year monthly rainfall within ``years`` (inclusive), one state at a time."""
+    cols = ["STATE_NAME", "DISTRICT_NAME", "YEAR"] + MONTHLY_COLS + ["TOTAL_ANNUAL"]
+    for state in index.states():
+        yield from _split(index.year_range(years, state)[cols])
+
+
+def district_windows(index, state, n_input):
+    """``(districts, X, last_year)``: each district's latest ``n_input`` months as one batch."""
+    rows_needed = -(-n_input // 12)
+    districts, windows, last_year = [], [], None
+    for district in index.districts(state):
+        block = index.district(state, district)
+        if len(block) * 12 < n_input:
+            continue
+        tail = block.iloc[-rows_needed:]
+        windows.append(tail[MONTHLY_COLS].to_numpy(dtype=float).ravel()[-n_input:])
+        districts.append(district)
+        last_year = max(last_year or 0, int(tail["YEAR"].iloc[-1]))
+    X = np.vstack(windows) if windows else np.empty((0, n_input))
+    return districts, X, last_year
+
+
+def district_forecasts(index, models, horizon):
+    """Recursive forecasts for every district of every ``(state, n_input, model)``.
+
+    All districts of one state go through one batched forecast per model,
+    split so no chunk exceeds ``CHUNK_ROWS`` rows. Each month is also
+    classified into a risk level with the state's thresholds.
+    """
+    from utils import risk
+
+    per_batch = max(1, CHUNK_ROWS // horizon)
+    for state, n_input, model in models:
+        districts, X, last_year = district_windows(index, state, n_input)
+        for start in range(0, len(districts), per_batch):
+            names = districts[start:start + per_batch]
+            preds = recursive_forecast(model, X[start:start + per_batch], horizon)
+            steps = np.arange(horizon)
+            yield pd.DataFrame({
+                "State": state,
+                "District": np.repeat(names, horizon),
+                "Input_Months": n_input,
+                "Step": np.tile(steps + 1, len(names)),
+                "Year": np.tile(last_year + 1 + steps // 12, len(names)),
+                "Month": np.tile(np.array(MONTHLY_COLS)[steps % 12], len(names)),
+                "Forecast_mm": preds.ravel(),
+                "Risk": risk.labels(risk.classify(preds.ravel(), "monthly", state)),
+            })
+
+
+# =================================================
+# WRITING
+# =================================================
+def write_chunks(chunks, path, fmt="csv"):
+    """Write DataFrame chunks to ``path`` one at a time; returns the row count.
+
+    CSV chunks are appended under a single header; Parquet chunks become
+    row groups of one file. The file appears under its final name only once
+    it is complete.
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        rows = _write_tmp(chunks, tmp, fmt)
+        if rows == 0 and not os.path.exists(tmp):
+            open(tmp, "w").close()
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
+
+
+def _write_tmp(chunks, tmp, fmt):
+    rows = 0
+    if fmt == "csv":
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                chunk.to_csv(f, header=rows == 0, index=False)
+                rows += len(chunk)
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"unknown export format {fmt!r} (expected one of {available_formats()})")
+    return rows
+
+
+def export_path(name, fmt, *key):
+    """Cache path for an export; the key includes the dataset and code versions.
+
+    The code version covers ``config/*.json``, so new risk thresholds give
+    new paths too. Callers add whatever else the rows depend on (e.g. model
+    versions).
+    """
+    ident = (dataset_version(), code_version()) + key
+    digest = hashlib.sha256(repr(ident).encode()).hexdigest()[:12]
+    return os.path.join(EXPORT_DIR, f"{name}-{digest}.{fmt}")
+
+
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+def build_export(name, fmt, key, make_chunks):
+    """Path of the export, writing it from ``make_chunks()`` unless it already exists.
+
+    Concurrent requests for the same export wait for the first writer and
+    reuse its file instead of building it again. Writing a new file removes
+    the older exports of the same ``name``.
+    """
+    path = export_path(name, fmt, *key)
+    if os.path.exists(path):
+        return path
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(path, threading.Lock())
+    with lock:
+        if not os.path.exists(path):
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            write_chunks(make_chunks(), path, fmt)
+            _prune(name, keep=path)
+    return path
+
+
+def _prune(name, keep):
+    for old in glob.glob(os.path.join(EXPORT_DIR, f"{glob.escape(name)}-*")):
+        if old != keep and not old.endswith(".tmp"):   # another writer's file in progress
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+# =================================================
+# PAGE CONTROLS
+# =================================================
+def render_export(label, name, key, make_chunks, widget_key):
+    """Format picker, a "Prepare" button and, once built, the download button."""
+    import streamlit as st
+
+    cols = st.columns([1, 1, 2])
+    with cols[0]:
+        fmt = st.radio("Format", available_formats(), horizontal=True, key=f"{widget_key}_fmt")
+    ready = f"{widget_key}_path"
+    with cols[1]:
+        if st.button(f"Prepare {label}", key=f"{widget_key}_build"):
+            with st.spinner("Writing export…"):
+                st.session_state[ready] = build_export(name, fmt, key, make_chunks)
+
+    path = st.session_state.get(ready)
+    if not path or not os.path.exists(path) or path != export_path(name, fmt, *key):
+        return
+    with cols[2]:
+        size = os.path.getsize(path)
+        if size > INLINE_LIMIT_BYTES:
+            st.info(f"Export is {size / 2**20:.0f} MB; fetch it from `{os.path.relpath(path)}` "
+                    f"or use `python -m scripts.export`.")
+            return
+        with open(path, "rb") as f:
+            st.download_button(f"⬇️ Download {label} ({size / 2**20:.1f} MB)", f,
+                               file_name=f"{name}.{fmt}", mime=MIME[fmt], key=f"{widget_key}_dl")
@@ -0,0 +1,117 @@
+import glob
+import os
+
+from utils import memory
+from utils.data import BASE_DIR, CACHE_DIR, MONTHLY_COLS, dataset_version, load_dataset
+from utils.lazy import lazy_import
+from utils.models import load_model, model_version
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FLOOD_MODEL_PATH = os.path.join(BASE_DIR, "final_flood_model.sav")
+SCORES_DIR = os.path.join(CACHE_DIR, "flood_scores")
+
+KEY_COLS = ["STATE_NAME", "DISTRICT_NAME", "YEAR"]
+BATCH_SIZE = 50_000
+
+
+def scores_version():
+    """Version of the classifier the scores come from (see :func:`utils.models.model_version`)."""
+    return model_version(FLOOD_MODEL_PATH)
+
+
+def scores_path(version, model_ver=None):
+    """Scores file for a dataset version, scored by the classifier version ``model_ver`` (default: current)."""
+    model_ver = model_ver or scores_version()
+    return os.path.join(SCORES_DIR, f"flood_scores_{version}_m{model_ver}.csv")
+
+
+def row_fingerprint(df, feature_cols):
+    """Hash of each row's key and feature values, used to reuse earlier scores."""
+    return pd.util.hash_pandas_object(df[KEY_COLS + feature_cols], index=False).astype("uint64")
+
+
+# =================================================
+# SCORING
+# =================================================
+def model_features(model):
+    """Input columns of the classifier (JAN..DEC for ``final_flood_model.sav``)."""
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        return list(names)
+    return MONTHLY_COLS[:model.n_features_in_]
+
+
+def score_rows(df, model=None, batch_size=BATCH_SIZE):
+    """Flood probability for every row of ``df``, computed in vectorized batches."""
+    model = model or load_model(FLOOD_MODEL_PATH)
+    cols = model_features(model)
+    X = df[cols].to_numpy(dtype=float)
+    flood_idx = list(model.classes_).index(1)
+
+    probs = np.empty(len(X))
+    for start in range(0, len(X), batch_size):
+        batch = pd.DataFrame(X[start:start + batch_size], columns=cols)
+        probs[start:start + batch_size] = model.predict_proba(batch)[:, flood_idx]
+    return probs
+
+
+def build_scores(df, version, model=None):
+    """Score ``df`` and write the cache file for ``version``.
+
+    Rows whose key and rainfall values already appear in an earlier scores
+    file of the same classifier version are copied over, so only newly
+    ingested or edited rows hit the model; a replaced classifier rescores
+    everything.
+    """
+    model_ver = scores_version()
+    model = model or load_model(FLOOD_MODEL_PATH)
+    cols = model_features(model)
+    out = df[KEY_COLS].copy()
+    out["ROW_HASH"] = row_fingerprint(df, cols).to_numpy()
+    out["FLOOD_PROB"] = np.nan
+
+    pattern = os.path.join(SCORES_DIR, f"flood_scores_*_m{glob.escape(model_ver)}.csv")
+    previous = sorted(glob.glob(pattern), key=os.path.getmtime)
+    if previous:
+        known = pd.read_csv(previous[-1], usecols=["ROW_HASH", "FLOOD_PROB"], dtype={"ROW_HASH": "uint64"})
+        known = known.drop_duplicates("ROW_HASH").set_index("ROW_HASH")["FLOOD_PROB"]
+        out["FLOOD_PROB"] = out["ROW_HASH"].map(known)
+
+    missing = out["FLOOD_PROB"].isna().to_numpy()
+    if missing.any():
+        out.loc[missing, "FLOOD_PROB"] = score_rows(df.loc[missing], model)
+
+    path = scores_path(version, model_ver)
+    os.makedirs(SCORES_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    out.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return out, int(missing.sum())
+
+
+def load_flood_scores(version=None):
+    """Cached per district-year flood probabilities for the current dataset version."""
+    version = version or dataset_version()
+    path = scores_path(version)
+    if os.path.exists(path):
+        return pd.read_csv(path, dtype={"ROW_HASH": "uint64"})
+    scores, _ = build_scores(load_dataset(), version)
+    return scores
+
+
+def shared_flood_scores(version=None):
+    """:func:`load_flood_scores` through the process-wide budgeted cache."""
+    version = version or dataset_version()
+    return memory.cached("dataset", ("flood_scores", version, scores_version()),
+                         lambda: load_flood_scores(version), memory.current_session())
+
+
+def district_year_scores(scores, year):
+    """Mean flood probability per district for one year (map popups)."""
+    return (
+        scores[scores["YEAR"] == year]
+        .groupby(["STATE_NAME", "DISTRICT_NAME"], as_index=False)["FLOOD_PROB"]
+        .mean()
+    )
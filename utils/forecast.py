@@ -0,0 +1,58 @@
+from utils.lazy import lazy_import
+from utils.models import per_tree_predict
+
+np = lazy_import("numpy")
+
+# Percentiles drawn as uncertainty bands on the prediction chart.
+BAND_PERCENTILES = (10, 25, 75, 90)
+
+
+def recursive_forecast(model, windows, n_predict):
+    """Roll ``model`` forward ``n_predict`` months for a batch of input windows.
+
+    ``windows`` is ``(n_windows, n_input)`` (a single window is accepted too).
+    Each step is one batched ``predict`` whose output is appended to every
+    window, exactly like the page's month-by-month loop.
+    """
+    seq = np.atleast_2d(np.asarray(windows, dtype=float))
+    n_input = seq.shape[1]
+    preds = np.empty((seq.shape[0], n_predict))
+    for step in range(n_predict):
+        preds[:, step] = model.predict(seq[:, -n_input:])
+        seq = np.hstack([seq, preds[:, step:step + 1]])
+    return preds
+
+
+def forecast_distribution(model, window, n_predict, progress=None):
+    """Point forecast plus the per-tree spread at every horizon step.
+
+    Returns ``(point, trees)`` where ``point`` is ``(n_predict,)`` and
+    ``trees`` is ``(n_predict, n_trees)``. The recursion follows the ensemble
+    mean (what ``predict`` would give), so ``trees`` describes the forest's
+    disagreement at each step given the point path.
+
+    ``progress(step, total)`` is called after every step (see utils.jobs).
+    """
+    seq = list(np.asarray(window, dtype=float))
+    n_input = len(seq)
+    point, trees = [], []
+    for step in range(n_predict):
+        step_trees = per_tree_predict(model, [seq[-n_input:]])[:, 0]
+        p = float(step_trees.mean())
+        point.append(p)
+        trees.append(step_trees)
+        seq.append(p)
+        if progress is not None:
+            progress(step + 1, n_predict)
+    return np.array(point), np.vstack(trees)
+
+
+def exceedance_probability(trees, threshold):
+    """Share of trees at or above ``threshold`` for each horizon step."""
+    return (np.asarray(trees) >= threshold).mean(axis=1)
+
+
+def percentile_bands(trees, percentiles=BAND_PERCENTILES):
+    """``{percentile: values per step}`` from a per-tree matrix."""
+    values = np.percentile(np.asarray(trees), percentiles, axis=1)
+    return dict(zip(percentiles, values))
@@ -0,0 +1,143 @@
+import os
+
+from utils import memory
+from utils.data import DATA_PATH, MONTHLY_COLS, dataset_version, load_dataset
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+SORT_KEYS = ["STATE_NAME", "DISTRICT_NAME", "YEAR"]
+
+
+def _runs(values):
+    """``{value: (start, stop)}`` for each run of equal values in a sorted array."""
+    if len(values) == 0:
+        return {}
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    stops = np.r_[starts[1:], len(values)]
+    return {values[a]: (int(a), int(b)) for a, b in zip(starts, stops)}
+
+
+class IndexedDataset:
+    """The flood dataset sorted by (state, district, year) with offset tables.
+
+    Rows of a state, and of a district within it, are contiguous, so selecting
+    either is a positional slice instead of a boolean mask over the whole
+    table. Two permutations cover year queries:
+
+    - ``_by_year`` orders every row by year, so a year or year range is a
+      ``searchsorted`` pair and one ``take``.
+    - ``_by_state_year`` orders rows by (state, year). States keep the same
+      offsets as in the main order, so a state's year range is found by
+      bisecting inside its block.
+
+    ``frame`` is shared and read-only by convention; it already carries
+    ``TOTAL_ANNUAL`` (the sum of the monthly columns) so pages need not copy
+    it to derive that column.
+    """
+
+    def __init__(self, df):
+        frame = df.sort_values(SORT_KEYS, kind="mergesort").reset_index(drop=True)
+        frame["YEAR"] = frame["YEAR"].astype(int)
+        frame["TOTAL_ANNUAL"] = frame[MONTHLY_COLS].sum(axis=1)
+        self.frame = frame
+
+        states = frame["STATE_NAME"].to_numpy()
+        districts = frame["DISTRICT_NAME"].to_numpy()
+        years = frame["YEAR"].to_numpy()
+
+        self._states = _runs(states)
+        self._districts = {}
+        for state, (start, stop) in self._states.items():
+            for district, (a, b) in _runs(districts[start:stop]).items():
+                self._districts[(state, district)] = (start + a, start + b)
+        self._years = years
+
+        self._by_year = np.argsort(years, kind="stable")
+        self._year_sorted = years[self._by_year]
+
+        state_codes = np.empty(len(frame), dtype=np.int64)
+        for code, (start, stop) in enumerate(self._states.values()):
+            state_codes[start:stop] = code
+        self._by_state_year = np.lexsort((years, state_codes))
+        self._state_year_sorted = years[self._by_state_year]
+
+    def __len__(self):
+        return len(self.frame)
+
+    # -------------------------------------------------
+    # Catalogue
+    # -------------------------------------------------
+    def states(self):
+        return list(self._states)
+
+    def districts(self, state=None):
+        return [d for s, d in self._districts if state is None or s == state]
+
+    def years(self):
+        return [int(y) for y in np.unique(self._year_sorted)]
+
+    @property
+    def year_min(self):
+        return int(self._year_sorted[0])
+
+    @property
+    def year_max(self):
+        return int(self._year_sorted[-1])
+
+    # -------------------------------------------------
+    # Lookups
+    # -------------------------------------------------
+    def state(self, state):
+        start, stop = self._states.get(state, (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def district(self, state, district, years=None):
+        start, stop = self._districts.get((state, district), (0, 0))
+        if years is not None:
+            # Within a district the rows are already in year order.
+            lo, hi = _bounds(self._years[start:stop], years)
+            start, stop = start + lo, start + hi
+        return self.frame.iloc[start:stop]
+
+    def year(self, year):
+        return self.year_range((year, year))
+
+    def year_range(self, years, state=None):
+        """Rows with ``years[0] <= YEAR <= years[1]``, optionally for one state."""
+        if state is None:
+            lo, hi = _bounds(self._year_sorted, years)
+            if hi - lo == len(self.frame):
+                return self.frame
+            return self.frame.take(self._by_year[lo:hi])
+        start, stop = self._states.get(state, (0, 0))
+        lo, hi = _bounds(self._state_year_sorted[start:stop], years)
+        return self.frame.take(self._by_state_year[start + lo:start + hi])
+
+    def query(self, state=None, district=None, years=None):
+        """Dispatch to the cheapest lookup for the given filters."""
+        if district is not None:
+            return self.district(state, district, years)
+        if years is not None:
+            return self.year_range(years, state)
+        if state is not None:
+            return self.state(state)
+        return self.frame
+
+
+def _bounds(sorted_years, years):
+    lo, hi = years
+    return (int(np.searchsorted(sorted_years, lo, side="left")),
+            int(np.searchsorted(sorted_years, hi, side="right")))
+
+
+def shared_index(path=DATA_PATH):
+    """The indexed dataset from the process-wide budgeted cache, one per version.
+
+    It is built straight from the CSV so the unsorted frame is not kept
+    alongside it.
+    """
+    key = ("indexed", os.path.abspath(path), dataset_version(path))
+    return memory.cached(
+        "dataset", key, lambda: IndexedDataset(load_dataset(path)), memory.current_session()
+    )
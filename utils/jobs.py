@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future
+
+# Threads, not processes: jobs reuse the models already resident in
+# utils.models, and the tree traversals release the GIL.
+WORKERS = int(os.environ.get("MFPS_PREDICT_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Finished jobs nobody looked at for this long are dropped.
+RETENTION_S = 15 * 60
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's progress callback once the job has been cancelled."""
+
+
+# =================================================
+# JOB
+# =================================================
+class Job:
+    def __init__(self, session, slot, fn, args, kwargs, inputs=None, total=None, label=""):
+        self.session = session
+        self.slot = slot
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.inputs = inputs
+        self.label = label
+        self.step = 0
+        self.total = total
+        self.future = Future()
+        self.submitted = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+
+    # ---- called from the worker ----
+    def progress(self, step, total=None):
+        """Progress hook handed to ``fn``; also the cancellation point."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.step = step
+        if total is not None:
+            self.total = total
+
+    def _run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            self.progress(0)
+            result = self.fn(*self.args, progress=self.progress, **self.kwargs)
+        except JobCancelled:
+            self.future.set_exception(CancelledError())
+        except Exception as exc:
+            self.future.set_exception(exc)
+        else:
+            self.future.set_result(result)
+        finally:
+            self.finished = time.time()
+
+    # ---- called from the page ----
+    def cancel(self):
+        self._cancel.set()
+        if self.future.cancel():
+            self.finished = time.time()
+
+    @property
+    def status(self):
+        # A finished job reports its outcome even if a cancel arrived after
+        # the result was set.
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            exc = self.future.exception()
+            if isinstance(exc, CancelledError):
+                return "cancelled"
+            return "failed" if exc is not None else "done"
+        if self._cancel.is_set():
+            return "cancelled"
+        return "running" if self.future.running() else "queued"
+
+    def done(self):
+        return self.future.done()
+
+    def fraction(self):
+        return self.step / self.total if self.total else 0.0
+
+
+# =================================================
+# FAIR SCHEDULER
+# =================================================
+_queues = OrderedDict()     # session -> deque of queued jobs, round-robin order
+_slots = {}                 # (session, slot) -> latest job
+_cond = threading.Condition()
+_workers = []
+
+
+def _next_job():
+    """Pop one job from the next session in round-robin order (lock held)."""
+    for session in list(_queues):
+        queue = _queues.pop(session)
+        job = queue.popleft()
+        if queue:
+            _queues[session] = queue     # back of the line
+        return job
+    return None
+
+
+def _worker():
+    while True:
+        with _cond:
+            job = _next_job()
+            while job is None:
+                _cond.wait()
+                job = _next_job()
+        job._run()
+
+
+def _ensure_workers():
+    if _workers:
+        return
+    for i in range(WORKERS):
+        t = threading.Thread(target=_worker, name=f"mfps-predict-{i}", daemon=True)
+        t.start()
+        _workers.append(t)
+
+
+def _prune(now):
+    stale = [k for k, j in _slots.items() if j.finished and now - j.finished > RETENTION_S]
+    for key in stale:
+        del _slots[key]
+
+
+def submit(session, slot, fn, *args, inputs=None, total=None, label="", **kwargs):
+    """Queue ``fn(*args, progress=..., **kwargs)`` for ``session`` and return its job.
+
+    A session holds one job per ``slot``; submitting again cancels the
+    superseded job. Sessions are served round-robin, so one user queueing
+    many jobs cannot starve the others.
+    """
+    job = Job(session, slot, fn, args, kwargs, inputs=inputs, total=total, label=label)
+    with _cond:
+        _ensure_workers()
+        _prune(time.time())
+        previous = _slots.get((session, slot))
+        if previous is not None:
+            previous.cancel()
+            queue = _queues.get(session)
+            if queue is not None and previous in queue:
+                queue.remove(previous)
+                if not queue:
+                    del _queues[session]
+        _slots[(session, slot)] = job
+        _queues.setdefault(session, deque()).append(job)
+        _cond.notify()
+    return job
+
+
+def current(session, slot):
+    with _cond:
+        return _slots.get((session, slot))
+
+
+def discard(session, slot):
+    """Cancel and forget the job in ``slot`` (e.g. when its inputs changed)."""
+    with _cond:
+        job = _slots.pop((session, slot), None)
+        queue = _queues.get(session)
+        if job is not None and queue is not None and job in queue:
+            queue.remove(job)
+            if not queue:
+                del _queues[session]
+    if job is not None:
+        job.cancel()
+
+
+def stats():
+    """Queue depth, running jobs, waiting sessions and worker count for diagnostics."""
+    with _cond:
+        jobs = list(_slots.values())
+        queued = sum(len(q) for q in _queues.values())
+        sessions = len(_queues)
+    return {
+        "queued": queued,
+        "running": sum(j.status == "running" for j in jobs),
+        "sessions": sessions,
+        "workers": len(_workers),
+    }
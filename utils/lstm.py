@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+
+from utils.data import BASE_DIR
+from utils.lazy import lazy_import
+
+h5py = lazy_import("h5py")
+np = lazy_import("numpy")
+
+FORECAST_LSTM_PATH = os.path.join(BASE_DIR, "overall_forecast.h5")
+FLOOD_LSTM_PATH = os.path.join(BASE_DIR, "overall_flood.h5")
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "tanh": lambda x: np.tanh(x),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"unsupported activation {name!r}")
+    return ACTIVATIONS[name]
+
+
+# =================================================
+# LAYERS
+# =================================================
+class LSTMLayer:
+    """Keras LSTM forward pass (gate order i, f, c, o) batched over sequences."""
+
+    def __init__(self, kernel, recurrent_kernel, bias, config):
+        self.kernel = kernel
+        self.recurrent_kernel = recurrent_kernel
+        self.bias = bias if bias is not None else np.zeros(kernel.shape[1], dtype=kernel.dtype)
+        self.units = config["units"]
+        self.activation = _activation(config.get("activation", "tanh"))
+        self.recurrent_activation = _activation(config.get("recurrent_activation", "sigmoid"))
+        self.return_sequences = config.get("return_sequences", False)
+        self.go_backwards = config.get("go_backwards", False)
+
+    def __call__(self, x):
+        batch, steps, _ = x.shape
+        if self.go_backwards:
+            x = x[:, ::-1]
+        # Input projections for every timestep in one matmul.
+        xz = (x.reshape(batch * steps, -1) @ self.kernel + self.bias).reshape(batch, steps, -1)
+
+        h = np.zeros((batch, self.units), dtype=x.dtype)
+        c = np.zeros((batch, self.units), dtype=x.dtype)
+        outputs = []
+        u = self.units
+        for t in range(steps):
+            z = xz[:, t] + h @ self.recurrent_kernel
+            i = self.recurrent_activation(z[:, :u])
+            f = self.recurrent_activation(z[:, u:2 * u])
+            g = self.activation(z[:, 2 * u:3 * u])
+            o = self.recurrent_activation(z[:, 3 * u:])
+            c = f * c + i * g
+            h = o * self.activation(c)
+            if self.return_sequences:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if self.return_sequences else h
+
+
+class DenseLayer:
+    def __init__(self, kernel, bias, config):
+        self.kernel = kernel
+        self.bias = bias if bias is not None else 0.0
+        self.activation = _activation(config.get("activation", "linear"))
+
+    def __call__(self, x):
+        return self.activation(x @ self.kernel + self.bias)
+
+
+# =================================================
+# MODEL
+# =================================================
+class NumpySequential:
+    """Inference-only replacement for a Keras ``Sequential`` of LSTM/Dropout/Dense."""
+
+    def __init__(self, layers, input_shape):
+        self.layers = layers
+        self.input_shape = tuple(input_shape)
+
+    def predict(self, X):
+        """Run the forward pass; ``X`` is ``(batch, steps, features)`` or ``(batch, features)``."""
+        X = np.asarray(X, dtype=np.float32)
+        steps, features = self.input_shape
+        if X.ndim == 2:
+            X = X.reshape(X.shape[0], steps, features)
+        for layer in self.layers:
+            X = layer(X)
+        return X
+
+
+def _layer_weights(group):
+    """``{"kernel": ..., "recurrent_kernel": ..., "bias": ...}`` for one layer group."""
+    weights = {}
+    for name in group.attrs.get("weight_names", []):
+        name = name.decode() if isinstance(name, bytes) else name
+        short = name.split("/")[-1].split(":")[0]
+        weights[short] = np.asarray(group[name][()], dtype=np.float32)
+    return weights
+
+
+def load_keras_h5(path):
+    """Build a :class:`NumpySequential` from a Keras ``.h5`` file without TensorFlow."""
+    with h5py.File(path, "r") as f:
+        raw_config = f.attrs["model_config"]
+        config = json.loads(raw_config.decode() if isinstance(raw_config, bytes) else raw_config)
+        if config["class_name"] != "Sequential":
+            raise ValueError(f"{os.path.basename(path)}: only Sequential models are supported")
+
+        model_weights = f["model_weights"] if "model_weights" in f else f
+        layers, input_shape = [], None
+        for layer in config["config"]["layers"]:
+            kind, cfg = layer["class_name"], layer["config"]
+            if kind == "InputLayer":
+                input_shape = (cfg.get("batch_shape") or cfg.get("batch_input_shape"))[1:]
+                continue
+            if input_shape is None and "batch_input_shape" in cfg:
+                input_shape = cfg["batch_input_shape"][1:]
+            if kind == "Dropout":
+                continue
+            w = _layer_weights(model_weights[cfg["name"]])
+            if kind == "LSTM":
+                layers.append(LSTMLayer(w["kernel"], w["recurrent_kernel"], w.get("bias"), cfg))
+            elif kind == "Dense":
+                layers.append(DenseLayer(w["kernel"], w.get("bias"), cfg))
+            else:
+                raise ValueError(f"{os.path.basename(path)}: unsupported layer {kind}")
+
+    if input_shape is None:
+        input_shape = config["config"]["build_input_shape"][1:]
+    return NumpySequential(layers, input_shape)
+
+
+# =================================================
+# INPUT/OUTPUT SCALING
+# =================================================
+def load_scaler(model_path):
+    """Optional ``<model>.scaler.json`` holding ``{"input": {"min", "max"}, "output": {...}}``.
+
+    If a network was trained on min-max scaled rainfall, drop the fitted
+    bounds next to it to feed and read back millimetres. Without the file the
+    classes pass raw values through, and the page keeps the LSTM path
+    disabled (see :func:`serving_problems`).
+    """
+    path = os.path.splitext(model_path)[0] + ".scaler.json"
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# =================================================
+# SERVING GATE
+# =================================================
+# Written by scripts/verify_lstm.py. The page serves the LSTM path only for
+# model files whose exact bytes matched Keras there, and only with a scaler:
+# the networks were trained on scaled rainfall, so raw millimetres in would
+# give meaningless forecasts and flood probabilities.
+VERIFICATION_PATH = os.path.join(BASE_DIR, "reports", "lstm_verification.json")
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_verification(path=VERIFICATION_PATH):
+    """``{model file name: record}`` from the last verification run (empty if none)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def serving_problems(paths=(FORECAST_LSTM_PATH, FLOOD_LSTM_PATH), verification_path=VERIFICATION_PATH):
+    """Why the LSTM path must stay disabled; empty once every model has a scaler and a passing check."""
+    records = load_verification(verification_path)
+    problems = []
+    for path in paths:
+        name = os.path.basename(path)
+        if not os.path.exists(path):
+            problems.append(f"{name} not found")
+            continue
+        if load_scaler(path) is None:
+            problems.append(f"{name}: no scaler file ({os.path.splitext(name)[0]}.scaler.json)")
+        record = records.get(name)
+        if record is None:
+            problems.append(f"{name}: not verified against Keras (run `python -m scripts.verify_lstm`)")
+        elif record.get("sha256") != file_digest(path):
+            problems.append(f"{name}: changed since it was verified")
+        elif not record.get("passed"):
+            problems.append(f"{name}: verification failed (max error {record.get('max_abs_err', float('nan')):.2e})")
+    return problems
+
+
+def scale(values, bounds):
+    lo, hi = bounds["min"], bounds["max"]
+    return (np.asarray(values, dtype=np.float32) - lo) / (hi - lo)
+
+
+def unscale(values, bounds):
+    lo, hi = bounds["min"], bounds["max"]
+    return np.asarray(values, dtype=np.float32) * (hi - lo) + lo
+
+
+class LSTMRainfallForecaster:
+    """12 months in -> next 12 months out, using ``overall_forecast.h5``."""
+
+    def __init__(self, path=FORECAST_LSTM_PATH):
+        self.network = load_keras_h5(path)
+        self.scaler = load_scaler(path)
+
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        if self.scaler:
+            X = scale(X, self.scaler["input"])
+        out = self.network.predict(X)
+        if self.scaler:
+            out = unscale(out, self.scaler["output"])
+        return out
+
+
+class LSTMFloodClassifier:
+    """Flood probability for a year of monthly rainfall, using ``overall_flood.h5``."""
+
+    def __init__(self, path=FLOOD_LSTM_PATH):
+        self.network = load_keras_h5(path)
+        self.scaler = load_scaler(path)
+
+    def predict_proba(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        if self.scaler:
+            X = scale(X, self.scaler["input"])
+        return self.network.predict(X)[:, 0]
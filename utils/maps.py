@@ -0,0 +1,56 @@
+import json
+import os
+
+from utils import disk_cache, risk
+from utils.data import BASE_DIR
+from utils.flood_scores import district_year_scores, scores_version
+
+GEOJSON_PATH = os.path.join(BASE_DIR, "data", "malaysia_districts.geojson")
+ALL_STATES = "All States"
+
+
+def build_map_layers(index, scores, state, year, geojson_path=GEOJSON_PATH):
+    """District table and matching GeoJSON features for one map view.
+
+    ``map_df`` has one row per district with the mean annual rainfall, its
+    risk label and popup colour, and the model's flood probability;
+    ``geojson`` keeps only the features of those districts.
+    """
+    map_df = (
+        index.year(year)
+        .groupby(["STATE_NAME", "DISTRICT_NAME"], as_index=False)
+        .agg({"ANNUAL RAINFALL": "mean"})
+    )
+    risk_codes = risk.classify(map_df["ANNUAL RAINFALL"], "annual", map_df["STATE_NAME"])
+    map_df["flood_risk"] = risk.labels(risk_codes)
+    map_df["popup_bg"] = risk.colors(risk_codes, "popup")
+    map_df = map_df.merge(
+        district_year_scores(scores, year),
+        on=["STATE_NAME", "DISTRICT_NAME"],
+        how="left"
+    )
+    if state != ALL_STATES:
+        map_df = map_df[map_df["STATE_NAME"] == state]
+
+    with open(geojson_path, encoding="utf-8") as f:
+        geojson = json.load(f)
+    valid_districts = set(map_df["DISTRICT_NAME"])
+    geojson["features"] = [
+        f for f in geojson["features"]
+        if f["properties"]["NAME_2"] in valid_districts
+    ]
+    return map_df, geojson
+
+
+def map_layers(index, scores, state, year, geojson_path=GEOJSON_PATH):
+    """:func:`build_map_layers` through the persistent disk cache.
+
+    The folium map itself cannot be serialised (its layers hold closures),
+    so the prepared layer data is what survives a restart.
+    """
+    stat = os.stat(geojson_path)
+    key = (state, int(year), os.path.abspath(geojson_path), stat.st_mtime_ns, stat.st_size,
+           scores_version())
+    return disk_cache.cached(
+        "map_layers", key, lambda: build_map_layers(index, scores, state, year, geojson_path)
+    )
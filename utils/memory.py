@@ -0,0 +1,263 @@
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter, OrderedDict
+
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# One budget for every cache in the process. Entries are evicted least
+# recently used first, regardless of which cache they belong to.
+CACHES = ("dataset", "model", "figure", "map")
+
+# Caches backed by utils.disk_cache: a miss here is looked up on disk before
+# the loader runs, and new entries are written through, so a restarted
+# server starts warm. Models have their own bundle; folium maps hold
+# closures and cannot be serialised.
+PERSISTED = ("dataset", "figure")
+BUDGET_BYTES = int(float(os.environ.get("MFPS_CACHE_BUDGET_MB", "1024")) * 1024 * 1024)
+
+SHARED = "shared"
+
+
+# =================================================
+# SIZE ESTIMATION
+# =================================================
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+         types.MethodType, property)
+
+
+def sizeof(obj):
+    """Approximate bytes reachable from ``obj``.
+
+    Arrays and frames report their buffers; containers and plain objects are
+    walked (fitted trees expose their node arrays through ``__getstate__``).
+    Shared objects are counted once.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIP):
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            if item.base is None:
+                total += item.nbytes
+            else:
+                stack.append(item.base)
+            if item.dtype == object:
+                stack.extend(item.ravel())
+            continue
+        if hasattr(item, "memory_usage") and hasattr(item, "ndim"):
+            usage = item.memory_usage(deep=True)
+            total += int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+            continue
+        if hasattr(item, "to_plotly_json"):
+            stack.append(item.to_plotly_json())
+            continue
+
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            try:
+                state = item.__getstate__()
+            except Exception:
+                state = getattr(item, "__dict__", None)
+            if state is not None:
+                stack.append(state)
+    return total
+
+
+def process_rss():
+    """Resident set size of this process in bytes (0 if it cannot be read)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def current_session():
+    """Streamlit session id of the running script, or ``None`` outside one."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+# =================================================
+# LEDGER
+# =================================================
+class Entry:
+    __slots__ = ("cache", "key", "value", "nbytes", "owner", "created", "last_used", "hits")
+
+    def __init__(self, cache, key, value, nbytes, owner):
+        self.cache = cache
+        self.key = key
+        self.value = value
+        self.nbytes = nbytes
+        self.owner = owner or SHARED
+        self.created = self.last_used = time.time()
+        self.hits = Counter()
+
+
+_entries = OrderedDict()   # (cache, key) -> Entry, least recently used first
+_lock = threading.Lock()
+_loading = {}
+evictions = Counter()
+budget = BUDGET_BYTES
+
+
+def _touch(entry, session):
+    entry.last_used = time.time()
+    entry.hits[session or SHARED] += 1
+    _entries.move_to_end((entry.cache, entry.key))
+
+
+def get(cache, key, session=None):
+    with _lock:
+        entry = _entries.get((cache, key))
+        if entry is not None:
+            _touch(entry, session)
+            return entry.value
+    if cache in PERSISTED:
+        from utils import disk_cache
+
+        value = disk_cache.get(cache, key)
+        if value is not None:
+            return put(cache, key, value, session, persist=False)
+    return None
+
+
+def put(cache, key, value, session=None, nbytes=None, persist=True):
+    """Store ``value`` and evict older entries until the budget holds again."""
+    if cache not in CACHES:
+        raise ValueError(f"unknown cache {cache!r}; expected one of {CACHES}")
+    if nbytes is None:
+        nbytes = sizeof(value)
+    with _lock:
+        _entries[(cache, key)] = Entry(cache, key, value, nbytes, session)
+        _enforce(keep=(cache, key))
+    if persist and cache in PERSISTED:
+        from utils import disk_cache
+
+        disk_cache.put(cache, key, value)
+    return value
+
+
+def cached(cache, key, loader, session=None, nbytes=None):
+    """Return the cached value for ``key``, calling ``loader()`` once on a miss.
+
+    Concurrent misses on the same key wait for the first load instead of
+    loading the object twice.
+    """
+    value = get(cache, key, session)
+    if value is not None:
+        return value
+    with _lock:
+        key_lock = _loading.setdefault((cache, key), threading.Lock())
+    with key_lock:
+        value = get(cache, key, session)
+        if value is None:
+            value = put(cache, key, loader(), session, nbytes)
+    with _lock:
+        _loading.pop((cache, key), None)
+    return value
+
+
+def _enforce(keep=None):
+    total = sum(e.nbytes for e in _entries.values())
+    for ident in list(_entries):
+        if total <= budget:
+            break
+        if ident == keep:
+            continue
+        entry = _entries.pop(ident)
+        total -= entry.nbytes
+        evictions[entry.cache] += 1
+
+
+def set_budget(nbytes):
+    global budget
+    with _lock:
+        budget = int(nbytes)
+        _enforce()
+
+
+def evict(cache=None, session=None):
+    """Drop every entry of ``cache`` and/or owned by ``session``; returns the count."""
+    with _lock:
+        doomed = [
+            ident for ident, e in _entries.items()
+            if (cache is None or e.cache == cache) and (session is None or e.owner == session)
+        ]
+        for ident in doomed:
+            evictions[_entries.pop(ident).cache] += 1
+    return len(doomed)
+
+
+def keys(cache):
+    with _lock:
+        return [key for (c, key) in _entries if c == cache]
+
+
+# =================================================
+# REPORTING
+# =================================================
+def stats():
+    """Process, per-cache and per-session accounting for the admin view."""
+    with _lock:
+        entries = list(_entries.values())
+        evicted = dict(evictions)
+
+    caches = {
+        name: {"entries": 0, "bytes": 0, "evictions": evicted.get(name, 0)}
+        for name in CACHES
+    }
+    sessions = {}
+    for e in entries:
+        caches[e.cache]["entries"] += 1
+        caches[e.cache]["bytes"] += e.nbytes
+        owned = sessions.setdefault(e.owner, {"owned_entries": 0, "owned_bytes": 0,
+                                             "used_entries": 0, "used_bytes": 0})
+        owned["owned_entries"] += 1
+        owned["owned_bytes"] += e.nbytes
+        for session in e.hits:
+            used = sessions.setdefault(session, {"owned_entries": 0, "owned_bytes": 0,
+                                                "used_entries": 0, "used_bytes": 0})
+            used["used_entries"] += 1
+            used["used_bytes"] += e.nbytes
+
+    return {
+        "rss_bytes": process_rss(),
+        "cached_bytes": sum(e.nbytes for e in entries),
+        "budget_bytes": budget,
+        "caches": caches,
+        "sessions": sessions,
+        "entries": [
+            {"cache": e.cache, "key": repr(e.key), "bytes": e.nbytes, "owner": e.owner,
+             "hits": sum(e.hits.values()), "idle_s": time.time() - e.last_used}
+            for e in reversed(entries)
+        ],
+    }
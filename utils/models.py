@@ -0,0 +1,327 @@
+import os
+
+from utils import memory
+from utils.bundle import open_bundle
+from utils.data import BASE_DIR
+from utils.lazy import lazy_import
+
+joblib = lazy_import("joblib")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# =================================================
+# PATHS
+# =================================================
+MODEL_DIR = os.path.join(BASE_DIR, "rf_models")
+STATE_SUMMARY_CSV = os.path.join(MODEL_DIR, "state_model_summary.csv")
+
+MIN_WINDOW = 6
+MAX_WINDOW = 11
+
+
+def state_slug(state):
+    """``"Negeri Sembilan"`` -> ``"negeri_sembilan"`` (matches the .sav file names)."""
+    return state.strip().lower().replace(" ", "_")
+
+
+def resolve_model_path(model_file):
+    """Map a ``Model_File`` entry to a path inside ``rf_models/``.
+
+    The summary CSV was written on Windows, so only the file name is kept.
+    """
+    filename = model_file.replace("\\", "/").split("/")[-1]
+    return os.path.join(MODEL_DIR, filename)
+
+
+def variable_window_path(state):
+    return os.path.join(MODEL_DIR, f"{state_slug(state)}_rf_vw.sav")
+
+
+GLOBAL_MODEL_FILE = "rf_global.sav"
+GLOBAL_MODEL_PATH = os.path.join(MODEL_DIR, GLOBAL_MODEL_FILE)
+
+
+def overall_model_path(n_input):
+    return os.path.join(MODEL_DIR, f"rf_overall_{n_input}m.sav")
+
+
+# =================================================
+# PROCESS-WIDE MODEL CACHE
+# =================================================
+load_counts = {}
+
+
+def _bundle_entry(path):
+    """The bundle entry serving ``path``, or ``None`` (no bundle, not packed, or repacking due)."""
+    bundle = open_bundle()
+    return bundle.current_entry(path) if bundle is not None else None
+
+
+def _load(path):
+    load_counts[path] = load_counts.get(path, 0) + 1
+    entry = _bundle_entry(path)
+    if entry is not None:
+        return open_bundle().load_entry(entry)
+    return joblib.load(path)
+
+
+def model_available(path):
+    """True if ``path`` can be loaded, from the bundle or as a loose file."""
+    return _bundle_entry(path) is not None or os.path.exists(path)
+
+
+def _stamp(path):
+    entry = _bundle_entry(path)
+    if entry is not None:
+        return entry["sha256"][:16]
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _is_view(path):
+    """True if ``path`` holds a :class:`ScopedForecaster` (told without loading a forest)."""
+    entry = _bundle_entry(path)
+    if entry is not None:
+        return entry["type"] == ScopedForecaster.__name__
+    views = {os.path.basename(overall_model_path(n)) for n in range(MIN_WINDOW, MAX_WINDOW + 1)}
+    return os.path.basename(path) in views
+
+
+def model_version(path):
+    """Identifies the model ``load_model(path)`` serves: the bundle entry's hash or the file's stamp.
+
+    A :class:`ScopedForecaster` file only names the global model, so its
+    version also carries the global model's stamp; retraining
+    ``rf_global.sav`` changes the version of every view onto it. Only such
+    views are loaded to tell, so versioning a forest never reads it.
+    """
+    version = _stamp(path)
+    if _is_view(path):
+        model = load_model(path)
+        if isinstance(model, ScopedForecaster):
+            version += "+" + _stamp(os.path.join(MODEL_DIR, model.model_file))
+    return version
+
+
+def load_model(path):
+    """Load a model once per process and hand out the same object afterwards.
+
+    A model packed into the bundle (see :mod:`utils.bundle`) is served from
+    it, keyed by its original file name; other paths are read with joblib.
+    Models live in the budgeted ``"model"`` cache of :mod:`utils.memory`, so a
+    rarely used forest can be evicted and is simply reloaded on next use.
+    The cache key includes the file's stamp, so a retrained file is picked
+    up by a running process; the superseded object ages out of the cache.
+    """
+    path = os.path.abspath(path)
+    return memory.cached("model", (path, _stamp(path)), lambda: _load(path), memory.current_session())
+
+
+def resident_models():
+    """Paths of the models currently held in memory."""
+    return [path for path, _ in memory.keys("model")]
+
+
+# =================================================
+# PER-TREE PREDICTIONS
+# =================================================
+def tree_predictions(estimator, X):
+    """``(n_trees, n_rows)`` matrix of every tree's prediction for ``X``.
+
+    The input is validated and cast to float32 once, then each fitted tree is
+    evaluated directly - the same single traversal per tree that
+    ``RandomForestRegressor.predict`` performs before averaging, so the whole
+    matrix costs about one ``predict`` call.
+    """
+    X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float32)
+    return np.stack([tree.predict(X, check_input=False) for tree in estimator.estimators_])
+
+
+def per_tree_predict(model, X, **scope):
+    """Per-tree predictions for any of the forecaster kinds used by the pages."""
+    if hasattr(model, "per_tree_predict"):
+        return model.per_tree_predict(X, **scope)
+    if hasattr(model, "estimators_"):
+        return tree_predictions(model, X)
+    return np.atleast_2d(model.predict(X))
+
+
+# =================================================
+# VARIABLE-WINDOW FORECASTER
+# =================================================
+def variable_window_features(X, max_window=MAX_WINDOW):
+    """Left-pad windows to ``max_window`` months and append the window length.
+
+    Padding uses each window's own mean so the padded slots sit inside the
+    range the trees have seen; the length column lets the forest tell a real
+    month from a padded one.
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    n = X.shape[1]
+    if n > max_window:
+        raise ValueError(f"window of {n} months exceeds the {max_window}-month maximum")
+    pad = np.repeat(X.mean(axis=1, keepdims=True), max_window - n, axis=1)
+    length = np.full((X.shape[0], 1), n, dtype=float)
+    return np.hstack([pad, X, length])
+
+
+class VariableWindowForecaster:
+    """One forest that accepts any input window between ``min_window`` and ``max_window``."""
+
+    def __init__(self, estimator, min_window=MIN_WINDOW, max_window=MAX_WINDOW):
+        self.estimator = estimator
+        self.min_window = min_window
+        self.max_window = max_window
+
+    def _check(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if not self.min_window <= X.shape[1] <= self.max_window:
+            raise ValueError(
+                f"window must be {self.min_window}-{self.max_window} months, got {X.shape[1]}"
+            )
+        return X
+
+    def predict(self, X):
+        X = self._check(X)
+        return self.estimator.predict(variable_window_features(X, self.max_window))
+
+    def per_tree_predict(self, X):
+        X = self._check(X)
+        return tree_predictions(self.estimator, variable_window_features(X, self.max_window))
+
+
+# =================================================
+# GLOBAL (CROSS-STATE) FORECASTER
+# =================================================
+class GlobalForecaster:
+    """A single forest trained on every state's windows.
+
+    The state (and optionally the district) is one-hot encoded after the
+    variable-window features. ``state=None`` selects the national scope, which
+    was trained on the Malaysia-wide mean series with an all-zero state code.
+
+    With district codes, one extra "state-level" column marks the state's
+    mean series. A prediction for a state without a (known) district sets it,
+    so scoped forecasts use a code the forest saw in training rather than an
+    all-zero district block.
+    """
+
+    def __init__(self, estimator, states, districts=None,
+                 min_window=MIN_WINDOW, max_window=MAX_WINDOW):
+        self.estimator = estimator
+        self.states = list(states)
+        self.districts = list(districts) if districts else []
+        self.state_level = bool(self.districts)
+        self.min_window = min_window
+        self.max_window = max_window
+
+    def scope_features(self, n_rows, state=None, district=None):
+        state_level = getattr(self, "state_level", False)    # absent from older pickles
+        codes = np.zeros((n_rows, len(self.states) + len(self.districts) + state_level))
+        if state is not None:
+            if state not in self.states:
+                raise KeyError(f"state {state!r} was not part of the global model")
+            codes[:, self.states.index(state)] = 1.0
+        if district is not None and district in self.districts:
+            codes[:, len(self.states) + self.districts.index(district)] = 1.0
+        elif state is not None and state_level:
+            codes[:, -1] = 1.0
+        return codes
+
+    def features(self, X, state=None, district=None):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if not self.min_window <= X.shape[1] <= self.max_window:
+            raise ValueError(
+                f"window must be {self.min_window}-{self.max_window} months, got {X.shape[1]}"
+            )
+        return np.hstack([
+            variable_window_features(X, self.max_window),
+            self.scope_features(X.shape[0], state, district),
+        ])
+
+    def predict(self, X, state=None, district=None):
+        return self.estimator.predict(self.features(X, state, district))
+
+    def per_tree_predict(self, X, state=None, district=None):
+        return tree_predictions(self.estimator, self.features(X, state, district))
+
+
+class ScopedForecaster:
+    """Per-window view onto the global model for one state (or the nation).
+
+    Pickled as ``rf_overall_{n}m.sav``; it only stores the global model's file
+    name, so all six files share the one resident forest.
+    """
+
+    def __init__(self, scope=None, n_input=None, model_file=GLOBAL_MODEL_FILE):
+        self.scope = scope
+        self.n_input = n_input
+        self.model_file = model_file
+
+    @property
+    def model(self):
+        return load_model(os.path.join(MODEL_DIR, self.model_file))
+
+    def _check(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if self.n_input is not None and X.shape[1] != self.n_input:
+            raise ValueError(f"expected {self.n_input} input months, got {X.shape[1]}")
+        return X
+
+    def predict(self, X):
+        return self.model.predict(self._check(X), state=self.scope)
+
+    def per_tree_predict(self, X):
+        return self.model.per_tree_predict(self._check(X), state=self.scope)
+
+
+# =================================================
+# STATE FORECASTER LOOKUP
+# =================================================
+def load_state_summary(path=STATE_SUMMARY_CSV):
+    return pd.read_csv(path)
+
+
+def state_model_path(summary_df, state, n_input):
+    """Per-window model file for ``state``/``n_input`` or ``None``."""
+    row = summary_df[
+        (summary_df["State"] == state) &
+        (summary_df["Input_Months"] == n_input)
+    ]
+    if row.empty:
+        return None
+    return resolve_model_path(row["Model_File"].values[0])
+
+
+def load_state_forecaster(summary_df, state, n_input, variant="per_window"):
+    """Return ``(model, path)`` for a state, or ``(None, path)`` if it is missing.
+
+    ``variant="variable_window"`` serves every slider position from the single
+    ``<state>_rf_vw.sav`` forest and ``variant="global"`` from the national
+    ``rf_global.sav``; both fall back to the per-window file when their model
+    has not been trained yet. When a bundle exists, per-window models are
+    looked up in its manifest by ``(state, n_input)`` without reading
+    ``state_model_summary.csv``.
+    """
+    if variant == "global" and model_available(GLOBAL_MODEL_PATH):
+        global_model = load_model(GLOBAL_MODEL_PATH)
+        if state in global_model.states:
+            return ScopedForecaster(state, n_input), GLOBAL_MODEL_PATH
+
+    if variant == "variable_window":
+        path = variable_window_path(state)
+        if model_available(path):
+            return load_model(path), path
+
+    path = per_window_model_path(summary_df, state, n_input)
+    if path is None or not model_available(path):
+        return None, path
+    return load_model(path), path
+
+
+def per_window_model_path(summary_df, state, n_input):
+    """Path of the per-window model served for ``state``/``n_input`` (the bundle's first), or ``None``."""
+    bundle = open_bundle()
+    if bundle is not None and (state, n_input) in bundle:
+        return os.path.join(MODEL_DIR, bundle.entry(state, n_input)["source"])
+    return state_model_path(summary_df, state, n_input)
@@ -0,0 +1,387 @@
+import csv
+import json
+import logging
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import deque, namedtuple
+
+from utils import risk
+from utils.data import MONTHLY_COLS
+from utils.forecast import recursive_forecast
+from utils.lazy import lazy_import
+from utils.models import MIN_WINDOW, load_state_forecaster
+from utils.outlook import DEFAULT_HORIZON, shared_state_summary, state_forecasts
+
+np = lazy_import("numpy")
+
+log = logging.getLogger(__name__)
+
+# Streaming ingestion is off unless a source is configured:
+# MFPS_NOWCAST_DIR is a drop directory for .csv/.jsonl files (write them
+# elsewhere and rename them in, so a half-written file is never read) and
+# MFPS_NOWCAST_PORT a TCP port on 127.0.0.1 taking one observation per line.
+DROP_DIR = os.environ.get("MFPS_NOWCAST_DIR")
+PORT = os.environ.get("MFPS_NOWCAST_PORT")
+POLL_S = float(os.environ.get("MFPS_NOWCAST_POLL", "1"))
+
+# Latencies kept for the percentiles, and the window for the throughput rate.
+LATENCY_SAMPLES = 10_000
+RATE_WINDOW_S = 60
+
+# One district-month: MONTH is 0-11; ``origin`` is when it was produced
+# (``SENT_AT`` in the record) or, failing that, when it arrived.
+Observation = namedtuple("Observation", "state district year month rainfall origin")
+
+
+# =================================================
+# PARSING
+# =================================================
+def parse_observation(record, arrived):
+    """An :class:`Observation` from a dict with STATE_NAME, DISTRICT_NAME, YEAR, MONTH, RAINFALL.
+
+    MONTH is ``"JAN"``..``"DEC"`` or 1-12; an optional SENT_AT (epoch
+    seconds) marks when the producer emitted it.
+    """
+    month = str(record["MONTH"]).strip().upper()
+    month = MONTHLY_COLS.index(month[:3]) if month[:3] in MONTHLY_COLS else int(month) - 1
+    if not 0 <= month < 12:
+        raise ValueError(f"month out of range: {record['MONTH']!r}")
+    return Observation(
+        str(record["STATE_NAME"]).strip(),
+        str(record["DISTRICT_NAME"]).strip(),
+        int(record["YEAR"]),
+        month,
+        float(record["RAINFALL"]),
+        float(record.get("SENT_AT") or arrived),
+    )
+
+
+def parse_line(line, arrived, header=None):
+    """One JSON object, or one CSV row in ``header`` order (default: the five fields)."""
+    line = line.strip()
+    if line.startswith("{"):
+        return parse_observation(json.loads(line), arrived)
+    fields = header or ("STATE_NAME", "DISTRICT_NAME", "YEAR", "MONTH", "RAINFALL")
+    return parse_observation(dict(zip(fields, next(csv.reader([line])))), arrived)
+
+
+def read_drop_file(path):
+    """``(observations, bad_lines)`` from a CSV (with header) or JSON-lines file."""
+    arrived = os.stat(path).st_mtime
+    observations, bad = [], 0
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            rows, decode = csv.DictReader(f), dict
+        else:
+            rows, decode = (line for line in f if line.strip()), json.loads
+        for row in rows:
+            try:
+                observations.append(parse_observation(decode(row), arrived))
+            except (KeyError, ValueError, TypeError):
+                bad += 1
+    return observations, bad
+
+
+# =================================================
+# ROLLING WINDOWS
+# =================================================
+class Nowcaster:
+    """Per-district rolling input windows and forecasts, updated as observations arrive.
+
+    Each state starts from its precomputed latest windows and forecasts
+    (``utils.outlook.state_forecasts``). An observation for the month after
+    a district's last one rolls its window by one month; one inside the
+    window corrects that month in place. After every batch, only the
+    districts whose windows changed are re-forecast, one batched forecast
+    per state, and ``version`` is bumped for readers polling
+    :meth:`updates`.
+    """
+
+    def __init__(self, index, n_input=MIN_WINDOW, horizon=DEFAULT_HORIZON):
+        self.index = index
+        self.n_input = n_input
+        self.horizon = horizon
+        self.version = 0
+        self.started = time.time()
+        self.counters = {
+            "received": 0, "applied": 0, "corrections": 0, "stale": 0,
+            "gaps": 0, "unknown": 0, "rejected": 0, "errors": 0, "batches": 0, "forecast_rows": 0,
+        }
+        self._states = {}
+        self._lock = threading.Lock()
+        self._latency = deque(maxlen=LATENCY_SAMPLES)
+        self._applied_at = deque()
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+
+    # ---- per-state windows ----
+    def _state(self, state):
+        if state in self._states:
+            return self._states[state]
+        forecasts = state_forecasts(self.index, state, self.n_input, self.horizon)
+        if forecasts is None:
+            self._states[state] = None
+            return None
+        model, _ = load_state_forecaster(shared_state_summary(), state, self.n_input)
+        n = len(forecasts["districts"])
+        last = np.array([int(self.index.district(state, d)["YEAR"].iloc[-1]) * 12 + 11
+                         for d in forecasts["districts"]], dtype=np.int64)
+        preds = forecasts["preds"].copy()
+        self._states[state] = {
+            "model": model,
+            "districts": forecasts["districts"],
+            "rows": forecasts["rows"],
+            "windows": forecasts["windows"].copy(),     # the cached arrays stay untouched
+            "last": last,
+            "preds": preds,
+            "codes": risk.classify(preds.ravel(), "monthly", state).reshape(preds.shape),
+            "version": np.zeros(n, dtype=np.int64),
+            "updated": np.zeros(n),
+        }
+        return self._states[state]
+
+    def prime(self, states):
+        """Load the windows and forecasters of ``states`` up front instead of on their first observation."""
+        with self._lock:
+            for state in states:
+                self._state(state)
+
+    def apply(self, observations):
+        """Fold a batch into the windows and re-forecast the touched districts; returns the count applied."""
+        now = time.time()
+        touched, origins = {}, []
+        with self._lock:
+            for obs in observations:
+                self.counters["received"] += 1
+                st = self._state(obs.state)
+                row = st["rows"].get(obs.district) if st is not None else None
+                if row is None:
+                    self.counters["unknown"] += 1
+                    continue
+                month, last = obs.year * 12 + obs.month, st["last"][row]
+                window = st["windows"][row]
+                if month == last + 1:
+                    window[:-1] = window[1:]
+                    window[-1] = obs.rainfall
+                    st["last"][row] = month
+                elif last - self.n_input < month <= last:
+                    window[self.n_input - 1 - (last - month)] = obs.rainfall
+                    self.counters["corrections"] += 1
+                elif month > last + 1:
+                    self.counters["gaps"] += 1         # missing months in between; wait for them
+                    continue
+                else:
+                    self.counters["stale"] += 1        # older than the window
+                    continue
+                touched.setdefault(obs.state, set()).add(row)
+                origins.append(obs.origin)
+
+            if not touched:
+                return 0
+            self.version += 1
+            for state, rows in touched.items():
+                st = self._states[state]
+                rows = np.fromiter(sorted(rows), dtype=np.int64)
+                preds = recursive_forecast(st["model"], st["windows"][rows], self.horizon)
+                st["preds"][rows] = preds
+                st["codes"][rows] = risk.classify(preds.ravel(), "monthly", state).reshape(preds.shape)
+                st["version"][rows] = self.version
+                st["updated"][rows] = now
+                self.counters["forecast_rows"] += len(rows)
+
+            done = time.time()
+            self.counters["applied"] += len(origins)
+            self.counters["batches"] += 1
+            self._latency.extend(done - t for t in origins)
+            self._applied_at.append((done, len(origins)))
+            while self._applied_at and done - self._applied_at[0][0] > RATE_WINDOW_S:
+                self._applied_at.popleft()
+        return len(origins)
+
+    # ---- readers ----
+    def updates(self, since=0):
+        """``(version, rows)``: every district re-forecast after ``since``, newest first."""
+        out = []
+        with self._lock:
+            for state, st in self._states.items():
+                if st is None:
+                    continue
+                for row in np.flatnonzero(st["version"] > since):
+                    last = int(st["last"][row])
+                    out.append({
+                        "State": state,
+                        "District": st["districts"][row],
+                        "Through": f"{MONTHLY_COLS[last % 12]} {last // 12}",
+                        "Next_mm": float(st["preds"][row, 0]),
+                        "Next_Risk": risk.labels(st["codes"][row, :1])[0],
+                        "Peak_mm": float(st["preds"][row].max()),
+                        "Peak_Risk": risk.labels(st["codes"][row].max(keepdims=True))[0],
+                        "Updated": float(st["updated"][row]),
+                    })
+            version = self.version
+        out.sort(key=lambda r: r["Updated"], reverse=True)
+        return version, out
+
+    def stats(self):
+        """Counters, observations/s over the last minute, and end-to-end latency percentiles (ms)."""
+        with self._lock:
+            latency = np.array(self._latency) * 1e3
+            recent = sum(n for _, n in self._applied_at)
+            span_s = min(RATE_WINDOW_S, max(time.time() - self.started, 1e-9))
+            stats = dict(self.counters, version=self.version, queued=self._queue.qsize(),
+                         rate_per_s=recent / span_s)
+        for p in (50, 95, 99):
+            stats[f"latency_p{p}_ms"] = float(np.percentile(latency, p)) if len(latency) else None
+        stats["latency_max_ms"] = float(latency.max()) if len(latency) else None
+        return stats
+
+    # ---- ingestion ----
+    def submit(self, observations):
+        """Queue observations for the applier thread (sources call this)."""
+        for obs in observations:
+            self._queue.put(obs)
+
+    def _error(self, message, *args):
+        log.exception(message, *args)
+        with self._lock:
+            self.counters["errors"] += 1
+
+    def run_applier(self):
+        """Apply whatever is queued as one batch, block for more, repeat (until :meth:`stop`).
+
+        A batch that raises is logged and counted under ``errors``; the
+        applier carries on with the next one.
+        """
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.apply(batch)
+            except Exception:
+                self._error("nowcast: applying a batch of %d observations failed", len(batch))
+
+    def stop(self):
+        self._stop.set()
+
+    def watch_directory(self, path, poll_s=POLL_S):
+        """Ingest ``*.csv``/``*.jsonl`` dropped into ``path``; finished files move to ``processed/``.
+
+        A file that cannot be read at all moves to ``failed/`` instead, so it
+        is not retried on every poll; errors are logged and counted.
+        """
+        done_dir = os.path.join(path, "processed")
+        failed_dir = os.path.join(path, "failed")
+        while not self._stop.is_set():
+            try:
+                os.makedirs(done_dir, exist_ok=True)
+                for name in sorted(os.listdir(path)):
+                    src = os.path.join(path, name)
+                    if name.startswith(".") or not name.endswith((".csv", ".jsonl")) or not os.path.isfile(src):
+                        continue
+                    try:
+                        observations, bad = read_drop_file(src)
+                    except Exception:
+                        self._error("nowcast: cannot read drop file %s", src)
+                        os.makedirs(failed_dir, exist_ok=True)
+                        os.replace(src, os.path.join(failed_dir, name))
+                        continue
+                    with self._lock:
+                        self.counters["rejected"] += bad
+                    self.submit(observations)
+                    os.replace(src, os.path.join(done_dir, name))
+            except Exception:
+                self._error("nowcast: polling drop directory %s failed", path)
+            self._stop.wait(poll_s)
+
+    def bind_socket(self, port, host="127.0.0.1"):
+        """A server bound to ``host:port`` but not yet serving; raises ``OSError`` if the port is taken."""
+        nowcaster = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    line = raw.decode("utf-8", "replace")
+                    if not line.strip() or line.startswith("STATE_NAME"):
+                        continue
+                    try:
+                        nowcaster.submit([parse_line(line, time.time())])
+                    except (KeyError, ValueError, TypeError, StopIteration):
+                        with nowcaster._lock:
+                            nowcaster.counters["rejected"] += 1
+
+        return _Server((host, int(port)), Handler)
+
+    def serve_socket(self, port, host="127.0.0.1", server=None):
+        """Accept newline-delimited observations on ``host:port`` (JSON objects or 5-field CSV)."""
+        server = server or self.bind_socket(port, host)
+        threading.Thread(target=server.serve_forever, name="mfps-nowcast-socket", daemon=True).start()
+        return server
+
+    def start(self, drop_dir=None, port=None):
+        """Start the applier and the configured sources on daemon threads.
+
+        The drop directory and the socket are set up before any thread
+        starts, so a taken port or an unusable directory raises ``OSError``
+        without leaving threads behind.
+        """
+        if drop_dir:
+            os.makedirs(drop_dir, exist_ok=True)
+        server = self.bind_socket(port) if port else None
+        threading.Thread(target=self.run_applier, name="mfps-nowcast", daemon=True).start()
+        if drop_dir:
+            threading.Thread(target=self.watch_directory, args=(drop_dir,),
+                             name="mfps-nowcast-dir", daemon=True).start()
+        if server is not None:
+            self.serve_socket(port, server=server)
+        return self
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    # A dashboard restarted right after a crash can rebind while the old
+    # connections sit in TIME_WAIT.
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+# =================================================
+# PROCESS-WIDE HUB
+# =================================================
+_hub = None
+_hub_error = None
+_hub_lock = threading.Lock()
+
+
+def start(index):
+    """The process's running :class:`Nowcaster`, started on first call; ``None`` if no source is configured.
+
+    Every dashboard session reads the same instance, so an update applied
+    once reaches every open page on its next poll. If the sources cannot be
+    set up (e.g. the port is in use) the failure is logged once and this
+    returns ``None`` for the life of the process.
+    """
+    global _hub, _hub_error
+    if not (DROP_DIR or PORT):
+        return None
+    with _hub_lock:
+        if _hub is None and _hub_error is None:
+            try:
+                _hub = Nowcaster(index).start(DROP_DIR, PORT)
+            except OSError as exc:
+                _hub_error = exc
+                log.error("nowcast disabled: cannot start its sources (dir %r, port %r): %s",
+                          DROP_DIR, PORT, exc)
+    return _hub
+
+
+def current():
+    return _hub
@@ -0,0 +1,170 @@
+import os
+
+from utils import memory, risk
+from utils.data import MONTHLY_COLS, dataset_version
+from utils.export import district_windows
+from utils.flood_scores import district_year_scores
+from utils.forecast import recursive_forecast
+from utils.lazy import lazy_import
+from utils.models import (
+    MIN_WINDOW,
+    STATE_SUMMARY_CSV,
+    load_state_forecaster,
+    load_state_summary,
+    model_version,
+)
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+DEFAULT_HORIZON = 6
+
+
+def shared_state_summary(path=STATE_SUMMARY_CSV):
+    stat = os.stat(path)
+    return memory.cached("dataset", ("state_summary", stat.st_mtime_ns, stat.st_size),
+                         lambda: load_state_summary(path), memory.current_session())
+
+
+def district_states(index):
+    """``{district: state}`` for every district in the dataset."""
+    return memory.cached(
+        "dataset", ("district_states", dataset_version()),
+        lambda: {d: s for s in index.states() for d in index.districts(s)},
+        memory.current_session(),
+    )
+
+
+def resolve_state(index, district, state_hint=None):
+    """The dataset's state for a located district (GeoJSON state names may be spelt differently)."""
+    if state_hint in index.states() and district in index.districts(state_hint):
+        return state_hint
+    return district_states(index).get(district)
+
+
+def _build_state_forecasts(index, model, state, n_input, horizon):
+    districts, X, last_year = district_windows(index, state, n_input)
+    preds = recursive_forecast(model, X, horizon) if len(districts) else np.empty((0, horizon))
+    return {
+        "districts": districts,
+        "rows": {d: i for i, d in enumerate(districts)},
+        "windows": X,
+        "preds": preds,
+        "last_year": last_year,
+    }
+
+
+def state_forecasts(index, state, n_input=MIN_WINDOW, horizon=DEFAULT_HORIZON):
+    """Latest input windows and ``horizon``-month forecasts for every district of ``state``.
+
+    ``{"districts", "rows", "windows", "preds", "last_year"}`` from one
+    batched forecast, cached per dataset and model version, so serving a
+    district afterwards is a dictionary lookup plus a row read. ``None`` if
+    the state has no forecaster for ``n_input``.
+    """
+    model, path = load_state_forecaster(shared_state_summary(), state, n_input)
+    if model is None:
+        return None
+    key = ("state_forecasts", dataset_version(), state, n_input, horizon,
+           os.path.basename(path), model_version(path))
+    return memory.cached("dataset", key,
+                         lambda: _build_state_forecasts(index, model, state, n_input, horizon),
+                         memory.current_session())
+
+
+def state_outlook(index, scores, state, n_input=MIN_WINDOW, horizon=DEFAULT_HORIZON):
+    """Per district of ``state``: next-month and peak forecast with risk, and the latest flood probability."""
+    forecasts = state_forecasts(index, state, n_input, horizon)
+    if forecasts is None:
+        return None
+    preds = forecasts["preds"]
+    codes = risk.classify(preds.ravel(), "monthly", state).reshape(preds.shape)
+    peak = preds.argmax(axis=1) if len(preds) else np.empty(0, dtype=int)
+    rows = np.arange(len(preds))
+    table = pd.DataFrame({
+        "STATE_NAME": state,
+        "DISTRICT_NAME": forecasts["districts"],
+        "Last_Year": forecasts["last_year"],
+        "Next_mm": preds[:, 0],
+        "Next_Risk": risk.labels(codes[:, 0]),
+        "Peak_mm": preds[rows, peak],
+        "Peak_Step": peak + 1,
+        "Peak_Risk": risk.labels(codes[rows, peak]),
+    })
+    table = table.merge(district_year_scores(scores, forecasts["last_year"]),
+                        on=["STATE_NAME", "DISTRICT_NAME"], how="left")
+    return table.rename(columns={"FLOOD_PROB": "Flood_Prob"})
+
+
+def district_outlook(index, scores, state, district, n_input=MIN_WINDOW, horizon=DEFAULT_HORIZON):
+    """Latest observed year and the forecast path with risk for one district (map side panel).
+
+    Reads the precomputed :func:`state_forecasts`; only the district's
+    rows are sliced from the index and its scores. ``None`` when the state
+    has no forecaster or the district too little history.
+    """
+    forecasts = state_forecasts(index, state, n_input, horizon)
+    if forecasts is None or district not in forecasts["rows"]:
+        return None
+    preds = forecasts["preds"][forecasts["rows"][district]]
+    codes = risk.classify(preds, "monthly", state)
+
+    latest = index.district(state, district).iloc[-1]
+    last_year = int(latest["YEAR"])
+    steps = np.arange(horizon)
+    months = np.array(MONTHLY_COLS)
+
+    observed = pd.DataFrame({
+        "Month": [f"{m} {last_year}" for m in MONTHLY_COLS],
+        "Rainfall (mm)": latest[MONTHLY_COLS].to_numpy(dtype=float).round(1),
+    })
+    forecast = pd.DataFrame({
+        "Month": [f"{m} {y}" for m, y in zip(months[steps % 12], last_year + 1 + steps // 12)],
+        "Forecast (mm)": preds.round(1),
+        "Flood Risk": risk.labels(codes),
+    })
+    match = scores[(scores["STATE_NAME"] == state) & (scores["DISTRICT_NAME"] == district)
+                   & (scores["YEAR"] == last_year)]
+    return {
+        "state": state,
+        "district": district,
+        "last_year": last_year,
+        "observed": observed,
+        "forecast": forecast,
+        "risk_codes": codes,
+        "flood_prob": float(match["FLOOD_PROB"].mean()) if len(match) else None,
+    }
+
+
+def warm_outlooks(index, states, n_input=MIN_WINDOW, horizon=DEFAULT_HORIZON, progress=None):
+    """Precompute :func:`state_forecasts` for ``states`` (a background job for the map page)."""
+    for i, state in enumerate(states):
+        state_forecasts(index, state, n_input, horizon)
+        if progress is not None:
+            progress(i + 1, len(states))
+    return len(states)
+
+
+def locate_outlook(spatial, index, scores, lat, lon, n_input=MIN_WINDOW, horizon=DEFAULT_HORIZON):
+    """Resolve points to districts and attach each district's :func:`state_outlook` row.
+
+    Returns one row per point, in input order; points outside every
+    district (or in a state without a forecaster) keep empty outlook
+    columns.
+    """
+    districts, state_hints = spatial.locate_many(lat, lon)
+    states = {pair: resolve_state(index, *pair)
+              for pair in set(zip(districts, state_hints)) if pair[0] is not None}
+    points = pd.DataFrame({
+        "lat": np.atleast_1d(lat),
+        "lon": np.atleast_1d(lon),
+        "DISTRICT_NAME": districts,
+        "STATE_NAME": [states.get(pair) for pair in zip(districts, state_hints)],
+    })
+    tables = [state_outlook(index, scores, state, n_input, horizon)
+              for state in points["STATE_NAME"].dropna().unique()]
+    tables = [t for t in tables if t is not None]
+    if not tables:
+        return points
+    return points.merge(pd.concat(tables, ignore_index=True),
+                        on=["STATE_NAME", "DISTRICT_NAME"], how="left")
@@ -0,0 +1,220 @@
+import cProfile
+import io
+import os
+import pstats
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import streamlit as st
+
+from utils.auth import is_admin
+from utils.data import CACHE_DIR
+
+PROFILE_DIR = os.path.join(CACHE_DIR, "page_profiles")
+
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+TOP_N = 25
+
+_state = threading.local()
+
+
+# =================================================
+# SAMPLING PROFILER
+# =================================================
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts collapsed stacks."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mfps-page-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format (feed to flamegraph.pl or speedscope)."""
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common())
+
+
+# =================================================
+# PAGE PROFILE
+# =================================================
+class PageProfile:
+    def __init__(self, page, mode):
+        self.page = page
+        self.mode = mode
+        self.sampler = StackSampler(threading.get_ident())
+        self.profiler = cProfile.Profile() if mode == "cprofile" else None
+        self._own_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._own_tracemalloc = True
+        self.mem_before = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self.sampler.start()
+        if self.profiler:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler:
+            self.profiler.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+        self.mem_after = tracemalloc.take_snapshot()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+
+    def save(self):
+        """Write the profile next to the other cached artefacts; returns the paths."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stem = os.path.join(PROFILE_DIR, f"{self.page}_{time.strftime('%Y%m%d-%H%M%S')}")
+        paths = {"collapsed": stem + ".collapsed"}
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            f.write(self.sampler.collapsed())
+        if self.profiler:
+            paths["pstats"] = stem + ".prof"
+            self.profiler.dump_stats(paths["pstats"])
+        return paths
+
+    # ---- summaries ----
+    def top_functions(self, n=TOP_N):
+        if self.profiler:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=stream)
+            rows = []
+            for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+                rows.append({
+                    "Function": f"{func} ({os.path.basename(filename)}:{line})",
+                    "Calls": nc,
+                    "Self (ms)": round(tt * 1000, 2),
+                    "Cumulative (ms)": round(ct * 1000, 2),
+                })
+            return sorted(rows, key=lambda r: r["Cumulative (ms)"], reverse=True)[:n]
+
+        own, total = Counter(), Counter()
+        for stack, count in self.sampler.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        ms = self.sampler.interval * 1000
+        return [
+            {"Function": name, "Samples": total[name],
+             "Self (ms)": round(own[name] * ms, 1), "Total (ms)": round(total[name] * ms, 1)}
+            for name, _ in total.most_common(n)
+        ]
+
+    def memory_deltas(self, n=15):
+        return [
+            {
+                "Location": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                "Δ Size (KB)": round(s.size_diff / 1024, 1),
+                "Δ Blocks": s.count_diff,
+            }
+            for s in self.mem_after.compare_to(self.mem_before, "lineno")[:n]
+        ]
+
+    def flame_figure(self):
+        """Icicle chart of the sampled stacks (flame graph turned upside down)."""
+        import plotly.graph_objects as go
+
+        totals = Counter()
+        for stack, count in self.sampler.stacks.items():
+            frames = stack.split(";")
+            for depth in range(1, len(frames) + 1):
+                totals[";".join(frames[:depth])] += count
+
+        ids = list(totals)
+        fig = go.Figure(go.Icicle(
+            ids=ids,
+            labels=[i.rsplit(";", 1)[-1] for i in ids],
+            parents=[i.rsplit(";", 1)[0] if ";" in i else "" for i in ids],
+            values=[totals[i] for i in ids],
+            branchvalues="total",
+            tiling=dict(orientation="v"),
+        ))
+        fig.update_layout(height=600, margin=dict(t=10, l=10, r=10, b=10))
+        return fig
+
+
+def render_profile(profile, paths):
+    st.markdown("<div class='card'><h3>🩺 Page Profile</h3></div>", unsafe_allow_html=True)
+    st.caption(
+        f"{profile.page}: {profile.elapsed * 1000:.0f} ms wall time, "
+        f"{sum(profile.sampler.stacks.values())} stack samples, mode={profile.mode}"
+    )
+    st.markdown("**Top functions**")
+    st.dataframe(profile.top_functions(), use_container_width=True, hide_index=True)
+    st.markdown("**Flame graph (sampled stacks)**")
+    if profile.sampler.stacks:
+        st.plotly_chart(profile.flame_figure(), use_container_width=True)
+    st.markdown("**Memory allocation deltas**")
+    st.dataframe(profile.memory_deltas(), use_container_width=True, hide_index=True)
+    for kind, path in paths.items():
+        with open(path, "rb") as f:
+            st.download_button(f"⬇️ Download {kind} profile", f.read(),
+                               file_name=os.path.basename(path), key=f"profile_dl_{kind}")
+
+
+# =================================================
+# PAGE HOOK
+# =================================================
+def requested_mode():
+    """``"sample"`` or ``"cprofile"`` when ``?profile=`` asks for one and the user is an admin."""
+    value = st.query_params.get("profile")
+    if not value or not is_admin(st.session_state):
+        return None
+    return "cprofile" if value == "cprofile" else "sample"
+
+
+def profile_this_page(page_file):
+    """Re-run ``page_file`` under the profiler when requested.
+
+    Call before ``st.set_page_config``; when it returns True the page has
+    already been rendered (with the profile at the bottom) and the caller
+    should ``st.stop()``.
+    """
+    if getattr(_state, "active", False):
+        return False
+    mode = requested_mode()
+    if mode is None:
+        return False
+
+    page = os.path.splitext(os.path.basename(page_file))[0]
+    profile = PageProfile(page, mode)
+    _state.active = True
+    try:
+        profile.start()
+        try:
+            runpy.run_path(page_file, run_name="__main__")
+        finally:
+            profile.stop()
+            render_profile(profile, profile.save())
+    finally:
+        _state.active = False
+    return True
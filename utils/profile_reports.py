@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.data import CACHE_DIR, DATA_PATH, dataset_version
+
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+
+# Above this many rows the profile is computed on a random sample.
+SAMPLE_THRESHOLD = 50_000
+SAMPLE_ROWS = 50_000
+
+STAGES = ["queued", "loading", "sampling", "profiling", "rendering", "done"]
+
+# A worker rewrites its status this often; a queued or running status whose
+# process is gone, or that has not been touched for STALE_S, is expired to
+# "failed" (e.g. the server restarted mid-run).
+HEARTBEAT_S = 10
+STALE_S = 6 * HEARTBEAT_S
+
+_status_lock = threading.RLock()
+
+
+def report_path(version):
+    return os.path.join(PROFILE_DIR, f"profile_{version}.html")
+
+
+def status_path(version):
+    return os.path.join(PROFILE_DIR, f"profile_{version}.json")
+
+
+def _write_status(version, stage, **extra):
+    status = {
+        "version": version,
+        "stage": stage,
+        "progress": STAGES.index(stage) / (len(STAGES) - 1) if stage in STAGES else 0.0,
+        "pid": os.getpid(),
+        **extra,
+        "updated": time.time(),
+    }
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    tmp = f"{status_path(version)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with _status_lock:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(tmp, status_path(version))
+
+
+def read_status(version):
+    try:
+        with open(status_path(version), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _extra(status):
+    """The caller-supplied fields of a status (everything _write_status does not fill in)."""
+    return {k: v for k, v in status.items() if k not in ("version", "stage", "progress", "pid", "updated")}
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def current_status(version):
+    """:func:`read_status`, with dead queued/running statuses expired to "failed".
+
+    A failed status is kept (and the report not resubmitted) until an
+    explicit ``request_report(..., force=True)``.
+    """
+    status = read_status(version)
+    if status is None or status["stage"] in ("done", "failed") or is_running(version):
+        return status
+    if _pid_alive(status.get("pid")) and time.time() - status.get("updated", 0) < STALE_S:
+        return status
+    extra = _extra(status)
+    extra["error"] = f"interrupted while {status['stage']} (worker process ended)"
+    _write_status(version, "failed", **extra)
+    return read_status(version)
+
+
+def _heartbeat(version, stop):
+    """Refresh the worker's status timestamp until ``stop`` is set."""
+    while not stop.wait(HEARTBEAT_S):
+        with _status_lock:      # held across read and write, so a stage change is never reverted
+            status = read_status(version)
+            if status is None or status["stage"] in ("done", "failed"):
+                return
+            _write_status(version, status["stage"], **_extra(status))
+
+
+# =================================================
+# WORKER (runs in a separate process)
+# =================================================
+def _generate(version, data_path, threshold, sample_rows):
+    import pandas as pd
+    from ydata_profiling import ProfileReport
+
+    started = time.time()
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(version, stop), daemon=True).start()
+    try:
+        _write_status(version, "loading", started=started)
+        df = pd.read_csv(data_path)
+        df.columns = df.columns.str.strip()
+
+        sampled = len(df) > threshold
+        if sampled:
+            _write_status(version, "sampling", started=started, rows=len(df))
+            df = df.sample(sample_rows, random_state=0)
+
+        _write_status(version, "profiling", started=started, rows=len(df), sampled=sampled)
+        profile = ProfileReport(
+            df,
+            title=f"Flood dataset profile ({version})",
+            minimal=True,
+            progress_bar=False,
+        )
+
+        _write_status(version, "rendering", started=started, rows=len(df), sampled=sampled)
+        html = profile.to_html()
+        tmp = report_path(version) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp, report_path(version))
+
+        _write_status(version, "done", started=started, finished=time.time(),
+                      rows=len(df), sampled=sampled)
+    except Exception as exc:  # surfaced on the admin page
+        _write_status(version, "failed", started=started, error=repr(exc))
+        raise
+    finally:
+        stop.set()
+
+
+# =================================================
+# JOB SUBMISSION
+# =================================================
+_executor = None
+_futures = {}
+_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        # One worker process: profiles never compete with each other, and the
+        # Streamlit server process never holds the GIL for a profile run.
+        _executor = ProcessPoolExecutor(max_workers=1)
+    return _executor
+
+
+def is_running(version):
+    with _lock:
+        future = _futures.get(version)
+        return future is not None and not future.done()
+
+
+def request_report(version=None, force=False, data_path=DATA_PATH,
+                   threshold=SAMPLE_THRESHOLD, sample_rows=SAMPLE_ROWS):
+    """Queue a profile for ``version`` unless one is cached, running or has failed.
+
+    Only ``force=True`` (the admin page's "Regenerate" button) retries a
+    failed run, so a broken profile is shown instead of being resubmitted on
+    every poll.
+    """
+    version = version or dataset_version(data_path)
+    if not force and (current_status(version) or {}).get("stage") == "failed":
+        return version
+    with _lock:
+        future = _futures.get(version)
+        if future is not None and not future.done():
+            return version
+        if not force and os.path.exists(report_path(version)):
+            return version
+        _write_status(version, "queued")
+        _futures[version] = _pool().submit(_generate, version, data_path, threshold, sample_rows)
+    return version
+
+
+def cached_report(version):
+    """Path of the stored HTML report for ``version`` or ``None``."""
+    path = report_path(version)
+    return path if os.path.exists(path) else None
@@ -0,0 +1,101 @@
+import json
+import os
+from functools import lru_cache
+
+from utils.data import BASE_DIR
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+RISK_CONFIG_PATH = os.environ.get(
+    "MFPS_RISK_CONFIG", os.path.join(BASE_DIR, "config", "risk_thresholds.json")
+)
+
+LOW, MEDIUM, HIGH = 0, 1, 2
+LEVELS = ("Low", "Medium", "High")
+
+PALETTES = {
+    # Prediction charts and result tables
+    "chart": ("#2a9d8f", "#f77f00", "#d62828"),
+    # Map popups (light backgrounds)
+    "popup": ("#d4edda", "#fff3cd", "#f8d7da"),
+    # Map legend swatches
+    "legend": ("#28a745", "#ffc107", "#dc3545"),
+}
+
+
+# =================================================
+# THRESHOLDS
+# =================================================
+@lru_cache(maxsize=None)
+def load_config(path=RISK_CONFIG_PATH):
+    """Thresholds per scale, with optional per-state overrides.
+
+    ``states`` maps a state name to ``{"monthly": {...}, "annual": {...}}``;
+    any scale or bound it leaves out falls back to the national value.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def thresholds(scale="monthly", state=None):
+    """``(medium, high)`` lower bounds in mm for ``scale`` ("monthly" or "annual")."""
+    config = load_config()
+    bounds = dict(config[scale])
+    if state is not None:
+        bounds.update(config.get("states", {}).get(state, {}).get(scale, {}))
+    return float(bounds["medium"]), float(bounds["high"])
+
+
+# =================================================
+# CLASSIFICATION
+# =================================================
+def classify(values, scale="monthly", states=None):
+    """Risk codes (0 Low, 1 Medium, 2 High) for a whole array at once.
+
+    ``states`` may be a single state name or an array aligned with ``values``
+    so that per-state thresholds apply row by row without a Python loop.
+    """
+    values = np.asarray(values, dtype=float)
+    if states is None or isinstance(states, str):
+        medium, high = thresholds(scale, states)
+    else:
+        names, inverse = np.unique(np.asarray(states, dtype=object).astype(str), return_inverse=True)
+        table = np.array([thresholds(scale, name) for name in names])
+        medium, high = table[inverse, 0].reshape(values.shape), table[inverse, 1].reshape(values.shape)
+    return (values >= medium).astype(np.int8) + (values >= high).astype(np.int8)
+
+
+def labels(codes, suffix=""):
+    """``"Low"``/``"Medium"``/``"High"`` (plus ``suffix``, e.g. ``" Risk"``) per code."""
+    out = np.array(LEVELS)[np.asarray(codes)]
+    return np.char.add(out, suffix) if suffix else out
+
+
+def colors(codes, palette="chart"):
+    return np.array(PALETTES[palette])[np.asarray(codes)]
+
+
+# =================================================
+# CHART HELPERS
+# =================================================
+def legend_names(scale="monthly", state=None):
+    """Legend text for High, Medium, Low (the order the charts list them)."""
+    medium, high = thresholds(scale, state)
+    return [
+        f"High Risk (≥{high:.0f} mm)",
+        f"Medium Risk ({medium:.0f}–{high - 1:.0f} mm)",
+        f"Low Risk (<{medium:.0f} mm)",
+    ]
+
+
+def risk_shapes(scale="monthly", state=None, y_max=None, opacity=0.25):
+    """Plotly background rectangles for the Low/Medium/High bands."""
+    medium, high = thresholds(scale, state)
+    y_max = y_max if y_max is not None else high * 4 / 3
+    bands = [(high, y_max, HIGH), (medium, high, MEDIUM), (0, medium, LOW)]
+    return [
+        dict(type="rect", xref="paper", yref="y", x0=0, x1=1, y0=y0, y1=y1,
+             fillcolor=PALETTES["chart"][code], opacity=opacity, layer="below", line_width=0)
+        for y0, y1, code in bands
+    ]
@@ -0,0 +1,141 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import risk
+from utils.data import MONTHLY_COLS, state_series
+from utils.indexed import IndexedDataset
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+CURVE_THRESHOLDS = tuple(range(0, 810, 10))
+
+
+# =================================================
+# SCENARIO INPUTS
+# =================================================
+def state_anomalies(df, state):
+    """``(n_years, 12)`` rainfall anomalies of the state's mean series.
+
+    The forecaster predicts the monthly mean over the state's districts
+    (:func:`utils.data.state_series`), so the noise comes from that series:
+    each value is a year's state-mean rainfall for the month minus the
+    long-run state mean for the same calendar month. Single-district
+    deviations would be far wider than those of an average over districts.
+    """
+    yearly = df[df["STATE_NAME"] == state].groupby("YEAR")[MONTHLY_COLS].mean()
+    return (yearly - yearly.mean()).to_numpy(dtype=float)
+
+
+def latest_window(df, state, n_input):
+    """Last ``n_input`` observed months of the state series and the next calendar month."""
+    series = state_series(df, state)
+    return series[-n_input:], len(series) % 12
+
+
+# =================================================
+# SIMULATION
+# =================================================
+def simulate(model, window, anomalies, horizon, n_scenarios=2000,
+             first_month=0, perturb_inputs=False, seed=None, progress=None):
+    """Push ``n_scenarios`` perturbed paths through a recursive forecaster.
+
+    Every horizon step is a single batched ``predict`` over all scenarios; the
+    prediction is then perturbed with an anomaly drawn from the target calendar
+    month's history. Returns an ``(n_scenarios, horizon)`` array in mm.
+
+    ``progress(step, total)`` is called after every step (see utils.jobs).
+    """
+    rng = np.random.default_rng(seed)
+    window = np.asarray(window, dtype=float)
+    n_input = len(window)
+
+    def draw(month_idx, size):
+        column = anomalies[:, month_idx % 12]
+        return column[rng.integers(0, len(column), size)]
+
+    seq = np.tile(window, (n_scenarios, 1))
+    if perturb_inputs:
+        for j in range(n_input):
+            month_idx = first_month - n_input + j
+            seq[:, j] = np.clip(seq[:, j] + draw(month_idx, n_scenarios), 0, None)
+
+    out = np.empty((n_scenarios, horizon))
+    for step in range(horizon):
+        pred = model.predict(seq[:, -n_input:])
+        out[:, step] = np.clip(pred + draw(first_month + step, n_scenarios), 0, None)
+        seq = np.hstack([seq[:, 1:], out[:, step:step + 1]])
+        if progress is not None:
+            progress(step + 1, horizon)
+    return out
+
+
+def exceedance_curves(paths, thresholds=CURVE_THRESHOLDS):
+    """``(horizon, len(thresholds))`` probabilities that a month reaches each threshold."""
+    paths = np.asarray(paths)
+    thresholds = np.asarray(thresholds)
+    return (paths[:, :, None] >= thresholds[None, None, :]).mean(axis=0)
+
+
+OUTLOOK_COLUMNS = ["State", "Step", "Month", "P_High", "P10", "Median", "P90"]
+
+
+def outlook_table(state, paths, first_month, threshold=None):
+    """Per-month High Risk probability and spread for one state."""
+    if threshold is None:
+        threshold = risk.thresholds("monthly", state)[1]
+    horizon = paths.shape[1]
+    return pd.DataFrame({
+        "State": state,
+        "Step": np.arange(1, horizon + 1),
+        "Month": [MONTHLY_COLS[(first_month + h) % 12] for h in range(horizon)],
+        "P_High": (paths >= threshold).mean(axis=0),
+        "P10": np.percentile(paths, 10, axis=0),
+        "Median": np.median(paths, axis=0),
+        "P90": np.percentile(paths, 90, axis=0),
+    })
+
+
+# =================================================
+# MULTI-STATE RUNS
+# =================================================
+def _simulate_state(task):
+    from utils.models import load_model
+
+    state, model_path, window, anomalies, first_month, horizon, n_scenarios, seed = task
+    paths = simulate(load_model(model_path), window, anomalies, horizon,
+                     n_scenarios, first_month, seed=seed)
+    return state, first_month, paths
+
+
+def run_states(df, model_paths, n_input, horizon=12, n_scenarios=2000,
+               workers=None, seed=0):
+    """Simulate every state in ``model_paths`` (``{state: path}``) across a process pool.
+
+    Returns ``(outlook, curves, elapsed_seconds)`` where ``curves`` maps each
+    state to its exceedance-curve array.
+    """
+    index = IndexedDataset(df)
+    tasks = []
+    for i, (state, path) in enumerate(sorted(model_paths.items())):
+        df_state = index.state(state)
+        window, first_month = latest_window(df_state, state, n_input)
+        tasks.append((state, path, window, state_anomalies(df_state, state),
+                      first_month, horizon, n_scenarios, seed + i))
+    if not tasks:
+        return pd.DataFrame(columns=OUTLOOK_COLUMNS), {}, 0.0
+
+    start = time.perf_counter()
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_simulate_state, tasks))
+    elapsed = time.perf_counter() - start
+
+    outlook = pd.concat(
+        [outlook_table(state, paths, first_month) for state, first_month, paths in results],
+        ignore_index=True
+    )
+    curves = {state: exceedance_curves(paths) for state, _, paths in results}
+    return outlook, curves, elapsed
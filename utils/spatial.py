@@ -0,0 +1,180 @@
+import json
+import os
+
+from utils import memory
+from utils.lazy import lazy_import
+from utils.maps import GEOJSON_PATH
+
+np = lazy_import("numpy")
+
+# Pairs of (point, polygon) tested at once; bounds the temporary
+# (points x edges) arrays of the vectorized ray cast.
+MAX_TEST_ELEMENTS = 2_000_000
+
+
+def _polygons(geometry):
+    """Polygons of a GeoJSON geometry as lists of rings (outer ring first)."""
+    kind = (geometry or {}).get("type")
+    if kind == "Polygon":
+        return [geometry["coordinates"]]
+    if kind == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+class SpatialIndex:
+    """Coordinate -> district lookups over the district polygons.
+
+    Every polygon part (with its holes) is stored as one edge list, and a
+    uniform grid over the bounding boxes lists the parts that may cover each
+    cell. A query maps points to cells, drops candidates whose bounding box
+    misses, and settles the rest with an even-odd ray cast that is vectorized
+    over points and edges. Holes need no special case under the even-odd
+    rule.
+
+    Coordinates are ``(lat, lon)`` in the GeoJSON's CRS (WGS84).
+    """
+
+    def __init__(self, geojson, cells=128):
+        self.features = []
+        edges, offsets, part_feature = [], [0], []
+        for fi, feature in enumerate(geojson["features"]):
+            props = feature.get("properties") or {}
+            self.features.append({"district": props.get("NAME_2"), "state": props.get("NAME_1")})
+            for rings in _polygons(feature.get("geometry")):
+                ring_edges = []
+                for ring in rings:
+                    xy = np.asarray(ring, dtype=float)[:, :2]
+                    if len(xy) >= 3:
+                        ring_edges.append(np.hstack([xy, np.roll(xy, -1, axis=0)]))
+                if ring_edges:
+                    e = np.vstack(ring_edges)
+                    edges.append(e)
+                    offsets.append(offsets[-1] + len(e))
+                    part_feature.append(fi)
+
+        self._edges = np.vstack(edges) if edges else np.empty((0, 4))
+        self._offsets = np.asarray(offsets)
+        self._part_feature = np.asarray(part_feature, dtype=np.int64)
+
+        n_parts = len(part_feature)
+        self._bbox = np.empty((n_parts, 4))
+        for p in range(n_parts):
+            e = self._edges[self._offsets[p]:self._offsets[p + 1]]
+            self._bbox[p] = e[:, 0].min(), e[:, 1].min(), e[:, 0].max(), e[:, 1].max()
+
+        # Uniform grid in CSR form: parts of cell c are
+        # _cell_parts[_cell_start[c]:_cell_start[c + 1]].
+        if n_parts:
+            self._x0, self._y0 = self._bbox[:, 0].min(), self._bbox[:, 1].min()
+            x1, y1 = self._bbox[:, 2].max(), self._bbox[:, 3].max()
+        else:
+            self._x0 = self._y0 = x1 = y1 = 0.0
+        self._nx = self._ny = cells
+        self._cw = max((x1 - self._x0) / cells, 1e-12)
+        self._ch = max((y1 - self._y0) / cells, 1e-12)
+
+        cell_ids, part_ids = [], []
+        for p, (bx0, by0, bx1, by1) in enumerate(self._bbox):
+            ix = np.arange(self._cell_x(bx0), self._cell_x(bx1) + 1)
+            iy = np.arange(self._cell_y(by0), self._cell_y(by1) + 1)
+            cells_p = (iy[:, None] * self._nx + ix[None, :]).ravel()
+            cell_ids.append(cells_p)
+            part_ids.append(np.full(len(cells_p), p))
+        cell_ids = np.concatenate(cell_ids) if cell_ids else np.empty(0, dtype=np.int64)
+        part_ids = np.concatenate(part_ids) if part_ids else np.empty(0, dtype=np.int64)
+        order = np.argsort(cell_ids, kind="stable")
+        self._cell_parts = part_ids[order]
+        self._cell_start = np.searchsorted(cell_ids[order], np.arange(self._nx * self._ny + 1))
+
+    def __len__(self):
+        return len(self.features)
+
+    @property
+    def bounds(self):
+        """``(lon_min, lat_min, lon_max, lat_max)`` over every polygon."""
+        return (self._x0, self._y0, self._x0 + self._cw * self._nx, self._y0 + self._ch * self._ny)
+
+    def _cell_x(self, x):
+        return int(min(max((x - self._x0) // self._cw, 0), self._nx - 1))
+
+    def _cell_y(self, y):
+        return int(min(max((y - self._y0) // self._ch, 0), self._ny - 1))
+
+    # -------------------------------------------------
+    # Lookups
+    # -------------------------------------------------
+    def lookup(self, lat, lon):
+        """Feature index containing each point, or -1; accepts scalars or arrays."""
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        result = np.full(len(lat), -1, dtype=np.int64)
+
+        cx = np.floor((lon - self._x0) / self._cw)
+        cy = np.floor((lat - self._y0) / self._ch)
+        on_grid = (cx >= 0) & (cx < self._nx) & (cy >= 0) & (cy < self._ny)
+        points = np.flatnonzero(on_grid)
+        if len(points) == 0:
+            return result
+        cell = (cy[points] * self._nx + cx[points]).astype(np.int64)
+        starts = self._cell_start[cell]
+        counts = self._cell_start[cell + 1] - starts
+        pair_point = np.repeat(points, counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        pair_part = self._cell_parts[np.arange(counts.sum()) - first + np.repeat(starts, counts)]
+
+        px, py = lon[pair_point], lat[pair_point]
+        box = self._bbox[pair_part]
+        keep = (px >= box[:, 0]) & (px <= box[:, 2]) & (py >= box[:, 1]) & (py <= box[:, 3])
+        pair_point, pair_part = pair_point[keep], pair_part[keep]
+        if len(pair_part) == 0:
+            return result
+
+        order = np.argsort(pair_part, kind="stable")
+        pair_point, pair_part = pair_point[order], pair_part[order]
+        bounds = np.flatnonzero(np.r_[True, pair_part[1:] != pair_part[:-1], True])
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            part = pair_part[a]
+            pts = pair_point[a:b]
+            pts = pts[result[pts] == -1]
+            if len(pts):
+                inside = self._contains(part, lon[pts], lat[pts])
+                result[pts[inside]] = self._part_feature[part]
+        return result
+
+    def _contains(self, part, x, y):
+        edges = self._edges[self._offsets[part]:self._offsets[part + 1]]
+        x1, y1, x2, y2 = (edges[:, i] for i in range(4))
+        inside = np.zeros(len(x), dtype=bool)
+        step = max(1, MAX_TEST_ELEMENTS // max(len(edges), 1))
+        dy = np.where(y2 == y1, 1.0, y2 - y1)
+        for s in range(0, len(x), step):
+            px, py = x[s:s + step, None], y[s:s + step, None]
+            straddles = (y1 > py) != (y2 > py)
+            x_cross = x1 + (py - y1) * (x2 - x1) / dy
+            inside[s:s + step] = ((straddles & (px < x_cross)).sum(axis=1) % 2) == 1
+        return inside
+
+    def locate(self, lat, lon):
+        """``{"district", "state"}`` of the feature containing one point, or ``None``."""
+        found = int(self.lookup(lat, lon)[0])
+        return None if found < 0 else self.features[found]
+
+    def locate_many(self, lat, lon):
+        """``(districts, states)`` arrays for many points (``None`` where nothing matches)."""
+        found = self.lookup(lat, lon)
+        districts = np.array([f["district"] for f in self.features] + [None], dtype=object)
+        states = np.array([f["state"] for f in self.features] + [None], dtype=object)
+        return districts[found], states[found]
+
+
+def load_spatial_index(path=GEOJSON_PATH):
+    with open(path, encoding="utf-8") as f:
+        return SpatialIndex(json.load(f))
+
+
+def shared_spatial_index(path=GEOJSON_PATH):
+    """The index for ``path`` from the budgeted cache (persisted across restarts)."""
+    stat = os.stat(path)
+    key = ("spatial", os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    return memory.cached("dataset", key, lambda: load_spatial_index(path), memory.current_session())
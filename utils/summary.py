@@ -0,0 +1,131 @@
+import csv
+import json
+import os
+from collections import Counter, defaultdict
+
+from utils.data import CACHE_DIR, DATA_PATH, MONTHLY_COLS, dataset_version
+
+SUMMARY_DIR = os.path.join(CACHE_DIR, "summary")
+
+# Everything here is standard library only: the landing page renders its KPI
+# cards from the snapshot without importing pandas or reading the dataset.
+_loaded = {}
+
+
+def summary_path(version):
+    return os.path.join(SUMMARY_DIR, f"summary_{version}.json")
+
+
+def _mean(total, count):
+    return total / count if count else 0.0
+
+
+def _argmax(counter):
+    """Key with the largest value (ties go to the alphabetically first key)."""
+    return min(counter, key=lambda k: (-counter[k], k)) if counter else None
+
+
+# =================================================
+# BUILD (at ingest)
+# =================================================
+def compute_summary(path=DATA_PATH, version=None):
+    """One streaming pass over the CSV -> the dataset's headline numbers.
+
+    Annual rainfall is the sum of the twelve monthly columns, the same
+    ``TOTAL_ANNUAL`` the Overview page derives.
+    """
+    records = floods = 0
+    years = set()
+    rain_total = 0.0
+    district_rain = defaultdict(lambda: [0.0, 0])
+    state_floods = Counter()
+    states = defaultdict(lambda: {
+        "records": 0, "flood_cases": 0, "rain_total": 0.0,
+        "districts": set(), "district_floods": Counter(),
+    })
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        col = {name: i for i, name in enumerate(header)}
+        month_idx = [col[m] for m in MONTHLY_COLS]
+        for row in reader:
+            state, district = row[col["STATE_NAME"]], row[col["DISTRICT_NAME"]]
+            flood = int(float(row[col["FLOOD"]])) == 1
+            annual = sum(float(row[i]) for i in month_idx)
+
+            records += 1
+            floods += flood
+            years.add(int(float(row[col["YEAR"]])))
+            rain_total += annual
+            district_rain[district][0] += annual
+            district_rain[district][1] += 1
+
+            s = states[state]
+            s["records"] += 1
+            s["rain_total"] += annual
+            s["districts"].add(district)
+            if flood:
+                s["flood_cases"] += 1
+                s["district_floods"][district] += 1
+                state_floods[state] += 1
+
+    wettest = {d: _mean(t, n) for d, (t, n) in district_rain.items()}
+    return {
+        "version": version or dataset_version(path),
+        "records": records,
+        "states": len(states),
+        "districts": len({(s, d) for s, v in states.items() for d in v["districts"]}),
+        "years": len(years),
+        "year_min": min(years) if years else None,
+        "year_max": max(years) if years else None,
+        "flood_cases": floods,
+        "no_flood": records - floods,
+        "flood_rate": _mean(floods, records),
+        "avg_annual_rainfall": _mean(rain_total, records),
+        "most_flood_state": _argmax(state_floods),
+        "wettest_district": _argmax(wettest),
+        "per_state": {
+            state: {
+                "records": s["records"],
+                "districts": len(s["districts"]),
+                "flood_cases": s["flood_cases"],
+                "flood_rate": _mean(s["flood_cases"], s["records"]),
+                "avg_annual_rainfall": _mean(s["rain_total"], s["records"]),
+                "worst_district": _argmax(s["district_floods"]),
+            }
+            for state, s in sorted(states.items())
+        },
+    }
+
+
+def build_summary(path=DATA_PATH, version=None):
+    """Compute and store the snapshot for the dataset's current version."""
+    version = version or dataset_version(path)
+    summary = compute_summary(path, version)
+    os.makedirs(SUMMARY_DIR, exist_ok=True)
+    tmp = summary_path(version) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp, summary_path(version))
+    _loaded[version] = summary
+    return summary
+
+
+# =================================================
+# READ (pages)
+# =================================================
+def load_summary(version=None, path=DATA_PATH):
+    """Snapshot for the current dataset version, held in memory after the first read.
+
+    Falls back to building it (still without pandas) if ingest has not run.
+    """
+    version = version or dataset_version(path)
+    summary = _loaded.get(version)
+    if summary is None:
+        try:
+            with open(summary_path(version), encoding="utf-8") as f:
+                summary = _loaded[version] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            summary = build_summary(path, version)
+    return summary
@@ -0,0 +1,193 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tracing is off unless MFPS_TRACING=1; a disabled span is a shared no-op
+# object, so instrumented code pays one function call and one branch.
+ENABLED = os.environ.get("MFPS_TRACING", "").lower() in ("1", "true", "yes")
+
+log = logging.getLogger(__name__)
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# =================================================
+# HISTOGRAMS
+# =================================================
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def observe(name, seconds, page=None):
+    key = (name, page or "")
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(seconds)
+
+
+def snapshot():
+    """``{(span, page): (bucket counts, sum, count)}`` copied under the lock."""
+    with _lock:
+        return {k: (list(h.counts), h.total, h.count) for k, h in _histograms.items()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# =================================================
+# SPANS
+# =================================================
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "page", "start")
+
+    def __init__(self, name, page):
+        self.name = name
+        self.page = page
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, self.page)
+        return False
+
+
+def span(name, page=None):
+    """Time a block: ``with span("predict", PAGE): ...``."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name, page)
+
+
+def traced(name, page=None):
+    """Decorator form of :func:`span`."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+
+        def inner(*args, **kwargs):
+            with _Span(name, page):
+                return fn(*args, **kwargs)
+        inner.__name__ = fn.__name__
+        inner.__doc__ = fn.__doc__
+        inner.__wrapped__ = fn
+        return inner
+    return wrap
+
+
+# =================================================
+# PROMETHEUS EXPORT
+# =================================================
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    """All span histograms in Prometheus text exposition format."""
+    lines = [
+        "# HELP mfps_span_duration_seconds Time spent in instrumented dashboard spans.",
+        "# TYPE mfps_span_duration_seconds histogram",
+    ]
+    for (name, page), (counts, total, count) in sorted(snapshot().items()):
+        labels = f'span="{_escape(name)}",page="{_escape(page)}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f'mfps_span_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'mfps_span_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"mfps_span_duration_seconds_sum{{{labels}}} {total}")
+        lines.append(f"mfps_span_duration_seconds_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_file_forever(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(render_prometheus())
+            os.replace(tmp, path)
+        except Exception:   # keep exporting; a full disk or a bad path is usually transient
+            log.exception("writing metrics file %s failed", path)
+
+
+_exporter_started = False
+
+
+def start_exporter():
+    """Start the configured exporter once per process (safe to call on every rerun).
+
+    ``MFPS_METRICS_PORT`` serves ``/metrics`` on 127.0.0.1; ``MFPS_METRICS_FILE``
+    rewrites a text file every ``MFPS_METRICS_INTERVAL`` seconds (default 15).
+    """
+    global _exporter_started
+    if not ENABLED or _exporter_started:
+        return
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    port = os.environ.get("MFPS_METRICS_PORT")
+    if port:
+        server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="mfps-metrics", daemon=True).start()
+
+    path = os.environ.get("MFPS_METRICS_FILE")
+    if path:
+        interval = float(os.environ.get("MFPS_METRICS_INTERVAL", "15"))
+        threading.Thread(target=_write_file_forever, args=(path, interval),
+                         name="mfps-metrics-file", daemon=True).start()